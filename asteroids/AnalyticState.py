@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import numpy as np
+
+from asteroids import Rotation
+
+
+class AnalyticState(object):
+    """Closed-form motion of pieces that do not thrust.
+
+    Every attached piece is stored as its pose (origin) at the reference
+    time t0, its velocity and its signed angular velocity omega. The pose
+    at the current time is computed when it is read, so step only moves
+    the clock and costs the same for any number of pieces and any dt.
+    Pieces with wrap set are kept on the torus of the board size.
+
+    Writing the position, velocity or turn of a piece moves its reference
+    time to the current time. The interface matches WorldState, so
+    attached pieces are views like those of a WorldState.
+    """
+    def __init__(self, size, capacity=64):
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Argument 'capacity' has to be a positive int")
+        self.size = np.array(size, dtype=float)
+        self.time = 0.
+        self._pieces = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = getattr(self, 'origin', None)
+        n = len(self._pieces)
+        arrays = {
+            'origin': np.zeros((capacity, 3)),
+            't0': np.zeros(capacity),
+            'velocity': np.zeros((capacity, 2)),
+            'omega': np.zeros(capacity),
+            'angular_velocity': np.zeros(capacity),
+            'turn': np.zeros(capacity, dtype=np.int8),
+            'wrap': np.zeros(capacity, dtype=bool)}
+        for name, array in arrays.items():
+            if old is not None:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+        self._capacity = capacity
+
+    def __len__(self):
+        return len(self._pieces)
+
+    def __contains__(self, piece):
+        return piece._world is self
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def pieces(self):
+        return self._pieces
+
+    def attach(self, piece, wrap=False):
+        """Moves the state of piece into the arrays, with t0 set to the
+        current time."""
+        if piece._world is not None:
+            raise RuntimeError("Piece is already attached to a world")
+        if piece._thrust:
+            raise ValueError("Thrusting pieces cannot move analytically")
+        slot = len(self._pieces)
+        if slot == self._capacity:
+            self._allocate(2 * self._capacity)
+        self.origin[slot] = piece._position
+        self.t0[slot] = self.time
+        self.velocity[slot] = piece._velocity
+        self.angular_velocity[slot] = piece._angular_velocity
+        self.turn[slot] = piece._turn
+        self.omega[slot] = piece._turn * piece._angular_velocity
+        self.wrap[slot] = wrap
+        self._pieces.append(piece)
+        piece._world = self
+        piece._slot = slot
+
+    def attach_many(self, pieces, wrap=False):
+        """Attaches pieces like attach, with one array write per field."""
+        if any(piece._world is not None for piece in pieces):
+            raise RuntimeError("Piece is already attached to a world")
+        if any(piece._thrust for piece in pieces):
+            raise ValueError("Thrusting pieces cannot move analytically")
+        start = len(self._pieces)
+        stop = start + len(pieces)
+        capacity = self._capacity
+        while capacity < stop:
+            capacity *= 2
+        if capacity != self._capacity:
+            self._allocate(capacity)
+        if not pieces:
+            return
+        self.origin[start:stop] = [piece._position for piece in pieces]
+        self.t0[start:stop] = self.time
+        self.velocity[start:stop] = [piece._velocity for piece in pieces]
+        angular_velocity = np.array([piece._angular_velocity
+                                     for piece in pieces], dtype=float)
+        turn = np.array([piece._turn for piece in pieces], dtype=np.int8)
+        self.angular_velocity[start:stop] = angular_velocity
+        self.turn[start:stop] = turn
+        self.omega[start:stop] = turn * angular_velocity
+        self.wrap[start:stop] = wrap
+        self._pieces.extend(pieces)
+        for slot, piece in enumerate(pieces, start):
+            piece._world = self
+            piece._slot = slot
+
+    def detach(self, piece):
+        """Copies the current state back into piece and frees its slot."""
+        if piece._world is not self:
+            raise RuntimeError("Piece is not attached to this world")
+        slot = piece._slot
+        piece._position = self.get_position(slot)
+        piece._velocity = self.get_velocity(slot)
+        piece._cos_angle, piece._sin_angle = self.get_heading(slot)
+        piece._turn = self.get_turn(slot)
+        piece._world = None
+        piece._slot = None
+
+        last = len(self._pieces) - 1
+        moved = self._pieces.pop()
+        if slot != last:
+            for name in ('origin', 't0', 'velocity', 'omega',
+                         'angular_velocity', 'turn', 'wrap'):
+                array = getattr(self, name)
+                array[slot] = array[last]
+            self._pieces[slot] = moved
+            moved._slot = slot
+
+    def step(self, dt, slots=None):
+        """Advances the clock of all pieces by dt."""
+        if slots is not None:
+            raise ValueError("Analytic pieces share one clock and cannot "
+                             "be stepped separately")
+        self.time += dt
+
+    def poses(self, slots):
+        """Returns the current x, y and angle of the slots as (N, 3)."""
+        elapsed = self.time - self.t0[slots]
+        poses = self.origin[slots]
+        poses[:, :2] += self.velocity[slots] * elapsed[:, None]
+        poses[:, 2] += self.omega[slots] * elapsed
+        poses[:, 2] %= 2. * np.pi
+        wrap = self.wrap[slots]
+        poses[wrap, :2] %= self.size
+        return poses
+
+    def velocities(self, slots):
+        return self.velocity[slots]
+
+    def get_position(self, slot):
+        # Same arithmetic as poses, on Python floats.
+        x, y, angle = self.origin[slot].tolist()
+        vx, vy = self.velocity[slot].tolist()
+        elapsed = self.time - float(self.t0[slot])
+        x += vx * elapsed
+        y += vy * elapsed
+        angle = (angle + float(self.omega[slot]) * elapsed) % (2. * np.pi)
+        if self.wrap[slot]:
+            x %= float(self.size[0])
+            y %= float(self.size[1])
+        return x, y, angle
+
+    def _rebase(self, slot):
+        self.origin[slot] = self.get_position(slot)
+        self.t0[slot] = self.time
+
+    def set_position(self, slot, value):
+        self.origin[slot] = value
+        self.t0[slot] = self.time
+
+    def get_velocity(self, slot):
+        return (float(self.velocity[slot, 0]), float(self.velocity[slot, 1]))
+
+    def set_velocity(self, slot, value):
+        self._rebase(slot)
+        self.velocity[slot] = value[0], value[1]
+
+    def get_heading(self, slot):
+        sin_angle, cos_angle = Rotation.shared.sincos(
+            self.get_position(slot)[2])
+        return cos_angle, sin_angle
+
+    def get_thrust(self, slot):
+        return 0
+
+    def set_thrust(self, slot, value):
+        if value:
+            raise ValueError("Thrusting pieces cannot move analytically")
+
+    def get_turn(self, slot):
+        return int(self.turn[slot])
+
+    def set_turn(self, slot, value):
+        self._rebase(slot)
+        self.turn[slot] = value
+        self.omega[slot] = value * self.angular_velocity[slot]
+
+    def get_reference(self, slot):
+        """Returns the origin and t0 of a slot."""
+        return tuple(self.origin[slot].tolist()), float(self.t0[slot])
+
+    def set_reference(self, slot, origin, t0):
+        self.origin[slot] = origin
+        self.t0[slot] = t0
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import numpy as np
+
+from asteroids import BroadPhase
+from asteroids import Collision
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+class BatchBoard(object):
+    """State of K boards of the same size held in arrays with a leading
+    board axis.
+
+    step applies the ship inputs of all boards, integrates, wraps, culls
+    and resolves collisions for all of them at once, with the same rules
+    as GameBoard.step. Asteroids and projectiles occupy fixed capacity
+    slots per board; the alive masks tell which slots are in use. The
+    broad phase pairs the asteroids and projectiles of all boards in one
+    call.
+    """
+    def __init__(self, size, n_boards, max_asteroids, max_projectiles=64,
+                 ship_size=10., acceleration=1.5,
+                 angular_velocity=0.1*np.pi, broad_phase=None):
+        if not isinstance(size, tuple) and not isinstance(size, list):
+            raise AttributeError("Argument 'size' has to be of type list or tuple")
+        if len(size) != 2:
+            raise AttributeError("Argument 'size' has to be of length 2")
+        self.size = (size[0], size[1])
+        if not isinstance(n_boards, int) or n_boards < 1:
+            raise ValueError("Argument 'n_boards' has to be a positive int")
+        k, a, p = n_boards, max_asteroids, max_projectiles
+        self.n_boards = k
+        if broad_phase is None:
+            broad_phase = BroadPhase.UniformGrid()
+        if not isinstance(broad_phase, BroadPhase.BroadPhase):
+            raise AttributeError("Argument 'broad_phase' has to be of type "
+                                 "'BroadPhase'")
+        self.broad_phase = broad_phase
+
+        self.ship_size = ship_size
+        self.ship_acceleration = acceleration
+        self.ship_angular_velocity = angular_velocity
+        self.ship_position = np.zeros((k, 2))
+        self.ship_angle = np.zeros(k)
+        self.ship_velocity = np.zeros((k, 2))
+        self.ship_sin = np.zeros(k)
+        self.ship_cos = np.ones(k)
+        self.ship_turn = np.zeros(k, dtype=np.int8)
+        self.ship_thrust = np.zeros(k, dtype=np.int8)
+        ship = GamePiece.Ship(ship_size)
+        self._ship_vertices, self._ship_normals = Collision.stack_polygons(
+            [ship._gb_repr])
+        self._ship_radius = ship.bounding_radius
+
+        self.asteroid_position = np.zeros((k, a, 2))
+        self.asteroid_angle = np.zeros((k, a))
+        self.asteroid_velocity = np.zeros((k, a, 2))
+        # Signed angular velocity, i.e. turn times angular velocity.
+        self.asteroid_omega = np.zeros((k, a))
+        self.asteroid_size = np.ones((k, a))
+        self.asteroid_shape = np.zeros((k, a), dtype=np.intp)
+        self.asteroid_alive = np.zeros((k, a), dtype=bool)
+
+        self.projectile_position = np.zeros((k, p, 2))
+        self.projectile_velocity = np.zeros((k, p, 2))
+        self.projectile_alive = np.zeros((k, p), dtype=bool)
+
+        self.gameover = np.zeros(k, dtype=bool)
+        self.score = np.zeros(k, dtype=np.int64)
+        self.ticks = np.zeros(k, dtype=np.int64)
+
+    @classmethod
+    def from_boards(cls, boards, max_asteroids=None, max_projectiles=None,
+                    broad_phase=None):
+        """Creates a batch from GameBoards of equal size with one ship.
+
+        By default the batch holds as many asteroids as the fullest board
+        and as many projectiles as the largest projectile pool, so its
+        boards drop shots only where the GameBoards would.
+        """
+        if any(len(board._ships) != 1 for board in boards):
+            raise ValueError("Every board needs exactly one ship")
+        if max_asteroids is None:
+            max_asteroids = max(len(board._asteroids) for board in boards)
+        if max_projectiles is None:
+            max_projectiles = max(board.projectile_pool.capacity
+                                  for board in boards)
+        batch = cls(boards[0].size, len(boards), max_asteroids,
+                    max_projectiles, ship_size=boards[0]._ship.size,
+                    acceleration=boards[0]._ship._acceleration,
+                    angular_velocity=boards[0]._ship._angular_velocity,
+                    broad_phase=broad_phase)
+        for k, board in enumerate(boards):
+            batch.load_board(k, board)
+        return batch
+
+    def load_board(self, k, board):
+        """Replaces the state of board k with the state of a GameBoard."""
+        if tuple(board.size) != self.size:
+            raise ValueError("Board size does not match the batch")
+        if len(board._asteroids) > self.asteroid_alive.shape[1]:
+            raise ValueError("Board has more asteroids than the batch holds")
+        if len(board._projectiles) > self.projectile_alive.shape[1]:
+            raise ValueError("Board has more projectiles than the batch holds")
+        ship = board._ship
+        pos = ship.position
+        self.ship_position[k] = pos[0], pos[1]
+        self.ship_angle[k] = pos[2]
+        self.ship_velocity[k] = ship.velocity
+        self.ship_cos[k], self.ship_sin[k] = ship._heading()
+        self.ship_turn[k] = ship.turn
+        self.ship_thrust[k] = ship.thrust
+
+        self.asteroid_alive[k] = False
+        for i, asteroid in enumerate(board._asteroids):
+            pos = asteroid.position
+            self.asteroid_position[k, i] = pos[0], pos[1]
+            self.asteroid_angle[k, i] = pos[2]
+            self.asteroid_velocity[k, i] = asteroid.velocity
+            self.asteroid_omega[k, i] = (asteroid.turn *
+                                         asteroid._angular_velocity)
+            self.asteroid_size[k, i] = asteroid.size
+            self.asteroid_shape[k, i] = asteroid.shape_id
+            self.asteroid_alive[k, i] = True
+
+        self.projectile_alive[k] = False
+        for j, projectile in enumerate(board._projectiles):
+            pos = projectile.position
+            self.projectile_position[k, j] = pos[0], pos[1]
+            self.projectile_velocity[k, j] = projectile.velocity
+            self.projectile_alive[k, j] = True
+
+        self.gameover[k] = board.gameover
+        self.score[k] = board.score
+        self.ticks[k] = 0
+
+    def _apply_actions(self, actions):
+        actions = np.asarray(actions).reshape(self.n_boards, 3)
+        turn, thrust, fire = actions[:, 0], actions[:, 1], actions[:, 2]
+        if not np.all(np.isin(turn, (-1, 0, 1))):
+            raise ValueError("'turn' has to be integer -1, 0, or 1")
+        self.ship_turn[:] = turn
+        self.ship_thrust[:] = thrust != 0
+
+        firing = np.nonzero(fire != 0)[0]
+        if len(firing) == 0:
+            return
+        # First free projectile slot of every firing board; boards without
+        # a free slot do not fire, as with an exhausted ProjectilePool.
+        free = ~self.projectile_alive[firing]
+        has_slot = free.any(axis=1)
+        firing = firing[has_slot]
+        slots = np.argmax(free[has_slot], axis=1)
+        cosa, sina = self.ship_cos[firing], self.ship_sin[firing]
+        two_thirds_size = 2. / 3. * self.ship_size
+        self.projectile_position[firing, slots, 0] = (
+            self.ship_position[firing, 0] + cosa * two_thirds_size)
+        self.projectile_position[firing, slots, 1] = (
+            self.ship_position[firing, 1] + sina * two_thirds_size)
+        angle = self.ship_angle[firing]
+        self.projectile_velocity[firing, slots, 0] = (
+            GameBoard.DEFAULT_PROJECTILE_VELO * np.cos(angle))
+        self.projectile_velocity[firing, slots, 1] = (
+            GameBoard.DEFAULT_PROJECTILE_VELO * np.sin(angle))
+        self.projectile_alive[firing, slots] = True
+
+    def _integrate(self, dt):
+        turning = self.ship_turn != 0
+        if turning.any():
+            angle = (self.ship_angle[turning] + self.ship_turn[turning] *
+                     self.ship_angular_velocity * dt) % (2. * np.pi)
+            self.ship_angle[turning] = angle
+            self.ship_sin[turning] = np.sin(angle)
+            self.ship_cos[turning] = np.cos(angle)
+        thrusting = self.ship_thrust != 0
+        if thrusting.any():
+            factor = self.ship_thrust[thrusting] * self.ship_acceleration
+            self.ship_velocity[thrusting, 0] += (
+                factor * self.ship_cos[thrusting] * dt)
+            self.ship_velocity[thrusting, 1] += (
+                factor * self.ship_sin[thrusting] * dt)
+        self.ship_position += self.ship_velocity * dt
+
+        turning = self.asteroid_omega != 0.
+        self.asteroid_angle[turning] = (
+            self.asteroid_angle[turning] +
+            self.asteroid_omega[turning] * dt) % (2. * np.pi)
+        self.asteroid_position += self.asteroid_velocity * dt
+        self.projectile_position += self.projectile_velocity * dt
+
+    def _out_of_bounds(self, position):
+        return ((position[..., 0] < 0.) | (position[..., 0] > self.size[0]) |
+                (position[..., 1] < 0.) | (position[..., 1] > self.size[1]))
+
+    def _wrap(self):
+        for position in (self.asteroid_position, self.ship_position):
+            out = self._out_of_bounds(position)
+            position[out] %= self.size
+        self.projectile_alive &= ~self._out_of_bounds(
+            self.projectile_position)
+
+    def _asteroid_geometry(self, boards, slots, positions, angles):
+        vertices, normals = Collision.stack_shapes(
+            self.asteroid_shape[boards, slots],
+            self.asteroid_size[boards, slots])
+        return Collision.to_world(vertices, normals, np.column_stack(
+            (positions, angles)))
+
+    def _asteroid_radius(self):
+        radii = np.array([GamePiece.shape_template(i).radius
+                          for i in range(GamePiece.shape_count())])
+        return radii[self.asteroid_shape] * self.asteroid_size
+
+    def _resolve_collision(self):
+        radius = self._asteroid_radius()
+
+        # Ships against asteroids.
+        delta = BroadPhase.wrapped_delta(self.ship_position[:, None, :],
+                                         self.asteroid_position, self.size)
+        near = self.asteroid_alive & (
+            (delta**2).sum(axis=2) <= (radius + self._ship_radius)**2)
+        boards, slots = np.nonzero(near)
+        if len(boards):
+            ship_positions = np.column_stack(
+                (self.ship_position[boards], self.ship_angle[boards]))
+            ship_vertices, ship_normals = Collision.to_world(
+                np.repeat(self._ship_vertices, len(boards), axis=0),
+                np.repeat(self._ship_normals, len(boards), axis=0),
+                ship_positions)
+            vertices, normals = self._asteroid_geometry(
+                boards, slots,
+                self.ship_position[boards] + delta[boards, slots],
+                self.asteroid_angle[boards, slots])
+            hit = Collision.polygons_collide(ship_vertices, ship_normals,
+                                             vertices, normals)
+            self.gameover[boards[hit]] = True
+
+        # Asteroids against projectiles.
+        if not self.projectile_alive.any():
+            return
+        boards, slots = np.nonzero(self.asteroid_alive)
+        shot_boards, shots = np.nonzero(self.projectile_alive)
+        ia, ib = self.broad_phase.batched_pairs(
+            boards, self.asteroid_position[boards, slots],
+            radius[boards, slots], shot_boards,
+            self.projectile_position[shot_boards, shots], 0., self.size)
+        if len(ia) == 0:
+            return
+        boards, slots, shots = boards[ia], slots[ia], shots[ib]
+        vertices, normals = self._asteroid_geometry(
+            boards, slots, self.asteroid_position[boards, slots],
+            self.asteroid_angle[boards, slots])
+        points = (self.asteroid_position[boards, slots] +
+                  BroadPhase.wrapped_delta(
+                      self.asteroid_position[boards, slots],
+                      self.projectile_position[boards, shots], self.size))
+        hit = Collision.points_inside(vertices, normals, points)
+        boards, slots, shots = boards[hit], slots[hit], shots[hit]
+        # Same greedy order as GameBoard: every asteroid, from the back,
+        # takes the last projectile that hits it and is still unused.
+        order = np.lexsort((-shots, -slots, boards))
+        used = set()
+        for k, i, j in zip(boards[order].tolist(), slots[order].tolist(),
+                           shots[order].tolist()):
+            if (k, 'a', i) in used or (k, 'p', j) in used:
+                continue
+            used.add((k, 'a', i))
+            used.add((k, 'p', j))
+            self.asteroid_alive[k, i] = False
+            self.projectile_alive[k, j] = False
+            self.score[k] += 1
+
+    def observations(self):
+        """Returns copies of the per-board state arrays."""
+        return {
+            'ship': np.column_stack((self.ship_position, self.ship_angle,
+                                     self.ship_velocity)),
+            'asteroid_position': self.asteroid_position.copy(),
+            'asteroid_velocity': self.asteroid_velocity.copy(),
+            'asteroid_size': self.asteroid_size.copy(),
+            'asteroid_alive': self.asteroid_alive.copy(),
+            'projectile_position': self.projectile_position.copy(),
+            'projectile_alive': self.projectile_alive.copy(),
+            'score': self.score.copy()}
+
+    def step(self, dt, actions):
+        """Advances all boards by dt.
+
+        actions is an integer array of shape (K, 3) holding turn (-1, 0
+        or 1), accelerate (0 or 1) and fire (0 or 1) per board. Returns
+        the observations and the per-board done flags.
+        """
+        self._apply_actions(actions)
+        self._integrate(dt)
+        self._wrap()
+        self._resolve_collision()
+        self.ticks += 1
+        return self.observations(), self.gameover.copy()
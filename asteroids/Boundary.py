@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Boundary policies of a GameBoard.
+
+Once per step the board gathers the poses of all pieces into a
+BoundsBatch and hands it to its policy, which may move pieces with
+batch.set_positions, change their velocities with batch.set_velocities
+and mark asteroids and projectiles for removal with batch.remove. The
+board then writes back only the pieces that changed and removes the
+marked pieces in bulk. Ships cannot be removed.
+"""
+import numpy as np
+
+
+# Kinds of the pieces in a BoundsBatch, also used in snapshots and
+# trajectories.
+KIND_SHIP = 0
+KIND_ASTEROID = 1
+KIND_PROJECTILE = 2
+
+
+class BoundsBatch(object):
+    """Poses of a set of pieces, in the order of pieces.
+
+    velocities and ids are only gathered when a policy reads them.
+    """
+    def __init__(self, board, pieces, kinds, positions):
+        self.board = board
+        self.size = np.array(board.size, dtype=float)
+        self.pieces = pieces
+        self.kinds = kinds
+        self.positions = positions
+        # Masks of the moved and the removed pieces, None if there are
+        # none.
+        self.moved = None
+        self.removed = None
+        self.new_velocities = {}
+        self._velocities = None
+        self._ids = None
+
+    def __len__(self):
+        return len(self.pieces)
+
+    @property
+    def velocities(self):
+        if self._velocities is None:
+            self._velocities = np.array(
+                [piece.velocity for piece in self.pieces],
+                dtype=float).reshape(-1, 2)
+        return self._velocities
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = np.array([self.board.entity_id(piece)
+                                  for piece in self.pieces], dtype=np.int64)
+        return self._ids
+
+    def set_positions(self, mask, xy):
+        """Moves the pieces selected by mask to xy."""
+        self.positions[mask, :2] = xy
+        if self.moved is None:
+            self.moved = np.zeros(len(self.pieces), dtype=bool)
+        self.moved |= mask
+
+    def remove(self, mask):
+        """Marks the pieces selected by mask for removal."""
+        if self.removed is None:
+            self.removed = np.zeros(len(self.pieces), dtype=bool)
+        self.removed |= mask
+
+    def set_velocities(self, mask, velocities):
+        """Sets the velocities of the pieces selected by mask."""
+        for idx, velocity in zip(np.nonzero(mask)[0].tolist(),
+                                 np.asarray(velocities).tolist()):
+            self.new_velocities[idx] = tuple(velocity)
+
+
+class BoundaryPolicy(object):
+    """Base class of the policies. wraps tells whether asteroids are
+    kept on the torus of the board, as analytic boards require."""
+    wraps = False
+
+    def apply(self, batch):
+        raise NotImplementedError
+
+
+def _outside(batch):
+    xy = batch.positions[:, :2]
+    return ((xy < 0.) | (xy > batch.size)).any(axis=1)
+
+
+class Toroidal(BoundaryPolicy):
+    """Asteroids and the ship leaving the board reappear on the opposite
+    side; projectiles leaving it are removed. This is the default."""
+    wraps = True
+
+    def apply(self, batch):
+        out = _outside(batch)
+        if not out.any():
+            return
+        projectile = batch.kinds == KIND_PROJECTILE
+        batch.remove(out & projectile)
+        wrap = out & ~projectile
+        batch.set_positions(wrap, batch.positions[wrap, :2] % batch.size)
+
+
+class Arena(BoundaryPolicy):
+    """A board with walls: asteroids and the ship are mirrored back onto
+    the board and bounce off, projectiles are removed."""
+    def apply(self, batch):
+        out = _outside(batch)
+        if not out.any():
+            return
+        projectile = batch.kinds == KIND_PROJECTILE
+        batch.remove(out & projectile)
+        bounce = out & ~projectile
+        if not bounce.any():
+            return
+        pos = batch.positions[bounce, :2]
+        velocities = batch.velocities[bounce].copy()
+        for axis in (0, 1):
+            size = batch.size[axis]
+            low = pos[:, axis] < 0.
+            high = pos[:, axis] > size
+            pos[low, axis] = -pos[low, axis]
+            pos[high, axis] = 2. * size - pos[high, axis]
+            velocities[low, axis] = np.abs(velocities[low, axis])
+            velocities[high, axis] = -np.abs(velocities[high, axis])
+        # Pieces faster than the board is wide could still be outside.
+        batch.set_positions(bounce, np.clip(pos, 0., batch.size))
+        batch.set_velocities(bounce, velocities)
+
+
+class ProjectileRange(BoundaryPolicy):
+    """Removes projectiles that flew further than max_distance or longer
+    than max_age since they were first seen, on top of the policy base.
+
+    Projectiles move at constant velocity, so their age follows from the
+    distance to the point where they were first seen.
+    """
+    def __init__(self, max_distance=None, max_age=None, base=None):
+        if max_distance is None and max_age is None:
+            raise ValueError("One of 'max_distance' and 'max_age' is "
+                             "required")
+        if base is None:
+            base = Toroidal()
+        if not isinstance(base, BoundaryPolicy):
+            raise ValueError("Argument 'base' has to be a BoundaryPolicy")
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.base = base
+        self.wraps = base.wraps
+        self._origins = {}
+
+    def apply(self, batch):
+        self.base.apply(batch)
+        projectile = np.nonzero(batch.kinds == KIND_PROJECTILE)[0]
+        if not len(projectile):
+            return
+        ids = batch.ids[projectile].tolist()
+        positions = batch.positions[projectile, :2]
+        origins = self._origins
+        for entity_id, position in zip(ids, positions.tolist()):
+            if entity_id not in origins:
+                origins[entity_id] = position
+        if len(origins) > 2 * len(ids):
+            # Drop the origins of removed projectiles.
+            self._origins = origins = {
+                entity_id: origins[entity_id] for entity_id in ids}
+        distance = np.hypot(*(positions - np.array(
+            [origins[entity_id] for entity_id in ids])).T)
+        expired = np.zeros(len(ids), dtype=bool)
+        if self.max_distance is not None:
+            expired |= distance > self.max_distance
+        if self.max_age is not None:
+            speed = np.hypot(*batch.velocities[projectile].T)
+            expired |= distance > self.max_age * speed
+        mask = np.zeros(len(batch), dtype=bool)
+        mask[projectile[expired]] = True
+        batch.remove(mask)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import numpy as np
+
+
+def _as_arrays(pos_a, radius_a, pos_b, radius_b):
+    pos_a = np.asarray(pos_a, dtype=float).reshape(-1, 2)
+    pos_b = np.asarray(pos_b, dtype=float).reshape(-1, 2)
+    radius_a = np.broadcast_to(np.asarray(radius_a, dtype=float),
+                               (len(pos_a),))
+    radius_b = np.broadcast_to(np.asarray(radius_b, dtype=float),
+                               (len(pos_b),))
+    return pos_a, radius_a, pos_b, radius_b
+
+
+def wrapped_delta(pos_a, pos_b, size):
+    """Shortest vector from pos_a to pos_b on a torus of the given size."""
+    size = np.asarray(size, dtype=float)
+    delta = np.asarray(pos_b, dtype=float) - np.asarray(pos_a, dtype=float)
+    return delta - size * np.round(delta / size)
+
+
+def _empty_pairs():
+    return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+
+def _filter_by_distance(ia, ib, pos_a, radius_a, pos_b, radius_b, size):
+    delta = wrapped_delta(pos_a[ia], pos_b[ib], size)
+    reach = radius_a[ia] + radius_b[ib]
+    keep = (delta[:, 0]**2 + delta[:, 1]**2) <= reach**2
+    return ia[keep], ib[keep]
+
+
+def _expand_ranges(owners, starts, stops):
+    """Turns the half-open ranges [starts, stops) into flat index pairs."""
+    counts = np.maximum(stops - starts, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return _empty_pairs()
+    first = np.cumsum(counts) - counts
+    offset = np.arange(total) - np.repeat(first, counts)
+    return np.repeat(owners, counts), np.repeat(starts, counts) + offset
+
+
+def _unique_pairs(ia, ib, n_b):
+    key = np.unique(ia.astype(np.int64) * max(n_b, 1) + ib)
+    return (key // max(n_b, 1)).astype(np.intp), (key % max(n_b, 1)).astype(
+        np.intp)
+
+
+class BroadPhase(object):
+    """Base class of the collision broad phases.
+
+    A broad phase receives the centres and bounding radii of two groups of
+    pieces and returns two index arrays (ia, ib) of candidate pairs. Every
+    pair whose bounding circles overlap on the toroidal board of the given
+    size has to be part of the result; the exact test is left to the
+    caller.
+    """
+    def candidate_pairs(self, pos_a, radius_a, pos_b, radius_b, size):
+        raise NotImplementedError
+
+    def batched_pairs(self, board_a, pos_a, radius_a, board_b, pos_b,
+                      radius_b, size):
+        """Candidate pairs of pieces on several boards of the same size,
+        where board_a and board_b tell the board of every piece. Only
+        pieces on the same board are paired.
+
+        The default tests every pair on the same board.
+        """
+        pos_a, radius_a, pos_b, radius_b = _as_arrays(
+            pos_a, radius_a, pos_b, radius_b)
+        if len(pos_a) == 0 or len(pos_b) == 0:
+            return _empty_pairs()
+        board_b = np.asarray(board_b)
+        order = np.argsort(board_b, kind='stable')
+        sorted_boards = board_b[order]
+        starts = np.searchsorted(sorted_boards, board_a, side='left')
+        stops = np.searchsorted(sorted_boards, board_a, side='right')
+        ia, ib = _expand_ranges(np.arange(len(pos_a), dtype=np.intp),
+                                starts, stops)
+        return _filter_by_distance(ia, order[ib], pos_a, radius_a,
+                                   pos_b, radius_b, size)
+
+
+class BruteForce(BroadPhase):
+    """Returns every pair; this is the behaviour without a broad phase."""
+    def candidate_pairs(self, pos_a, radius_a, pos_b, radius_b, size):
+        n_a, n_b = len(pos_a), len(pos_b)
+        ia = np.repeat(np.arange(n_a, dtype=np.intp), n_b)
+        ib = np.tile(np.arange(n_b, dtype=np.intp), n_a)
+        return ia, ib
+
+
+class UniformGrid(BroadPhase):
+    """Hashes group b into a uniform grid covering the board.
+
+    The cell size defaults to the largest possible reach of a pair, so only
+    the 3x3 neighbourhood of a cell has to be searched. Cell indices wrap
+    around the board edges. Groups with fewer than brute_force_below pairs
+    are tested directly, since building the grid costs more than that.
+    """
+    def __init__(self, cell_size=None, brute_force_below=256):
+        if cell_size is not None and cell_size <= 0.:
+            raise ValueError("Argument 'cell_size' has to be positive")
+        self.cell_size = cell_size
+        self.brute_force_below = brute_force_below
+
+    def _cells(self, size, reach):
+        cell_size = self.cell_size
+        if cell_size is None or cell_size < reach:
+            cell_size = reach
+        if cell_size <= 0.:
+            cell_size = min(size) / 64.
+        return (max(int(size[0] // cell_size), 1),
+                max(int(size[1] // cell_size), 1))
+
+    def candidate_pairs(self, pos_a, radius_a, pos_b, radius_b, size):
+        pos_a, radius_a, pos_b, radius_b = _as_arrays(
+            pos_a, radius_a, pos_b, radius_b)
+        if len(pos_a) == 0 or len(pos_b) == 0:
+            return _empty_pairs()
+        reach = radius_a.max() + radius_b.max()
+        nx, ny = self._cells(size, reach)
+        if (nx < 3 or ny < 3 or
+                len(pos_a) * len(pos_b) < self.brute_force_below):
+            # The neighbourhood would cover the whole board.
+            ia, ib = BruteForce().candidate_pairs(
+                pos_a, radius_a, pos_b, radius_b, size)
+            return _filter_by_distance(ia, ib, pos_a, radius_a,
+                                       pos_b, radius_b, size)
+        return self._grid_pairs(pos_a, radius_a, pos_b, radius_b, size,
+                                nx, ny)
+
+    def batched_pairs(self, board_a, pos_a, radius_a, board_b, pos_b,
+                      radius_b, size):
+        """Hashes the pieces of all boards into one grid whose keys start
+        with the board."""
+        pos_a, radius_a, pos_b, radius_b = _as_arrays(
+            pos_a, radius_a, pos_b, radius_b)
+        if len(pos_a) == 0 or len(pos_b) == 0:
+            return _empty_pairs()
+        reach = radius_a.max() + radius_b.max()
+        nx, ny = self._cells(size, reach)
+        if (nx < 3 or ny < 3 or
+                len(pos_a) * len(pos_b) < self.brute_force_below):
+            return BroadPhase.batched_pairs(self, board_a, pos_a, radius_a,
+                                            board_b, pos_b, radius_b, size)
+        return self._grid_pairs(pos_a, radius_a, pos_b, radius_b, size,
+                                nx, ny, board_a, board_b)
+
+    def _grid_pairs(self, pos_a, radius_a, pos_b, radius_b, size, nx, ny,
+                    board_a=0, board_b=0):
+        scale = np.array([nx / size[0], ny / size[1]])
+        cell_a = np.floor((pos_a % size) * scale).astype(np.intp)
+        cell_b = np.floor((pos_b % size) * scale).astype(np.intp)
+        cell_a %= (nx, ny)
+        cell_b %= (nx, ny)
+        # Cells of different boards get different keys.
+        offset_a = np.asarray(board_a, dtype=np.intp) * (nx * ny)
+        key_b = (np.asarray(board_b, dtype=np.intp) * (nx * ny) +
+                 cell_b[:, 0] * ny + cell_b[:, 1])
+        order = np.argsort(key_b, kind='stable')
+        sorted_keys = key_b[order]
+
+        owners = np.arange(len(pos_a), dtype=np.intp)
+        all_ia, all_ib = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                key = (offset_a + ((cell_a[:, 0] + dx) % nx) * ny +
+                       (cell_a[:, 1] + dy) % ny)
+                starts = np.searchsorted(sorted_keys, key, side='left')
+                stops = np.searchsorted(sorted_keys, key, side='right')
+                ia, ib = _expand_ranges(owners, starts, stops)
+                all_ia.append(ia)
+                all_ib.append(order[ib])
+        ia = np.concatenate(all_ia)
+        ib = np.concatenate(all_ib)
+        return _filter_by_distance(ia, ib, pos_a, radius_a,
+                                   pos_b, radius_b, size)
+
+
+class SweepAndPrune(BroadPhase):
+    """Sorts group a along x and sweeps the intervals of group b over it.
+
+    Intervals of a that come within the largest radius of b of the left
+    or right board edge are duplicated on the opposite side, which handles
+    the toroidal wrap along x; the final distance test handles the wrap
+    along y.
+    """
+    def __init__(self, chunk_size=1 << 20):
+        if chunk_size < 1:
+            raise ValueError("Argument 'chunk_size' has to be positive")
+        self.chunk_size = chunk_size
+
+    def candidate_pairs(self, pos_a, radius_a, pos_b, radius_b, size):
+        pos_a, radius_a, pos_b, radius_b = _as_arrays(
+            pos_a, radius_a, pos_b, radius_b)
+        if len(pos_a) == 0 or len(pos_b) == 0:
+            return _empty_pairs()
+        width = float(size[0])
+        x_a = pos_a[:, 0] % width
+        x_b = pos_b[:, 0] % width
+        owner = np.arange(len(pos_a), dtype=np.intp)
+
+        # Ghost copies for intervals that may reach a piece of b across
+        # the seam.
+        reach = radius_a + radius_b.max()
+        left = x_a - reach < 0.
+        right = x_a + reach > width
+        x_a = np.concatenate((x_a, x_a[left] + width, x_a[right] - width))
+        owner = np.concatenate((owner, owner[left], owner[right]))
+        has_ghosts = len(owner) > len(pos_a)
+        r_a = radius_a[owner]
+
+        lo_a = x_a - r_a
+        order = np.argsort(lo_a, kind='stable')
+        lo_sorted = lo_a[order]
+        # An interval of a overlaps [lo_b, hi_b] only if its lower bound
+        # lies within [lo_b - 2 max(r_a), hi_b].
+        max_width = 2. * r_a.max()
+        starts = np.searchsorted(lo_sorted, x_b - radius_b - max_width,
+                                 side='left')
+        stops = np.searchsorted(lo_sorted, x_b + radius_b, side='right')
+        # Only the x intervals are pruned by the sweep, so the candidate
+        # count grows with the board density. Expand and filter in chunks
+        # to keep the temporary arrays bounded.
+        counts = np.maximum(stops - starts, 0)
+        bounds = np.searchsorted(np.cumsum(counts),
+                                 np.arange(0, counts.sum(), self.chunk_size),
+                                 side='right')
+        bounds = np.append(np.unique(bounds), len(pos_b))
+        all_ia, all_ib = [], []
+        begin = 0
+        for end in bounds:
+            if end <= begin:
+                continue
+            ib, idx = _expand_ranges(
+                np.arange(begin, end, dtype=np.intp), starts[begin:end],
+                stops[begin:end])
+            ia, ib = _filter_by_distance(owner[order[idx]], ib, pos_a,
+                                         radius_a, pos_b, radius_b, size)
+            if has_ghosts:
+                ia, ib = _unique_pairs(ia, ib, len(pos_b))
+            all_ia.append(ia)
+            all_ib.append(ib)
+            begin = end
+        if not all_ia:
+            return _empty_pairs()
+        return np.concatenate(all_ia), np.concatenate(all_ib)
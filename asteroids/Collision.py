@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Batched separating axis tests.
+
+Polygons are passed as padded arrays: vertices of shape (N, V, 2) and side
+normals of shape (N, V, 2). Polygons with less than V vertices repeat their
+last vertex and their first normal, which changes neither the projection
+intervals nor the set of separating axes.
+"""
+import numpy as np
+
+from asteroids import GamePiece
+
+
+_padded_shapes = None
+
+
+def stack_polygons(polygons, n_vertices=None):
+    """Stacks ConvexPolygons into padded vertex and normal arrays."""
+    if n_vertices is None:
+        n_vertices = max([len(poly.xy) for poly in polygons] or [1])
+    vertices = np.empty((len(polygons), n_vertices, 2))
+    normals = np.empty((len(polygons), n_vertices, 2))
+    for i, poly in enumerate(polygons):
+        count = len(poly.xy)
+        vertices[i, :count] = poly.xy
+        vertices[i, count:] = poly.xy[-1]
+        normals[i, :count] = poly.side_normal
+        normals[i, count:] = poly.side_normal[0]
+    return vertices, normals
+
+
+def stack_shapes(shape_ids, scales):
+    """Stacks registered shapes scaled by scales into padded arrays.
+
+    Unlike stack_polygons this needs no loop over the pieces: the padded
+    outlines of all registered shapes are built once and indexed.
+    """
+    global _padded_shapes
+    if (_padded_shapes is None or
+            len(_padded_shapes[0]) != GamePiece.shape_count()):
+        templates = [GamePiece.shape_template(i)
+                     for i in range(GamePiece.shape_count())]
+        _padded_shapes = stack_polygons(templates)
+    shape_ids = np.asarray(shape_ids, dtype=np.intp)
+    scales = np.asarray(scales, dtype=float)[:, None, None]
+    return _padded_shapes[0][shape_ids] * scales, _padded_shapes[1][shape_ids]
+
+
+def to_world(vertices, normals, positions):
+    """Rotates local polygons by the angle of positions (N, 3) and moves
+    them to its x, y coordinates."""
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    cosa = np.cos(positions[:, 2])[:, None]
+    sina = np.sin(positions[:, 2])[:, None]
+    world_vertices = np.empty_like(vertices)
+    world_vertices[..., 0] = (vertices[..., 0] * cosa -
+                              vertices[..., 1] * sina + positions[:, 0:1])
+    world_vertices[..., 1] = (vertices[..., 0] * sina +
+                              vertices[..., 1] * cosa + positions[:, 1:2])
+    world_normals = np.empty_like(normals)
+    world_normals[..., 0] = normals[..., 0] * cosa - normals[..., 1] * sina
+    world_normals[..., 1] = normals[..., 0] * sina + normals[..., 1] * cosa
+    return world_vertices, world_normals
+
+
+def _intervals(vertices, axes):
+    projections = np.einsum('nvk,nak->nva', vertices, axes)
+    return projections.min(axis=1), projections.max(axis=1)
+
+
+def polygons_collide(vertices_a, normals_a, vertices_b, normals_b):
+    """Returns a boolean mask telling which of the N polygon pairs overlap.
+
+    Touching polygons do not collide, as in ConvexPolygon.collides.
+    """
+    if len(vertices_a) == 0:
+        return np.zeros(0, dtype=bool)
+    axes = np.concatenate((normals_a, normals_b), axis=1)
+    min_a, max_a = _intervals(vertices_a, axes)
+    min_b, max_b = _intervals(vertices_b, axes)
+    return np.all((max_a > min_b) & (min_a < max_b), axis=1)
+
+
+def points_inside(vertices, normals, points):
+    """Returns a boolean mask telling which of the N points (N, 2) lie
+    strictly inside their polygon, as in ConvexPolygon.point_inside."""
+    if len(vertices) == 0:
+        return np.zeros(0, dtype=bool)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    min_a, max_a = _intervals(vertices, normals)
+    projected = np.einsum('nk,nak->na', points, normals)
+    return np.all((min_a < projected) & (projected < max_a), axis=1)
+
+
+def swept_points(vertices, normals, points, displacements):
+    """Tests the N points that moved by displacements (N, 2) during a step
+    and ended at points (N, 2) against their polygon.
+
+    The polygons are taken as fixed, so displacements have to be relative
+    to them. Returns a boolean mask telling which segments pass strictly
+    inside their polygon, and for those the time of impact as a fraction
+    of the step: 0 if the point started inside, 1 at the end of the step.
+    For zero displacements the mask equals points_inside.
+    """
+    if len(vertices) == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    displacements = np.asarray(displacements, dtype=float).reshape(-1, 2)
+    min_a, max_a = _intervals(vertices, normals)
+    # Projections of the start point and of the displacement per axis.
+    start = np.einsum('nk,nak->na', points - displacements, normals)
+    speed = np.einsum('nk,nak->na', displacements, normals)
+    moving = speed != 0.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_min = (min_a - start) / speed
+        t_max = (max_a - start) / speed
+    inside = (min_a < start) & (start < max_a)
+    enter = np.where(moving, np.minimum(t_min, t_max),
+                     np.where(inside, -np.inf, np.inf))
+    leave = np.where(moving, np.maximum(t_min, t_max),
+                     np.where(inside, np.inf, -np.inf))
+    enter = np.maximum(enter.max(axis=1), 0.)
+    leave = np.minimum(leave.min(axis=1), 1.)
+    hit = enter < leave
+    return hit, np.where(hit, enter, np.inf)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+
+
+class EntityRegistry(object):
+    """Dense, unordered collection of entities with stable integer ids.
+
+    Entities are stored in one list. Removing an entity moves the last one
+    into its place, so insert, delete and membership tests are O(1).
+    Removal can be deferred: kill only marks an entity, and flush removes
+    all marked entities in one sweep. Until then the entity list is not
+    modified, so it can be iterated without copying it.
+    """
+    def __init__(self):
+        self._items = []
+        self._ids = []
+        self._index = {}
+        self._by_id = {}
+        self._dead = {}
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, idx):
+        return self._items[idx]
+
+    def __contains__(self, obj):
+        return obj in self._index
+
+    @property
+    def items(self):
+        """The entity list itself. It stays valid until the next flush."""
+        return self._items
+
+    @property
+    def ids(self):
+        """The ids of the entities, in the order of items."""
+        return self._ids
+
+    @property
+    def next_id(self):
+        return self._next_id
+
+    @next_id.setter
+    def next_id(self, value):
+        if value < self._next_id:
+            raise ValueError("Entity ids cannot be handed out again")
+        self._next_id = value
+
+    def append(self, obj, entity_id=None):
+        """Adds obj and returns its id.
+
+        An explicit entity_id is used to restore saved registries; it must
+        not be in use.
+        """
+        if obj in self._index:
+            raise ValueError("Entity is already registered")
+        if entity_id is None:
+            entity_id = self._next_id
+        elif entity_id in self._by_id:
+            raise ValueError("Entity id {0:d} is in use".format(entity_id))
+        self._next_id = max(self._next_id, entity_id + 1)
+        self._index[obj] = len(self._items)
+        self._items.append(obj)
+        self._ids.append(entity_id)
+        self._by_id[entity_id] = obj
+        return entity_id
+
+    def extend(self, objs):
+        """Adds objs with consecutive new ids and returns the ids."""
+        objs = list(objs)
+        if not self._index.keys().isdisjoint(objs) or (
+                len(set(objs)) != len(objs)):
+            raise ValueError("Entity is already registered")
+        first = self._next_id
+        ids = list(range(first, first + len(objs)))
+        start = len(self._items)
+        self._index.update(zip(objs, range(start, start + len(objs))))
+        self._items.extend(objs)
+        self._ids.extend(ids)
+        self._by_id.update(zip(ids, objs))
+        self._next_id = first + len(objs)
+        return ids
+
+    def id_of(self, obj):
+        return self._ids[self._index[obj]]
+
+    def get(self, entity_id):
+        return self._by_id[entity_id]
+
+    def has_id(self, entity_id):
+        return entity_id in self._by_id
+
+    def remove(self, obj):
+        """Removes obj at once."""
+        idx = self._index.pop(obj)
+        del self._by_id[self._ids[idx]]
+        self._dead.pop(obj, None)
+        last = self._items.pop()
+        last_id = self._ids.pop()
+        if idx < len(self._items):
+            self._items[idx] = last
+            self._ids[idx] = last_id
+            self._index[last] = idx
+
+    def kill(self, obj):
+        """Marks obj for removal by the next flush."""
+        if obj not in self._index:
+            raise ValueError("Entity is not registered")
+        self._dead[obj] = None
+
+    def is_alive(self, obj):
+        return obj in self._index and obj not in self._dead
+
+    @property
+    def pending(self):
+        return len(self._dead)
+
+    def flush(self):
+        """Removes all killed entities and returns them in kill order."""
+        dead = list(self._dead)
+        for obj in dead:
+            self.remove(obj)
+        return dead
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Event-driven stepping of an analytic GameBoard.
+
+Instead of checking every piece on every tick of the fixed timestep, the
+EventSimulator keeps a priority queue with the earliest tick at which
+something can happen to a piece or a pair of pieces: a projectile
+leaving the board, or a projectile or the ship touching the bounding
+circle of an asteroid. The board then jumps straight to the next such
+tick, where only the pieces of the due events are checked, with the same
+tests as GameBoard.step. Because the analytic pieces move in closed form,
+a jump costs the same for any number of ticks.
+
+Queue entries carry the versions of their pieces at the time they were
+pushed. Removing a piece or invalidating it, e.g. on a ship input, makes
+only its own entries stale; they are dropped when they reach the head of
+the queue.
+"""
+import heapq
+import itertools
+
+import numpy as np
+
+from asteroids import Boundary
+from asteroids import BroadPhase
+from asteroids import Collision
+from asteroids import GamePiece
+
+
+EVENT_EXIT = 0
+EVENT_PROJECTILE = 1
+EVENT_SHIP = 2
+
+# Relative slack of the bounding circle test, against rounding.
+_SLACK = 1e-9
+
+
+class EventSimulator(object):
+    """Advances a GameBoard created with analytic=True by whole ticks of
+    dt, visiting only the ticks with due events.
+
+    Ship inputs have to go through the ship_* methods of the simulator.
+    While the ship thrusts its motion has no closed form, so the board
+    is stepped tick by tick. Step sinks of the board are only called on
+    those ticks.
+    """
+    def __init__(self, board, dt):
+        if board._analytic is None:
+            raise ValueError("Event-driven mode needs a GameBoard with "
+                             "analytic=True")
+        if type(board.boundary) is not Boundary.Toroidal:
+            raise ValueError("Event-driven mode only supports the "
+                             "Toroidal boundary policy")
+        if board.splitter is not None or board.spawner is not None:
+            raise ValueError("Event-driven mode does not support splitting "
+                             "or waves")
+        if board.max_ships > 1:
+            raise ValueError("Event-driven mode supports only one ship")
+        if dt <= 0.:
+            raise ValueError("Argument 'dt' has to be positive")
+        self.board = board
+        self.dt = dt
+        self.tick = 0
+        # Number of queue entries handled and of ticks visited.
+        self.events = 0
+        self.visited = 0
+        self._queue = []
+        self._counter = itertools.count()
+        self._versions = {}
+        self._dirty = set()
+        self._seen = 0
+        # Last tick on which the whole board was stepped and checked.
+        self._full_tick = -1
+
+    def __len__(self):
+        return len(self._queue)
+
+    def invalidate(self, entity_id):
+        """Drops the queued events of a piece and schedules it again."""
+        self._versions[entity_id] = self._versions.get(entity_id, 0) + 1
+        self._dirty.add(entity_id)
+
+    def ship_turn(self, direction):
+        self.board.ship_turn(direction)
+        self.invalidate(self.board.entity_id(self.board._ship))
+
+    def ship_accelerate(self, value):
+        self.board.ship_accelerate(value)
+        self.invalidate(self.board.entity_id(self.board._ship))
+
+    def ship_fire(self):
+        # The new projectile is picked up as a new entity.
+        return self.board.ship_fire()
+
+    def _push(self, tick, kind, first, second=None):
+        versions = (self._versions.get(first, 0),
+                    self._versions.get(second, 0))
+        heapq.heappush(self._queue, (tick, next(self._counter), kind, first,
+                                     second, versions))
+
+    def _valid(self, entry):
+        registry = self.board.moving_objects
+        _, _, _, first, second, versions = entry
+        if not registry.has_id(first) or versions[0] != self._versions.get(
+                first, 0):
+            return False
+        if second is None:
+            return True
+        return (registry.has_id(second) and
+                versions[1] == self._versions.get(second, 0))
+
+    def _exit_tick(self, projectile):
+        x, y, _ = projectile.position
+        vx, vy = projectile.velocity
+        ticks = []
+        for pos, velo, size in ((x, vx, self.board.size[0]),
+                                (y, vy, self.board.size[1])):
+            if velo > 0.:
+                ticks.append((size - pos) / (velo * self.dt))
+            elif velo < 0.:
+                ticks.append(pos / (-velo * self.dt))
+        if not ticks:
+            return None
+        # Projectiles already outside, e.g. fired from a gun position
+        # off the board, leave on the next tick, as in GameBoard.step.
+        return self.tick + max(int(np.floor(min(ticks))), 0) + 1
+
+    def _gap(self, asteroid, other):
+        """Distance between the bounding circles on the torus, and the
+        relative speed."""
+        pos_a = asteroid.position
+        pos_b = other.position
+        delta = BroadPhase.wrapped_delta(pos_a[:2], pos_b[:2],
+                                         self.board.size)
+        radius = asteroid.bounding_radius + other.bounding_radius
+        gap = np.hypot(*delta) - radius * (1. + _SLACK) - _SLACK
+        velo_a = asteroid.velocity
+        velo_b = other.velocity
+        speed = np.hypot(velo_b[0] - velo_a[0], velo_b[1] - velo_a[1])
+        return gap, speed
+
+    def _pair_tick(self, asteroid, other):
+        # The distance on the torus changes at most with the relative
+        # speed, so the circles cannot touch before gap / speed.
+        gap, speed = self._gap(asteroid, other)
+        if gap <= 0.:
+            return self.tick + 1
+        if speed == 0.:
+            return None
+        return self.tick + max(1, int(np.ceil(gap / (speed * self.dt))))
+
+    def _schedule(self, kind, first, second=None):
+        registry = self.board.moving_objects
+        if kind == EVENT_EXIT:
+            tick = self._exit_tick(registry.get(first))
+        else:
+            tick = self._pair_tick(registry.get(first), registry.get(second))
+        if tick is not None:
+            self._push(tick, kind, first, second)
+
+    def _schedule_pieces(self, entity_ids):
+        """Schedules all events of the given pieces, each pair once."""
+        board = self.board
+        registry = board.moving_objects
+        ship = board._ship
+        ship_id = board.entity_id(ship) if ship is not None else None
+        done = set()
+        for entity_id in sorted(entity_ids):
+            if not registry.has_id(entity_id):
+                continue
+            piece = registry.get(entity_id)
+            if isinstance(piece, GamePiece.Projectile):
+                self._schedule(EVENT_EXIT, entity_id)
+                for asteroid in board._asteroids:
+                    asteroid_id = board.entity_id(asteroid)
+                    if asteroid_id not in done:
+                        self._schedule(EVENT_PROJECTILE, asteroid_id,
+                                       entity_id)
+            elif isinstance(piece, GamePiece.AsteroidBase):
+                for projectile in board._projectiles:
+                    projectile_id = board.entity_id(projectile)
+                    if projectile_id not in done:
+                        self._schedule(EVENT_PROJECTILE, entity_id,
+                                       projectile_id)
+                if (ship_id is not None and ship_id not in done and
+                        not ship.thrust):
+                    self._schedule(EVENT_SHIP, entity_id, ship_id)
+            elif piece is ship and not ship.thrust:
+                for asteroid in board._asteroids:
+                    asteroid_id = board.entity_id(asteroid)
+                    if asteroid_id not in done:
+                        self._schedule(EVENT_SHIP, asteroid_id, entity_id)
+            done.add(entity_id)
+
+    def _update(self):
+        """Schedules new pieces and invalidated ones."""
+        registry = self.board.moving_objects
+        pending = set(self._dirty)
+        pending.update(range(self._seen, registry.next_id))
+        self._seen = registry.next_id
+        ship = self.board._ship
+        self._dirty = set()
+        if ship is not None and ship.thrust:
+            # Scheduled once the ship stops thrusting.
+            ship_id = self.board.entity_id(ship)
+            if ship_id in pending:
+                self._dirty.add(ship_id)
+        if pending:
+            self._schedule_pieces(pending)
+
+    def _jump(self, ticks):
+        board = self.board
+        board._analytic.step(ticks * self.dt)
+        if board._ship is not None:
+            board._ship.step(ticks * self.dt)
+            board._ship_out_of_bounds()
+        self.tick += ticks
+
+    def _full_step(self):
+        self.board.step(self.dt)
+        self.tick += 1
+        self.visited += 1
+        self._full_tick = self.tick
+        ship = self.board._ship
+        if ship is not None:
+            self.invalidate(self.board.entity_id(ship))
+
+    def _process(self):
+        """Handles all events due at the current tick."""
+        board = self.board
+        registry = board.moving_objects
+        exits, ships, pairs = [], [], []
+        while self._queue and self._queue[0][0] <= self.tick:
+            entry = heapq.heappop(self._queue)
+            self.events += 1
+            if not self._valid(entry):
+                continue
+            tick, _, kind, first, second, _ = entry
+            if tick < self.tick or self.tick == self._full_tick:
+                # Already checked by a full step; look ahead again.
+                self._schedule(kind, first, second)
+            elif kind == EVENT_EXIT:
+                exits.append(first)
+            elif kind == EVENT_SHIP:
+                ships.append((first, second))
+            else:
+                pairs.append((first, second))
+        if not (exits or ships or pairs):
+            return
+        self.visited += 1
+
+        for projectile_id in exits:
+            projectile = registry.get(projectile_id)
+            pos = projectile.position
+            if (pos[0] < 0. or pos[0] > board.size[0] or
+                    pos[1] < 0. or pos[1] > board.size[1]):
+                board._kill(board._projectiles, projectile)
+            else:
+                self._schedule(EVENT_EXIT, projectile_id)
+        board._flush()
+
+        for asteroid_id, ship_id in ships:
+            asteroid = registry.get(asteroid_id)
+            if (self._gap(asteroid, board._ship)[0] <= 0. and
+                    self._ship_hits(asteroid)):
+                board.gameover = True
+            self._schedule(EVENT_SHIP, asteroid_id, ship_id)
+
+        hits = []
+        for asteroid_id, projectile_id in pairs:
+            if not registry.has_id(projectile_id):
+                continue
+            asteroid = registry.get(asteroid_id)
+            projectile = registry.get(projectile_id)
+            if (self._gap(asteroid, projectile)[0] <= 0. and
+                    self._projectile_hits(asteroid, projectile)):
+                hits.append((board._asteroids._index[asteroid],
+                             board._projectiles._index[projectile],
+                             asteroid_id, projectile_id))
+            else:
+                self._schedule(EVENT_PROJECTILE, asteroid_id, projectile_id)
+        # Same greedy order as GameBoard._resolve_collision.
+        hits.sort(key=lambda hit: (-hit[0], -hit[1]))
+        used = set()
+        for _, _, asteroid_id, projectile_id in hits:
+            if asteroid_id in used or projectile_id in used:
+                self._schedule(EVENT_PROJECTILE, asteroid_id, projectile_id)
+                continue
+            used.add(asteroid_id)
+            used.add(projectile_id)
+            board._kill(board._asteroids, registry.get(asteroid_id))
+            board._kill(board._projectiles, registry.get(projectile_id))
+            board.score += 1
+        board._flush()
+
+    def _asteroid_world(self, asteroid, position):
+        vertices, normals = self.board._asteroid_polygons([asteroid])
+        return Collision.to_world(vertices, normals, position)
+
+    def _projectile_hits(self, asteroid, projectile):
+        pos = asteroid.position
+        near = np.array(pos[:2]) + BroadPhase.wrapped_delta(
+            pos[:2], projectile.position[:2], self.board.size)
+        vertices, normals = self._asteroid_world(asteroid, pos)
+        return bool(Collision.points_inside(vertices, normals, near)[0])
+
+    def _ship_hits(self, asteroid):
+        ship = self.board._ship
+        ship_pos = ship.position
+        pos = asteroid.position
+        near = np.array(ship_pos[:2]) + BroadPhase.wrapped_delta(
+            ship_pos[:2], pos[:2], self.board.size)
+        ship_vertices, ship_normals = Collision.to_world(
+            *Collision.stack_polygons([ship._gb_repr]), positions=ship_pos)
+        vertices, normals = self._asteroid_world(
+            asteroid, (near[0], near[1], pos[2]))
+        return bool(Collision.polygons_collide(ship_vertices, ship_normals,
+                                               vertices, normals)[0])
+
+    def advance(self, ticks, stop_on_gameover=False):
+        """Advances the board by ticks steps of dt and returns the number
+        of ticks done."""
+        if not isinstance(ticks, int) or ticks < 0:
+            raise ValueError("Argument 'ticks' has to be a non-negative int")
+        start = self.tick
+        target = self.tick + ticks
+        while self.tick < target:
+            if stop_on_gameover and self.board.gameover:
+                break
+            self._update()
+            ship = self.board._ship
+            if ship is not None and ship.thrust:
+                self._full_step()
+                continue
+            if self._queue:
+                next_tick = max(min(self._queue[0][0], target), self.tick)
+            else:
+                next_tick = target
+            if next_tick > self.tick:
+                self._jump(next_tick - self.tick)
+            self._process()
+        return self.tick - start
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Runs many independent boards on a pool of worker processes.
+
+Boards are built inside the workers from their seeds and never pickled.
+With a root seed, the seeds are indices of child seeds of the root, see
+RandomStreams.board_seed, so any number of boards spread over any number
+of workers get independent and reproducible random streams.
+Workers write their per-board results into a shared memory array that
+the parent reads once all shards are done.
+"""
+import concurrent.futures
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from asteroids import RandomStreams
+from asteroids import Runner
+
+
+RESULT_DTYPE = np.dtype([
+    ('seed', np.int64),
+    ('gameover', np.bool_),
+    ('score', np.int64),
+    ('ticks', np.int64),
+    ('asteroids', np.int32),
+    ('projectiles', np.int32),
+    ('seconds', np.float64)])
+
+# Set in every worker by _init_worker.
+_shared = None
+
+
+def _results_view(buffer, count):
+    return np.frombuffer(buffer, dtype=RESULT_DTYPE, count=count)
+
+
+def _init_worker(buffer, count, config):
+    global _shared
+    _shared = (_results_view(buffer, count), config)
+
+
+def _run_shard(indices):
+    """Builds and steps the boards of one shard, interleaved in batches of
+    batch_ticks ticks."""
+    results, config = _shared
+    seeds = [int(results['seed'][idx]) for idx in indices]
+    if config['root_seed'] is not None:
+        seeds = [RandomStreams.board_seed(config['root_seed'], seed)
+                 for seed in seeds]
+    boards = [Runner.make_board(
+        size=config['size'], no_asteroids=config['no_asteroids'],
+        seed=seed, vectorized=config['vectorized']) for seed in seeds]
+    seconds = [0.] * len(boards)
+    ticks = [0] * len(boards)
+    dt = config['dt']
+    policy = config['policy']
+    clock = time.perf_counter
+    for begin in range(0, config['ticks'], config['batch_ticks']):
+        batch = min(config['batch_ticks'], config['ticks'] - begin)
+        for k, board in enumerate(boards):
+            if board.gameover and config['stop_on_gameover']:
+                continue
+            start = clock()
+            step = board.step
+            for tick in range(begin, begin + batch):
+                if policy is not None:
+                    policy(board, tick)
+                step(dt)
+                ticks[k] += 1
+                if board.gameover and config['stop_on_gameover']:
+                    break
+            seconds[k] += clock() - start
+
+    for k, (idx, board) in enumerate(zip(indices, boards)):
+        row = results[idx]
+        row['gameover'] = board.gameover
+        row['score'] = board.score
+        row['ticks'] = ticks[k]
+        row['asteroids'] = len(board._asteroids)
+        row['projectiles'] = len(board._projectiles)
+        row['seconds'] = seconds[k]
+    return os.getpid(), sum(ticks), sum(seconds)
+
+
+class FarmResult(object):
+    def __init__(self, results, seconds, workers, worker_seconds):
+        self.results = results
+        self.seconds = seconds
+        self.workers = workers
+        self.worker_seconds = worker_seconds
+
+    @property
+    def board_ticks(self):
+        return int(self.results['ticks'].sum())
+
+    @property
+    def ticks_per_second(self):
+        """Board ticks per wall clock second over all workers."""
+        if self.seconds <= 0.:
+            return float('inf')
+        return self.board_ticks / self.seconds
+
+    @property
+    def efficiency(self):
+        """Fraction of the worker time spent stepping boards."""
+        total = self.seconds * max(self.workers, 1)
+        if total <= 0.:
+            return 0.
+        return float(self.results['seconds'].sum()) / total
+
+
+def run_farm(seeds, ticks, dt, size=(800., 600.), no_asteroids=12,
+             workers=None, shards_per_worker=4, batch_ticks=64,
+             vectorized=False, policy=None, stop_on_gameover=True,
+             root_seed=None):
+    """Runs one board per seed for ticks steps of dt.
+
+    With root_seed, an int, the seeds are the indices of the child seeds
+    of root_seed to use.
+
+    The boards are split into shards_per_worker shards per worker.
+    policy(board, tick) has to be a picklable module level function.
+    With workers=0 all shards run in the calling process.
+    """
+    seeds = [int(seed) for seed in seeds]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(ticks, int) or ticks < 0:
+        raise ValueError("Argument 'ticks' has to be a non-negative int")
+    if batch_ticks < 1:
+        raise ValueError("Argument 'batch_ticks' has to be positive")
+    config = {'size': tuple(size), 'no_asteroids': no_asteroids,
+              'ticks': ticks, 'dt': dt, 'batch_ticks': batch_ticks,
+              'vectorized': vectorized, 'policy': policy,
+              'stop_on_gameover': stop_on_gameover, 'root_seed': root_seed}
+
+    count = len(seeds)
+    buffer = multiprocessing.RawArray('b', max(count, 1) *
+                                      RESULT_DTYPE.itemsize)
+    results = _results_view(buffer, count)
+    results['seed'] = seeds
+    shards = [shard for shard in np.array_split(
+        np.arange(count), max(workers, 1) * shards_per_worker) if len(shard)]
+
+    worker_seconds = {}
+    start = time.perf_counter()
+    if workers == 0:
+        _init_worker(buffer, count, config)
+        for shard in shards:
+            pid, _, seconds = _run_shard(shard.tolist())
+            worker_seconds[pid] = worker_seconds.get(pid, 0.) + seconds
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(buffer, count, config)) as executor:
+            for pid, _, seconds in executor.map(
+                    _run_shard, [shard.tolist() for shard in shards]):
+                worker_seconds[pid] = worker_seconds.get(pid, 0.) + seconds
+    seconds = time.perf_counter() - start
+    return FarmResult(results.copy(), seconds, max(workers, 1),
+                      worker_seconds)
@@ -3,16 +3,36 @@
 """
 @author: Sven Mayer
 """
+import itertools
+
+from asteroids import AnalyticState
+from asteroids import Boundary
+from asteroids import BroadPhase
+from asteroids import Collision
+from asteroids import EntityRegistry
 from asteroids import GamePiece
+from asteroids import ProjectilePool
+from asteroids import RandomStreams
+from asteroids import Rotation
+from asteroids import Scheduler
+from asteroids import Snapshot
+from asteroids import Spawner
+from asteroids import WorldState
 import numpy as np
 
 
 DEFAULT_PROJECTILE_SIZE = 10.
 DEFAULT_PROJECTILE_VELO = 10.
+DEFAULT_PROJECTILE_CAPACITY = 1024
 
 
 class GameBoard(object):
-    def __init__(self, size, no_asteroids):
+    def __init__(self, size, no_asteroids, vectorized=False,
+                 broad_phase=None,
+                 projectile_capacity=DEFAULT_PROJECTILE_CAPACITY,
+                 swept=False, scheduler=None, analytic=False,
+                 boundary=None, max_ships=1, friendly_fire=False,
+                 splitter=None, spawner=None, seed=None):
         if not isinstance(size, tuple) and not isinstance(size, list):
             raise AttributeError("Argument 'size' has to be of type list or tuple")
         if len(size) != 2:
@@ -23,101 +43,747 @@ class GameBoard(object):
             raise AttributeError("Argument 'no_asteroids' has to be of type 'int'")
         self.no_asteroids = no_asteroids
 
-        self._asteroids = []
-        self._projectiles = []
+        self._asteroids = EntityRegistry.EntityRegistry()
+        self._projectiles = EntityRegistry.EntityRegistry()
+        # With max_ships > 1 the board is a multiplayer arena: ships also
+        # collide with each other and with the projectiles of other
+        # ships, and destroyed ships leave the board. The game is over
+        # when no ship is left. friendly_fire lets projectiles and ships
+        # of the same team collide as well.
+        if not isinstance(max_ships, int) or max_ships < 1:
+            raise AttributeError("Argument 'max_ships' has to be a positive "
+                                 "int")
+        self.max_ships = max_ships
+        self.friendly_fire = friendly_fire
+        self._ships = EntityRegistry.EntityRegistry()
+        # The first ship on the board, which the ship_* methods steer by
+        # default.
         self._ship = None
-        self.moving_objects = []
+        self._teams = {}
+        # Projectile -> (entity id, team) of the ship that fired it.
+        self._owners = {}
+        # All pieces on the board; its ids identify entities on the board.
+        self.moving_objects = EntityRegistry.EntityRegistry()
         self.gameover = False
+        # Number of asteroids destroyed by projectiles.
+        self.score = 0
+        # (ship id, id of the piece that hit it) of every ship destroyed
+        # in the last step of a multiplayer board.
+        self.ship_hits = []
+
+        # With vectorized=True all pieces live in one WorldState and are
+        # integrated by a single array update per step.
+        if vectorized:
+            self._world = WorldState.WorldState()
+        else:
+            self._world = None
+        # With analytic=True asteroids and projectiles, which never thrust,
+        # move in closed form on the clock of an AnalyticState instead;
+        # only the ship is integrated step by step.
+        if analytic:
+            self._analytic = AnalyticState.AnalyticState(self.size)
+        else:
+            self._analytic = None
+
+        if broad_phase is None:
+            broad_phase = BroadPhase.UniformGrid()
+        if not isinstance(broad_phase, BroadPhase.BroadPhase):
+            raise AttributeError("Argument 'broad_phase' has to be of type "
+                                 "'BroadPhase'")
+        self.broad_phase = broad_phase
+
+        # Projectiles fired by the ship are recycled through this pool.
+        self.projectile_pool = ProjectilePool.ProjectilePool(
+            capacity=projectile_capacity, size=DEFAULT_PROJECTILE_SIZE)
+
+        # With swept=True projectiles are tested along the path they moved
+        # during the step, so fast shots cannot pass through asteroids.
+        self.swept = swept
+        # (asteroid id, projectile id, time into the step) of every hit of
+        # the last step.
+        self.impacts = []
+
+        # An optional SubstepScheduler splits the steps of fast groups of
+        # pieces into substeps.
+        if (scheduler is not None and
+                not isinstance(scheduler, Scheduler.SubstepScheduler)):
+            raise AttributeError("Argument 'scheduler' has to be of type "
+                                 "'SubstepScheduler'")
+        if scheduler is not None and analytic:
+            raise AttributeError("Arguments 'scheduler' and 'analytic' "
+                                 "cannot be combined")
+        self.scheduler = scheduler
+
+        # The Boundary.BoundaryPolicy applied to all pieces after they
+        # moved.
+        if boundary is None:
+            boundary = Boundary.Toroidal()
+        if not isinstance(boundary, Boundary.BoundaryPolicy):
+            raise AttributeError("Argument 'boundary' has to be of type "
+                                 "'BoundaryPolicy'")
+        if analytic and not boundary.wraps:
+            raise AttributeError("Analytic boards need a boundary policy "
+                                 "that wraps asteroids")
+        self.boundary = boundary
+
+        # An optional Spawner.Splitter breaking asteroids hit by
+        # projectiles into smaller ones, and an optional
+        # Spawner.WaveSpawner refilling the board once it is cleared.
+        if splitter is not None and not isinstance(splitter,
+                                                   Spawner.Splitter):
+            raise AttributeError("Argument 'splitter' has to be of type "
+                                 "'Splitter'")
+        if spawner is not None and not isinstance(spawner,
+                                                  Spawner.WaveSpawner):
+            raise AttributeError("Argument 'spawner' has to be of type "
+                                 "'WaveSpawner'")
+        self.splitter = splitter
+        self.spawner = spawner
+        # Seeded RandomStreams.RandomStreams of everything random on the
+        # board. seed may be an int, a SeedSequence or None for fresh
+        # entropy.
+        self.random = RandomStreams.RandomStreams(seed)
+
+        # Callables sink(board) called at the end of every step.
+        self.step_sinks = []
+        # An optional Profiler.StepProfiler timing the phases of step.
+        self.profiler = None
+
+    def _track(self, obj, entity_id=None):
+        self.moving_objects.append(obj, entity_id)
+        if self._analytic is not None and not isinstance(obj, GamePiece.Ship):
+            self._analytic.attach(
+                obj, wrap=isinstance(obj, GamePiece.AsteroidBase))
+        elif self._world is not None:
+            self._world.attach(obj)
+
+    def _kill(self, registry, obj):
+        """Marks obj for removal at the next _flush."""
+        registry.kill(obj)
+        self.moving_objects.kill(obj)
+
+    def _flush(self):
+        """Removes all killed pieces from the board in one sweep."""
+        if not self.moving_objects.pending:
+            return
+        self._asteroids.flush()
+        self._projectiles.flush()
+        ships = self._ships.flush()
+        for obj in self.moving_objects.flush():
+            if obj._world is not None:
+                obj._world.detach(obj)
+            if isinstance(obj, GamePiece.Projectile):
+                self._owners.pop(obj, None)
+                if obj._pool is self.projectile_pool:
+                    self.projectile_pool.release(obj)
+        if ships:
+            for ship in ships:
+                del self._teams[ship]
+            if self._ship in ships:
+                self._ship = self._ships[0] if len(self._ships) else None
+            if not len(self._ships):
+                self.gameover = True
 
-    def _add_asteroid(self, obj):
+    def entity_id(self, obj):
+        """Returns the stable id of a piece on the board."""
+        return self.moving_objects.id_of(obj)
+
+    def _add_asteroid(self, obj, entity_id=None):
         if not isinstance(obj, GamePiece.AsteroidBase):
             raise AttributeError("Added object has to be of type 'AsteroidBase'")
         self._asteroids.append(obj)
-        self.moving_objects.append(obj)
+        self._track(obj, entity_id)
+
+    def _add_asteroids(self, objs):
+        """Adds many asteroids and attaches them to the world in one
+        batch."""
+        for obj in objs:
+            if not isinstance(obj, GamePiece.AsteroidBase):
+                raise AttributeError("Added object has to be of type "
+                                     "'AsteroidBase'")
+        self._asteroids.extend(objs)
+        self.moving_objects.extend(objs)
+        if self._analytic is not None:
+            self._analytic.attach_many(objs, wrap=True)
+        elif self._world is not None:
+            self._world.attach_many(objs)
 
-    def _add_ship(self, obj):
+    def _add_ship(self, obj, entity_id=None, team=None):
+        """Adds a ship. Ships without a team are a team of their own."""
         if not isinstance(obj, GamePiece.Ship):
             raise AttributeError("Added object has to be of type 'Ship'")
-        if self._ship is not None:
-            raise RuntimeError("Cannot add multiple ships")
-        self._ship = obj
-        self.moving_objects.append(obj)
+        if len(self._ships) >= self.max_ships:
+            if self.max_ships == 1:
+                raise RuntimeError("Cannot add multiple ships")
+            raise RuntimeError("Cannot add more than {0:d} ships".format(
+                self.max_ships))
+        self._track(obj, entity_id)
+        # Ships are looked up by their entity id, see ship_ids.
+        self._ships.append(obj, self.entity_id(obj))
+        if self._ship is None:
+            self._ship = obj
+        self._teams[obj] = self.entity_id(obj) if team is None else team
 
-    def _add_projectile(self, obj):
+    def _add_projectile(self, obj, entity_id=None):
         if not isinstance(obj, GamePiece.Projectile):
             raise AttributeError("Added object has to be of type 'Projectile'")
         self._projectiles.append(obj)
-        self.moving_objects.append(obj)
+        self._track(obj, entity_id)
+
+    def _apply_bounds(self, groups=Scheduler.GROUPS):
+        """Applies the boundary policy to the pieces of groups in one pass
+        and returns the ids of the removed pieces."""
+        if (type(self.boundary) is Boundary.Toroidal and
+                self._world is None and self._analytic is None):
+            return self._apply_toroidal_bounds(groups)
+        pieces = []
+        kinds = []
+        counts = []
+        for group in groups:
+            if group == 'ship':
+                members, kind = self._ships.items, Boundary.KIND_SHIP
+            elif group == 'asteroids':
+                if self._analytic is not None:
+                    # Analytic asteroids are wrapped when their pose is
+                    # computed.
+                    continue
+                members, kind = self._asteroids.items, Boundary.KIND_ASTEROID
+            else:
+                members, kind = (self._projectiles.items,
+                                 Boundary.KIND_PROJECTILE)
+            if members:
+                pieces.extend(members)
+                kinds.append(kind)
+                counts.append(len(members))
+        if not pieces:
+            return []
+        if self._analytic is None:
+            positions = self._positions(pieces)
+        else:
+            # The pieces are spread over two worlds.
+            positions = np.concatenate([
+                self._positions(pieces[end - count:end]) for end, count in
+                zip(np.cumsum(counts).tolist(), counts)])
+        batch = Boundary.BoundsBatch(
+            self, pieces, np.repeat(np.array(kinds, dtype=np.int8), counts),
+            positions)
+        self.boundary.apply(batch)
+
+        if batch.moved is not None:
+            moved = np.nonzero(batch.moved)[0]
+            for idx, position in zip(moved.tolist(),
+                                     batch.positions[moved].tolist()):
+                pieces[idx].position = tuple(position)
+        for idx, velocity in batch.new_velocities.items():
+            pieces[idx].velocity = velocity
+        culled = []
+        if batch.removed is None:
+            return culled
+        for idx in np.nonzero(batch.removed)[0].tolist():
+            piece = pieces[idx]
+            if batch.kinds[idx] == Boundary.KIND_ASTEROID:
+                self._kill(self._asteroids, piece)
+            elif batch.kinds[idx] == Boundary.KIND_PROJECTILE:
+                self._kill(self._projectiles, piece)
+            else:
+                continue
+            culled.append(self.entity_id(piece))
+        self._flush()
+        return culled
+
+    def _apply_toroidal_bounds(self, groups):
+        # The default policy on a board without worlds: the pieces hold
+        # their own positions in _position, so testing them one by one is
+        # cheaper than gathering a BoundsBatch.
+        width, height = self.size
+        culled = []
+        for group in groups:
+            if group == 'projectiles':
+                for projectile in self._projectiles.items:
+                    x, y, _ = projectile._position
+                    if x < 0. or x > width or y < 0. or y > height:
+                        self._kill(self._projectiles, projectile)
+                        culled.append(self.entity_id(projectile))
+                continue
+            members = (self._ships.items if group == 'ship' else
+                       self._asteroids.items)
+            for piece in members:
+                x, y, angle = piece._position
+                if x < 0. or x > width or y < 0. or y > height:
+                    piece.position = (x % width, y % height, angle)
+        if culled:
+            self._flush()
+        return culled
 
     def _asteroids_out_of_bounds(self):
-        for asteroid in self._asteroids:
-            pos = asteroid.position
-            if (pos[0] < 0. or pos[0] > self.size[0] or
-                    pos[1] < 0. or pos[1] > self.size[1]):
-                asteroid.position = (pos[0] % self.size[0],
-                                     pos[1] % self.size[1],
-                                     pos[2])
+        return self._apply_bounds(('asteroids',))
 
     def _projectiles_out_of_bounds(self):
-        for idx, projectile in enumerate(self._projectiles[::-1]):
-            pos = projectile.position
-            if (pos[0] < 0. or pos[0] > self.size[0] or
-                    pos[1] < 0. or pos[1] > self.size[1]):
-                self._projectiles.pop(idx)
-                self.moving_objects.pop(self.moving_objects.index(projectile))
+        return self._apply_bounds(('projectiles',))
 
     def _ship_out_of_bounds(self):
-        pos = self._ship.position
-        if (pos[0] < 0. or pos[0] > self.size[0] or
-                pos[1] < 0. or pos[1] > self.size[1]):
-            self._ship.position = (
-                pos[0] % self.size[0],
-                pos[1] % self.size[1],
-                pos[2])
+        return self._apply_bounds(('ship',))
+
+    def _move_group(self, group, dt):
+        if group == 'ship':
+            for ship in self._ships:
+                ship.step(dt)
+            return
+        pieces = self._asteroids if group == 'asteroids' else self._projectiles
+        if self._world is not None:
+            if len(pieces):
+                self._world.step(dt, slots=[piece._slot for piece in pieces])
+            return
+        for piece in pieces:
+            piece.step(dt)
 
     def _calculate_new_position(self, dt):
+        if self._analytic is not None:
+            self._analytic.step(dt)
+            if self._world is not None:
+                self._world.step(dt)
+            else:
+                for ship in self._ships:
+                    ship.step(dt)
+            return
+        if self._world is not None:
+            self._world.step(dt)
+            return
         for itm in self.moving_objects:
-            self.moving_objects.step(dt)
+            itm.step(dt)
 
-    def _resolve_collision(self):
-        # Check if the ship collides with any asteroid.
-        for asteroid in self._asteroids:
-            if self._ship is not None and self._ship.collides(asteroid):
-                self.gameover = True
-                break
-        for i in range(len(self._asteroids)-1, -1, -1):
-            for j in range(len(self._projectiles)-1, -1, -1):
-                if self._asteroids[i].collides(self._projectiles[j]):
-                    self._asteroids.pop(i)
-                    self._projectiles.pop(j)
-                    break
+    @staticmethod
+    def _positions(pieces):
+        """Positions (N, 3) of pieces, which have to be all attached to the
+        same world or all detached."""
+        world = pieces[0]._world if len(pieces) else None
+        if world is not None:
+            return world.poses(np.fromiter(
+                [piece._slot for piece in pieces], dtype=np.intp,
+                count=len(pieces)))
+        coordinates = itertools.chain.from_iterable(
+            [piece.position for piece in pieces])
+        return np.fromiter(coordinates, dtype=float,
+                           count=3 * len(pieces)).reshape(-1, 3)
+
+    @classmethod
+    def _bounds(cls, pieces):
+        """Positions (N, 3) and bounding radii of pieces, which have to be
+        all attached to the same world or all detached."""
+        positions = cls._positions(pieces)
+        radii = np.array([piece.bounding_radius for piece in pieces],
+                         dtype=float)
+        return positions, radii
+
+    @staticmethod
+    def _velocities(pieces):
+        world = pieces[0]._world if len(pieces) else None
+        if world is not None:
+            return world.velocities([piece._slot for piece in pieces])
+        return np.array([piece.velocity for piece in pieces],
+                        dtype=float).reshape(-1, 2)
+
+    def _candidate_pairs(self, bounds_a, bounds_b):
+        """Candidate pairs of the broad phase, ordered like the nested loop
+        over both groups from the back.
+
+        Also returns the positions of the b pieces moved next to their
+        partners across the board edges."""
+        pos_a, radius_a = bounds_a
+        pos_b, radius_b = bounds_b
+        ia, ib = self.broad_phase.candidate_pairs(
+            pos_a[:, :2], radius_a, pos_b[:, :2], radius_b, self.size)
+        order = np.lexsort((-ib, -ia))
+        ia, ib = ia[order], ib[order]
+        near_b = pos_b[ib].copy()
+        near_b[:, :2] = pos_a[ia, :2] + BroadPhase.wrapped_delta(
+            pos_a[ia, :2], pos_b[ib, :2], self.size)
+        return ia, ib, near_b
+
+    @staticmethod
+    def _asteroid_polygons(asteroids):
+        """Padded local outlines of the asteroids, built from the shared
+        shape templates where possible."""
+        if all(isinstance(asteroid._gb_repr, GamePiece.ScaledPolygon) and
+               asteroid._gb_repr._xy is None for asteroid in asteroids):
+            return Collision.stack_shapes(
+                [asteroid._gb_repr.template.shape_id
+                 for asteroid in asteroids],
+                [asteroid._gb_repr.scale for asteroid in asteroids])
+        return Collision.stack_polygons(
+            [asteroid._gb_repr for asteroid in asteroids])
+
+    def _asteroid_geometry(self):
+        """Bounds, local and world outlines of the asteroids."""
+        asteroids = self._asteroids.items
+        bounds = self._bounds(asteroids)
+        vertices, normals = self._asteroid_polygons(asteroids)
+        return (bounds, vertices, normals) + Collision.to_world(
+            vertices, normals, bounds[0])
+
+    def _resolve_collision(self, dt=0., check_ship=True,
+                           check_projectiles=True, geometry=None):
+        """Ends the game if the ship hits an asteroid and removes every
+        asteroid hit by a projectile together with the projectile.
+
+        In swept mode the projectiles move in a straight line relative to
+        the asteroids, which are tested in their pose at the end of the
+        step. geometry may pass the result of _asteroid_geometry if the
+        asteroids have not changed since. Multiplayer boards then test the
+        ships against each other and against the remaining projectiles.
+        """
+        self.impacts = []
+        self.ship_hits = []
+        ship_geometry = None
+        if self._asteroids.items:
+            if check_ship and self._ships.items:
+                ship_geometry = self._ship_geometry()
+            self._resolve_asteroids(dt, check_ship, check_projectiles,
+                                    geometry, ship_geometry)
+        if self.max_ships == 1:
+            return
+        self._flush()
+        if not self._ships.items:
+            return
+        if ship_geometry is None or self.ship_hits:
+            ship_geometry = self._ship_geometry()
+        if check_ship:
+            self._resolve_ships(ship_geometry)
+        self._resolve_ship_projectiles(ship_geometry)
+        self._flush()
+
+    def _ship_geometry(self):
+        """Bounds and world outlines of the ships."""
+        ships = self._ships.items
+        bounds = self._bounds(ships)
+        return (bounds,) + Collision.to_world(
+            *Collision.stack_polygons([ship._gb_repr for ship in ships]),
+            positions=bounds[0])
+
+    def _hit_ships(self, indices, causes):
+        """Ends the game, or on multiplayer boards removes the ships at
+        indices hit by the pieces causes."""
+        if self.max_ships == 1:
+            self.gameover = True
+            return
+        ships = self._ships.items
+        for idx, cause in zip(indices, causes):
+            ship = ships[idx]
+            if self._ships.is_alive(ship):
+                self.ship_hits.append((self.entity_id(ship),
+                                       self.entity_id(cause)))
+                self._kill(self._ships, ship)
+
+    def _resolve_asteroids(self, dt, check_ship, check_projectiles, geometry,
+                           ship_geometry):
+        asteroids = self._asteroids.items
+        projectiles = self._projectiles.items
+        if geometry is None:
+            geometry = self._asteroid_geometry()
+        (asteroid_bounds, vertices, normals, world_vertices,
+         world_normals) = geometry
+
+        # Check if a ship collides with any asteroid.
+        if check_ship and ship_geometry is not None:
+            ship_bounds, ship_vertices, ship_normals = ship_geometry
+            ia, ib, near = self._candidate_pairs(ship_bounds,
+                                                 asteroid_bounds)
+            if len(ib):
+                hit = Collision.polygons_collide(
+                    ship_vertices[ia], ship_normals[ia],
+                    *Collision.to_world(vertices[ib], normals[ib], near))
+                if hit.any():
+                    self._hit_ships(ia[hit].tolist(),
+                                    [asteroids[i] for i in ib[hit].tolist()])
+                if self.profiler is not None:
+                    self.profiler.count(len(ib), len(ib) * (
+                        ship_vertices.shape[1] + vertices.shape[1]))
+
+        if not check_projectiles or not projectiles:
+            return
+        projectile_bounds = self._bounds(projectiles)
+        if self.swept and dt > 0.:
+            # Widen the bounds by the distance moved during the step, so
+            # the broad phase keeps every pair whose paths may cross.
+            asteroid_velocity = self._velocities(asteroids)
+            projectile_velocity = self._velocities(projectiles)
+            asteroid_bounds = (asteroid_bounds[0], asteroid_bounds[1] +
+                               np.hypot(*asteroid_velocity.T) * dt)
+            projectile_bounds = (projectile_bounds[0], projectile_bounds[1] +
+                                 np.hypot(*projectile_velocity.T) * dt)
+        ia, ib, near = self._candidate_pairs(asteroid_bounds,
+                                             projectile_bounds)
+        if self.profiler is not None:
+            self.profiler.count(len(ia), len(ia) * vertices.shape[1])
+        if self.swept and dt > 0.:
+            hit, toi = Collision.swept_points(
+                world_vertices[ia], world_normals[ia], near[:, :2],
+                (projectile_velocity[ib] - asteroid_velocity[ia]) * dt)
+            # Earliest impacts first; a stable sort keeps the order of the
+            # nested loop for equal times.
+            order = np.argsort(toi[hit], kind='stable')
+            ia, ib = ia[hit][order], ib[hit][order]
+            times = toi[hit][order] * dt
+        else:
+            hit = Collision.points_inside(world_vertices[ia],
+                                          world_normals[ia], near[:, :2])
+            ia, ib = ia[hit], ib[hit]
+            times = np.full(len(ia), float(dt))
+        hit_asteroids = {}
+        hit_projectiles = set()
+        for i, j, time in zip(ia.tolist(), ib.tolist(), times.tolist()):
+            if i in hit_asteroids or j in hit_projectiles:
+                continue
+            hit_asteroids[i] = None
+            hit_projectiles.add(j)
+            self.impacts.append((self.entity_id(asteroids[i]),
+                                 self.entity_id(projectiles[j]), time))
+            self._kill(self._asteroids, asteroids[i])
+            self._kill(self._projectiles, projectiles[j])
+            self.score += 1
+        if self.splitter is not None and hit_asteroids:
+            self._split([asteroids[i] for i in hit_asteroids])
+        self._flush()
+
+    def _split(self, parents):
+        """Adds the pieces of the destroyed asteroids parents."""
+        pieces = GamePiece.make_asteroids(*self.splitter.split(
+            [parent.shape_id for parent in parents],
+            [parent.size for parent in parents],
+            self._positions(parents), self._velocities(parents),
+            [parent.turn * parent._angular_velocity for parent in parents]))
+        self._add_asteroids(pieces)
+
+    def _teams_of(self, ships):
+        # Teams may be any hashable, so compare them as objects.
+        return np.array([self._teams[ship] for ship in ships], dtype=object)
+
+    def _resolve_ships(self, ship_geometry):
+        """Destroys every pair of colliding ships."""
+        ships = self._ships.items
+        bounds, vertices, normals = ship_geometry
+        ia, ib, near = self._candidate_pairs(bounds, bounds)
+        keep = ia < ib
+        if not self.friendly_fire:
+            teams = self._teams_of(ships)
+            keep &= teams[ia] != teams[ib]
+        ia, ib, near = ia[keep], ib[keep], near[keep]
+        if not len(ia):
+            return
+        # Outlines of the b ships moved next to their partners.
+        shift = near[:, :2] - bounds[0][ib, :2]
+        hit = Collision.polygons_collide(
+            vertices[ia], normals[ia],
+            vertices[ib] + shift[:, None, :], normals[ib])
+        if self.profiler is not None:
+            self.profiler.count(len(ia), len(ia) * 2 * vertices.shape[1])
+        ia, ib = ia[hit].tolist(), ib[hit].tolist()
+        self._hit_ships(ia + ib, [ships[j] for j in ib] +
+                        [ships[i] for i in ia])
+
+    def _resolve_ship_projectiles(self, ship_geometry):
+        """Removes every ship hit by a projectile of another ship, or of
+        a team mate with friendly fire, together with the projectile.
+
+        Projectiles that have no owner hit every ship."""
+        ships = self._ships.items
+        projectiles = self._projectiles.items
+        if not projectiles:
+            return
+        bounds, vertices, normals = ship_geometry
+        ia, ib, near = self._candidate_pairs(bounds,
+                                             self._bounds(projectiles))
+        if not len(ia):
+            return
+        owners = [self._owners.get(projectiles[j], (-1, None))
+                  for j in ib.tolist()]
+        keep = (np.array([owner[0] for owner in owners]) !=
+                np.array(self._ships.ids)[ia])
+        if not self.friendly_fire:
+            teams = self._teams_of(ships)[ia]
+            keep &= np.array([owner[1] is None for owner in owners]) | (
+                np.array([owner[1] for owner in owners], dtype=object) !=
+                teams)
+        ia, ib, near = ia[keep], ib[keep], near[keep]
+        hit = Collision.points_inside(vertices[ia], normals[ia],
+                                      near[:, :2])
+        if self.profiler is not None:
+            self.profiler.count(len(ia), len(ia) * vertices.shape[1])
+        used = set()
+        for i, j in zip(ia[hit].tolist(), ib[hit].tolist()):
+            # Ships destroyed by another ship stop no projectiles.
+            if j in used or not self._ships.is_alive(ships[i]):
+                continue
+            used.add(j)
+            self._hit_ships([i], [projectiles[j]])
+            self._kill(self._projectiles, projectiles[j])
+
+    def snapshot(self):
+        """Returns the state of the board in the binary snapshot format."""
+        return Snapshot.snapshot(self)
+
+    @classmethod
+    def restore(cls, buffer):
+        """Creates a board from a snapshot held in bytes, a memoryview or
+        an mmap."""
+        return Snapshot.restore(buffer)
+
+    def _step_substeps(self, dt):
+        profiler = self.profiler
+        counts = self.scheduler.substeps(self, dt)
+        total = max(counts.values())
+        strides = dict((group, total // count)
+                       for group, count in counts.items())
+        impacts = []
+        # The asteroid geometry is reused while the asteroids neither move
+        # nor get destroyed.
+        geometry = None
+        for k in range(total):
+            # Every group moves at the start of each of its substeps, in
+            # the order of step.
+            moved = [group for group in Scheduler.GROUPS
+                     if k % strides[group] == 0]
+            for group in moved:
+                self._move_group(group, dt * strides[group] / total)
+            if profiler is not None:
+                profiler.lap('calculate_new_position')
+            self._apply_bounds(moved)
+            if profiler is not None:
+                profiler.lap('apply_bounds')
+
+            if 'asteroids' in moved or geometry is None:
+                geometry = self._asteroid_geometry()
+            projectile_dt = dt * strides['projectiles'] / total
+            self._resolve_collision(
+                projectile_dt if 'projectiles' in moved else 0.,
+                check_ship='ship' in moved or 'asteroids' in moved,
+                check_projectiles=('projectiles' in moved or
+                                   'asteroids' in moved),
+                geometry=geometry)
+            if self.impacts:
+                geometry = None
+            if profiler is not None:
+                profiler.lap('resolve_collision')
+            start = dt * k / total
+            impacts.extend((asteroid_id, projectile_id, start + time)
+                           for asteroid_id, projectile_id, time
+                           in self.impacts)
+        self.impacts = impacts
+
+    def _step_profiled(self, dt):
+        profiler = self.profiler
+        profiler.begin()
+        if self.scheduler is not None:
+            self._step_substeps(dt)
+        else:
+            self._calculate_new_position(dt)
+            profiler.lap('calculate_new_position')
+            self._apply_bounds()
+            profiler.lap('apply_bounds')
+            self._resolve_collision(dt)
+            profiler.lap('resolve_collision')
+        if self.spawner is not None:
+            self.spawner.update(self)
+        profiler.lap('spawn_waves')
+        for sink in self.step_sinks:
+            sink(self)
+        profiler.lap('step_sinks')
+        profiler.end(self)
 
     def step(self, dt):
-        self._calculate_new_position(dt)
-        self._asteroids_out_of_bounds()
-        self._projectiles_out_of_bounds()
-        self._ship_out_of_bounds()
-        # TODO: Check if anything collides.
-        # Ship destroyed.
-        # Asteroids destroyed.
-
-    def ship_turn(self, direction):
-        self._ship.turn = direction
-
-    def ship_accelerate(self, value):
+        if self.profiler is not None:
+            self._step_profiled(dt)
+            return
+        if self.scheduler is not None:
+            self._step_substeps(dt)
+        else:
+            self._calculate_new_position(dt)
+            self._apply_bounds()
+            self._resolve_collision(dt)
+        if self.spawner is not None:
+            self.spawner.update(self)
+        for sink in self.step_sinks:
+            sink(self)
+
+    @property
+    def ship_ids(self):
+        """Entity ids of the ships, in the order of the ships_input
+        arrays. The order changes when a ship is destroyed."""
+        return list(self._ships.ids)
+
+    def _get_ship(self, ship_id):
+        if ship_id is None:
+            return self._ship
+        return self._ships.get(ship_id)
+
+    def ship_turn(self, direction, ship_id=None):
+        self._get_ship(ship_id).turn = direction
+
+    def ship_accelerate(self, value, ship_id=None):
         if value:
-            self._ship.thrust = 1
+            self._get_ship(ship_id).thrust = 1
         else:
-            self._ship.thrust = 0
+            self._get_ship(ship_id).thrust = 0
+
+    def ship_fire(self, ship_id=None):
+        return self._fire(self._get_ship(ship_id))
 
-    def ship_fire(self):
-        gunpos = self._ship.gunposition
+    def _fire(self, ship):
+        gunpos = ship.gunposition
+        sin_angle, cos_angle = Rotation.shared.sincos(gunpos[2])
         velo = (
-            DEFAULT_PROJECTILE_VELO * np.cos(gunpos[2]),
-            DEFAULT_PROJECTILE_VELO * np.sin(gunpos[2]))
+            DEFAULT_PROJECTILE_VELO * cos_angle,
+            DEFAULT_PROJECTILE_VELO * sin_angle)
 
-        projectile = GamePiece.Projectile(size=DEFAULT_PROJECTILE_SIZE,
-                                          position=gunpos, velocity=velo)
+        projectile = self.projectile_pool.acquire(position=gunpos,
+                                                  velocity=velo)
+        if projectile is not None:
+            self._add_projectile(projectile)
+            if self.max_ships > 1:
+                self._owners[projectile] = (self.entity_id(ship),
+                                            self._teams[ship])
+        return projectile
 
-        self._projectiles.append(projectile)
-        self.moving_objects.append(projectile)
+    def _ship_array(self, values, name):
+        values = np.asarray(values).ravel()
+        if len(values) != len(self._ships):
+            raise ValueError("Argument '{0:s}' needs one entry per "
+                             "ship".format(name))
+        return values
+
+    def ships_input(self, turn=None, thrust=None, fire=None):
+        """Applies the inputs of all players for one tick.
+
+        Each argument is an array with one entry per ship, in the order of
+        ship_ids, or None to leave that input unchanged: turn in -1, 0, 1,
+        thrust and fire as 0 or 1. Returns the fired projectiles, None
+        where the pool was empty.
+        """
+        ships = self._ships.items
+        if turn is not None:
+            turn = self._ship_array(turn, 'turn')
+            if len(turn) and np.abs(turn).max() > 1:
+                raise ValueError("Argument 'turn' has to be in -1, 0, 1")
+            turn = turn.astype(np.int8)
+        if thrust is not None:
+            # Any non-zero thrust accelerates, as in ship_accelerate.
+            thrust = (self._ship_array(thrust, 'thrust') != 0).astype(np.int8)
+        world = self._world
+        if world is not None and ships:
+            slots = np.fromiter([ship._slot for ship in ships],
+                                dtype=np.intp, count=len(ships))
+            if turn is not None:
+                world.turn[slots] = turn
+            if thrust is not None:
+                world.thrust[slots] = thrust
+        else:
+            for idx, ship in enumerate(ships):
+                if turn is not None:
+                    ship.turn = int(turn[idx])
+                if thrust is not None:
+                    ship.thrust = int(thrust[idx])
+        if fire is None:
+            return []
+        fire = self._ship_array(fire, 'fire') != 0
+        return [self._fire(ships[idx])
+                for idx in np.nonzero(fire)[0].tolist()]
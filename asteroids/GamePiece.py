@@ -3,64 +3,128 @@
 """
 @author: Sven Mayer
 """
+import gc
+
 import numpy as np
 
+from asteroids import Rotation
+
+
+DEFAULT_ACCELERATION = 1.5
+DEFAULT_ANGULAR_VELOCITY = 0.1*np.pi
+
 
 class PhysicsEngine():
-    def __init__(self, position=(0., 0., 0.), acceleration=1.5,
-                 angular_velocity=0.1*np.pi, start_velocity=(0., 0.)):
+    __slots__ = ('_world', '_slot', '_position', '_velocity',
+                 '_acceleration', '_angular_velocity', '_sin_angle',
+                 '_cos_angle', '_thrust', '_turn')
+
+    def __init__(self, position=(0., 0., 0.),
+                 acceleration=DEFAULT_ACCELERATION,
+                 angular_velocity=DEFAULT_ANGULAR_VELOCITY,
+                 start_velocity=(0., 0.)):
         if not (isinstance(position, tuple) and (len(position) == 3)):
             raise ValueError("argument 'position' takes tuple of size three")
+        sin_angle, cos_angle = Rotation.shared.sincos(position[2])
+        self._init_motion(position, start_velocity, acceleration,
+                          angular_velocity, sin_angle, cos_angle)
+
+    def _init_motion(self, position, velocity, acceleration,
+                     angular_velocity, sin_angle, cos_angle, turn=0):
+        """Sets the state of a new piece; also used by make_asteroids."""
+        # A piece attached to a WorldState keeps its state in the world's
+        # arrays; the attributes below are only used while it is detached.
+        self._world = None
+        self._slot = None
         self._position = position
-        self.velocity = start_velocity
+        self._velocity = velocity
         self._acceleration = acceleration
         self._angular_velocity = angular_velocity
-        self._sin_angle = np.sin(self.position[2])
-        self._cos_angle = np.cos(self.position[2])
+        self._sin_angle = sin_angle
+        self._cos_angle = cos_angle
         self._thrust = False
-        self._turn = 0
+        self._turn = turn
 
     @property
     def thrust(self):
+        if self._world is not None:
+            return self._world.get_thrust(self._slot)
         return self._thrust
 
     @thrust.setter
     def thrust(self, value):
         if not (isinstance(value, int) and value in [-1, 0, 1]):
             raise ValueError("thrust has to be of type 'bool'")
-        self._thrust = value
+        if self._world is not None:
+            self._world.set_thrust(self._slot, value)
+        else:
+            self._thrust = value
 
     @property
     def turn(self):
+        if self._world is not None:
+            return self._world.get_turn(self._slot)
         return self._turn
 
     @turn.setter
     def turn(self, value):
         if not (isinstance(value, int) and value in [-1, 0, 1]):
             raise ValueError("'turn' has to be integer -1, 0, or 1")
-        self._turn = value
+        if self._world is not None:
+            self._world.set_turn(self._slot, value)
+        else:
+            self._turn = value
 
     @property
     def position(self):
+        if self._world is not None:
+            return self._world.get_position(self._slot)
         return self._position
 
     @position.setter
     def position(self, value):
         if isinstance(value, tuple) and len(value) == 3:
-            self._position = value
+            pass
         elif isinstance(value, list) and len(value) == 3:
-            self._position = (value[0], value[1], value[2])
+            value = (value[0], value[1], value[2])
         else:
             raise TypeError("Only tuples or lists with three elements can " +
                             "be assigned to position.")
+        if self._world is not None:
+            self._world.set_position(self._slot, value)
+        else:
+            self._position = value
+
+    @property
+    def velocity(self):
+        if self._world is not None:
+            return self._world.get_velocity(self._slot)
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, value):
+        if self._world is not None:
+            self._world.set_velocity(self._slot, value)
+        else:
+            self._velocity = value
+
+    def _heading(self):
+        """Returns cosine and sine of the current heading."""
+        if self._world is not None:
+            return self._world.get_heading(self._slot)
+        return self._cos_angle, self._sin_angle
 
     def step(self, dt):
+        if self._world is not None:
+            self._world.step(dt, slots=self._slot)
+            return
         new_angle = self.position[2]
         if self._turn != 0:
-            new_angle += self._turn * self._angular_velocity * dt
+            delta = self._turn * self._angular_velocity * dt
+            new_angle += delta
             new_angle %= 2. * np.pi
-            self._sin_angle = np.sin(new_angle)
-            self._cos_angle = np.cos(new_angle)
+            self._sin_angle, self._cos_angle = Rotation.shared.turn(
+                new_angle, self._sin_angle, self._cos_angle, delta)
 
         if self._thrust != 0:
             self.velocity = (
@@ -77,11 +141,15 @@ class PhysicsEngine():
 
 
 class Point(object):
+    __slots__ = ('xy',)
+
     def __init__(self, xy):
         self.xy = xy
 
 
 class ConvexPolygon(object):
+    __slots__ = ('xy', 'side', 'side_normal', '_interval_cache')
+
     def __init__(self, xy):
         self.xy = xy
 
@@ -99,6 +167,27 @@ class ConvexPolygon(object):
         self.side_normal = []
         for side in self.side:
             self.side_normal.append((-1.*side[1], side[0]))
+        self._interval_cache = None
+
+    def intervals(self):
+        """Returns the (min, max) projection interval on each side normal.
+
+        The result is cached for the current vertex list.
+        """
+        cache = self._interval_cache
+        if cache is None or cache[0] is not self.xy:
+            intervals = []
+            for normal in self.side_normal:
+                points = self.projection(normal)
+                intervals.append((min(points), max(points)))
+            cache = self._interval_cache = (self.xy, intervals)
+        return cache[1]
+
+    def _cached_intervals(self):
+        cache = self._interval_cache
+        if cache is not None and cache[0] is self.xy:
+            return cache[1]
+        return None
 
     def projection(self, proj_vec):
         return [self.project_pt(xy, proj_vec) for xy in self.xy]
@@ -108,32 +197,25 @@ class ConvexPolygon(object):
         return xy[0] * vec[0] + xy[1] * vec[1]
 
     def collides(self, other):
-        # Find out which polygon has less sides to minimize the number
-        # of projections needed to check for collision.
-        if len(self.xy) < len(other.xy):
-            normals = self.side_normal
-        else:
-            normals = other.side_normal
-
-        collides = True
-        for normal in normals:
-            my_points = self.projection(normal)
+        # The polygons are separated if any side normal of either polygon
+        # is a separating axis. The projections of each polygon on its own
+        # normals are taken from the cache.
+        for normal, my_range in zip(self.side_normal, self.intervals()):
             other_points = other.projection(normal)
-            my_range = min(my_points), max(my_points)
-            other_range = min(other_points), max(other_points)
-            if not (my_range[1] > other_range[0] and
-                    my_range[0] < other_range[1]):
-                collides = False
-                break
-
-        return collides
+            if not (my_range[1] > min(other_points) and
+                    my_range[0] < max(other_points)):
+                return False
+        for normal, other_range in zip(other.side_normal, other.intervals()):
+            my_points = self.projection(normal)
+            if not (max(my_points) > other_range[0] and
+                    min(my_points) < other_range[1]):
+                return False
+        return True
 
     def point_inside(self, xy):
         """Finds out if the points xy is inside the area of the polygon."""
         is_inside = True
-        for normal in self.side_normal:
-            my_points = self.projection(normal)
-            my_range = min(my_points), max(my_points)
+        for normal, my_range in zip(self.side_normal, self.intervals()):
             other_point = self.project_pt(xy, normal)
             if (my_range[1] <= other_point or
                     my_range[0] >= other_point):
@@ -142,30 +224,197 @@ class ConvexPolygon(object):
         return is_inside
 
     def rotate(self, angle=0.0):
-        sina = np.sin(angle)
-        cosa = np.cos(angle)
-        self.xy = [(x*cosa-y*sina, x*sina+y*sina) for (x, y) in self.xy]
-        self.side = [(x*cosa-y*sina, x*sina+y*sina) for (x, y) in self.side]
-        self.side_normal = [(x*cosa-y*sina, x*sina+y*sina) for (x, y)
+        sina, cosa = Rotation.shared.sincos(angle)
+        self.xy = [(x*cosa-y*sina, x*sina+y*cosa) for (x, y) in self.xy]
+        self.side = [(x*cosa-y*sina, x*sina+y*cosa) for (x, y) in self.side]
+        self.side_normal = [(x*cosa-y*sina, x*sina+y*cosa) for (x, y)
                             in self.side_normal]
 
+    def transformed(self, angle=0.0, offset=(0., 0.)):
+        """Returns a copy rotated by angle and then moved by offset."""
+        poly = ConvexPolygon.__new__(ConvexPolygon)
+        poly.xy = self.xy
+        poly.side = self.side
+        poly.side_normal = self.side_normal
+        poly._interval_cache = None
+        if angle != 0.:
+            poly.rotate(angle)
+        poly.xy = [(x + offset[0], y + offset[1]) for (x, y) in poly.xy]
+        intervals = self._cached_intervals()
+        if angle == 0. and intervals is not None:
+            # A pure translation shifts every interval by the projection
+            # of the offset.
+            shifts = [self.project_pt(offset, normal)
+                      for normal in poly.side_normal]
+            poly._interval_cache = (poly.xy, [
+                (lo + shift, hi + shift)
+                for ((lo, hi), shift) in zip(intervals, shifts)])
+        return poly
+
+
+class ShapeTemplate(object):
+    """Outline of unit size shared by all pieces of one shape.
+
+    Side and normal vectors do not depend on the size of a piece, so they
+    are computed once per shape.
+    """
+    def __init__(self, xy, shape_id):
+        unit = ConvexPolygon(xy)
+        self.shape_id = shape_id
+        self.xy = unit.xy
+        self.side = unit.side
+        self.side_normal = unit.side_normal
+        self.intervals = unit.intervals()
+        self.vertices = np.array(self.xy, dtype=float)
+        self.normals = np.array(self.side_normal, dtype=float)
+        self.radius = float(np.max(np.hypot(self.vertices[:, 0],
+                                            self.vertices[:, 1])))
+
+
+_shape_templates = []
+
+
+def register_shape(xy):
+    """Registers an outline of unit size and returns its ShapeTemplate."""
+    template = ShapeTemplate(xy, shape_id=len(_shape_templates))
+    _shape_templates.append(template)
+    return template
+
+
+def shape_template(shape_id):
+    return _shape_templates[shape_id]
+
+
+def shape_count():
+    return len(_shape_templates)
+
+
+class ScaledPolygon(ConvexPolygon):
+    """ConvexPolygon given by a shared ShapeTemplate and a scale factor.
+
+    The vertices are computed on access; only the scale is stored per
+    instance until the polygon is rotated in place.
+    """
+    __slots__ = ('template', 'scale', '_xy', '_side', '_side_normal')
+
+    def __init__(self, template, scale):
+        if scale <= 0.:
+            raise ValueError("Argument 'scale' has to be positive")
+        self.template = template
+        self.scale = scale
+        self._xy = None
+        self._side = None
+        self._side_normal = None
+        self._interval_cache = None
+
+    @property
+    def xy(self):
+        if self._xy is not None:
+            return self._xy
+        scale = self.scale
+        return [(scale * x, scale * y) for (x, y) in self.template.xy]
+
+    @xy.setter
+    def xy(self, value):
+        self._xy = value
+
+    @property
+    def side(self):
+        if self._side is not None:
+            return self._side
+        return self.template.side
+
+    @side.setter
+    def side(self, value):
+        self._side = value
+
+    @property
+    def side_normal(self):
+        if self._side_normal is not None:
+            return self._side_normal
+        return self.template.side_normal
+
+    @side_normal.setter
+    def side_normal(self, value):
+        self._side_normal = value
+
+    def _cached_intervals(self):
+        if self._xy is not None:
+            return ConvexPolygon._cached_intervals(self)
+        scale = self.scale
+        return [(scale * lo, scale * hi) for (lo, hi)
+                in self.template.intervals]
+
+    def intervals(self):
+        if self._xy is not None:
+            return ConvexPolygon.intervals(self)
+        return self._cached_intervals()
+
 
 class GamePiece(PhysicsEngine):
-    def __init__(self, size, type, position=(0., 0., 0.), acceleration=1.5,
-                 angular_velocity=0.1*np.pi, start_velocity=(0., 0.), **kwargs):
+    __slots__ = ('size', 'type', '_gb_repr', '_bounding_radius',
+                 '_world_key', '_world_repr', '_rotated_angle', '_rotated')
+
+    def __init__(self, size, type, position=(0., 0., 0.),
+                 acceleration=DEFAULT_ACCELERATION,
+                 angular_velocity=DEFAULT_ANGULAR_VELOCITY,
+                 start_velocity=(0., 0.), **kwargs):
         super(GamePiece, self).__init__(
             position=position, acceleration=acceleration,
             angular_velocity=angular_velocity, start_velocity=start_velocity)
-        self.size = size
-        self.type = type
-        if type == "polygon":
+        if type == "polygon" and 'shape' in kwargs:
+            # Outline shared with all pieces of this shape.
+            gb_repr = ScaledPolygon(kwargs['shape'], size)
+            bounding_radius = kwargs['shape'].radius * size
+        elif type == "polygon":
             if 'xy' not in kwargs:
                 raise TypeError("Argument 'xy' required for GamePiece type 'polygon'")
-            self._gb_repr = ConvexPolygon(xy=kwargs['xy'])
+            gb_repr = ConvexPolygon(xy=kwargs['xy'])
+            bounding_radius = float(max(
+                np.sqrt(x**2. + y**2.) for (x, y) in gb_repr.xy))
         elif type == "point":
-            self._gb_repr = Point((position[0], position[1]))
+            gb_repr = Point((position[0], position[1]))
+            bounding_radius = 0.
         else:
             raise TypeError("Unknown type '{0:s}'".format(str(type)))
+        self._init_geometry(size, type, gb_repr, bounding_radius)
+
+    def _init_geometry(self, size, type, gb_repr, bounding_radius):
+        """Sets the outline of a new piece; also used by make_asteroids."""
+        self.size = size
+        self.type = type
+        self._gb_repr = gb_repr
+        self._bounding_radius = bounding_radius
+        # Board coordinate geometry, see world_repr.
+        self._world_key = None
+        self._world_repr = None
+        self._rotated_angle = None
+        self._rotated = None
+
+    @property
+    def bounding_radius(self):
+        """Radius of the circle around position that encloses the piece."""
+        return self._bounding_radius
+
+    def world_repr(self):
+        """Returns the geometric representation in board coordinates.
+
+        Polygons are cached until the piece moves. The rotated polygon is
+        cached separately, so a piece that only translates is not rotated
+        again.
+        """
+        pos = self.position
+        if self.type == "point":
+            return Point((pos[0], pos[1]))
+        if self._world_key != pos:
+            if self._rotated_angle != pos[2]:
+                self._rotated = self._gb_repr.transformed(pos[2])
+                self._rotated.intervals()
+                self._rotated_angle = pos[2]
+            self._world_repr = self._rotated.transformed(
+                offset=(pos[0], pos[1]))
+            self._world_key = pos
+        return self._world_repr
 
     def collides(self, other):
         if self.type == "point" and other.type == "point":
@@ -173,20 +422,23 @@ class GamePiece(PhysicsEngine):
             return False
         elif self.type == "polygon" and other.type == "polygon":
             # Check polygon collision
-            return self._gb_repr.collides(other._gb_repr)
+            return self.world_repr().collides(other.world_repr())
         if (self.type == "polygon" and other.type == "point" or
                 self.type == "point" and other.type == "polygon"):
             if self.type == "polygon":
-                poly = self._gb_repr
-                point = other._gb_repr.xy
+                poly = self.world_repr()
+                point = other.world_repr().xy
             else:
-                poly = other._gb_repr
-                point = self._gb_repr.xy
+                poly = other.world_repr()
+                point = self.world_repr().xy
             return poly.point_inside(point)
 
 class Ship(GamePiece):
-    def __init__(self, size, position=(0., 0., 0.), acceleration=1.5,
-                 angular_velocity=0.1*np.pi):
+    __slots__ = ()
+
+    def __init__(self, size, position=(0., 0., 0.),
+                 acceleration=DEFAULT_ACCELERATION,
+                 angular_velocity=DEFAULT_ANGULAR_VELOCITY):
         super(Ship, self).__init__(
             size=size, xy=[(-0.2679491924311227*size, -1./3.*size),
                            (0.2679491924311227*size, -1./3.*size),
@@ -197,20 +449,23 @@ class Ship(GamePiece):
     @property
     def gunposition(self):
         two_thirds_size = 2. / 3. * self.size
+        cos_angle, sin_angle = self._heading()
+        pos = self.position
         return (
-            self.position[0] + self._cos_angle * two_thirds_size,
-            self.position[1] + self._sin_angle * two_thirds_size,
-            self.position[2])
+            pos[0] + cos_angle * two_thirds_size,
+            pos[1] + sin_angle * two_thirds_size,
+            pos[2])
 
 
 class AsteroidBase(GamePiece):
+    __slots__ = ()
+
     def __init__(self, size, position, start_velocity, angular_velocity):
         # AsteroidBase cannot be instantiated.
         if type(self) is AsteroidBase:
             raise TypeError("AsteroidBase cannot be instantiated")
         super(AsteroidBase, self).__init__(
-            size=size, type="polygon",
-            xy=[(size * x, size * y) for (x, y) in self._xy],
+            size=size, type="polygon", shape=self._shape,
             position=position, angular_velocity=np.abs(angular_velocity))
         if angular_velocity > 0.:
             self.turn = 1
@@ -218,8 +473,90 @@ class AsteroidBase(GamePiece):
             self.turn = -1
         self.velocity = start_velocity
 
-
+    @property
+    def shape_id(self):
+        return self._shape.shape_id
+
+
+_asteroid_classes = {}
+
+
+def asteroid_shape(cls):
+    """Class decorator registering the unit outline '_xy' of an asteroid
+    class as its shared ShapeTemplate."""
+    cls._shape = register_shape(cls._xy)
+    _asteroid_classes[cls._shape.shape_id] = cls
+    return cls
+
+
+def asteroid_class(shape_id):
+    """Returns the asteroid class registered for shape_id."""
+    return _asteroid_classes[shape_id]
+
+
+def asteroid_shape_ids():
+    """Returns the shape ids of all asteroid classes."""
+    return sorted(_asteroid_classes)
+
+
+def make_asteroids(shape_ids, sizes, positions, velocities,
+                   angular_velocities):
+    """Creates one asteroid per row of the arrays, like the constructors
+    of the asteroid classes but without their per-piece checks. Both set
+    the state through _init_motion and _init_geometry.
+
+    positions is (N, 3), velocities is (N, 2), the others have N entries.
+    """
+    shape_ids = np.asarray(shape_ids, dtype=np.intp).ravel()
+    sizes = np.asarray(sizes, dtype=float).ravel()
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    velocities = np.asarray(velocities, dtype=float).reshape(-1, 2)
+    angular_velocities = np.asarray(angular_velocities, dtype=float).ravel()
+    count = len(shape_ids)
+    if not (len(sizes) == len(positions) == len(velocities) ==
+            len(angular_velocities) == count):
+        raise ValueError("Arguments need one entry per asteroid")
+    if count and sizes.min() <= 0.:
+        raise ValueError("Asteroid sizes have to be positive")
+    if Rotation.shared.mode == 'exact':
+        headings = zip(np.sin(positions[:, 2]).tolist(),
+                       np.cos(positions[:, 2]).tolist())
+    else:
+        headings = [Rotation.shared.sincos(angle)
+                    for angle in positions[:, 2].tolist()]
+    turns = np.sign(angular_velocities).astype(int).tolist()
+    asteroids = []
+    # Collections triggered by the allocations would scan all pieces of
+    # the game again and again; the new pieces form no reference cycles,
+    # so the collector is paused while they are created.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for (shape_id, size, x, y, angle, vx, vy, angular_velocity, turn,
+             (sin_angle, cos_angle)) in zip(
+                shape_ids.tolist(), sizes.tolist(), *positions.T.tolist(),
+                *velocities.T.tolist(), np.abs(angular_velocities).tolist(),
+                turns, headings):
+            cls = _asteroid_classes[shape_id]
+            shape = cls._shape
+            asteroid = cls.__new__(cls)
+            asteroid._init_motion((x, y, angle), (vx, vy),
+                                  DEFAULT_ACCELERATION, angular_velocity,
+                                  sin_angle, cos_angle, turn)
+            asteroid._init_geometry(size, "polygon",
+                                    ScaledPolygon(shape, size),
+                                    shape.radius * size)
+            asteroids.append(asteroid)
+    finally:
+        if enabled:
+            gc.enable()
+    return asteroids
+
+
+@asteroid_shape
 class Asteroid1(AsteroidBase):
+    __slots__ = ()
+
     _xy = [(0.2, 0.4), (-0.08, 0.5), (-0.4, -0.4), (-0.5, -0.04),
            (-0.2, -0.4), (0.3, -0.3), (0.5, 0.1)]
 
@@ -227,10 +564,53 @@ class Asteroid1(AsteroidBase):
         super(Asteroid1, self).__init__(size=size, position=position,
                                         start_velocity=start_velocity,
                                         angular_velocity=angular_velocity)
-#
-# TODO: Add more asteroid shapes.
+
+
+@asteroid_shape
+class Asteroid2(AsteroidBase):
+    __slots__ = ()
+
+    _xy = [(0.5, 0.), (0.35, 0.35), (0., 0.5), (-0.3, 0.4), (-0.5, 0.),
+           (-0.35, -0.35), (0., -0.45), (0.4, -0.3)]
+
+    def __init__(self, size, position, start_velocity, angular_velocity):
+        super(Asteroid2, self).__init__(size=size, position=position,
+                                        start_velocity=start_velocity,
+                                        angular_velocity=angular_velocity)
+
+
+@asteroid_shape
+class Asteroid3(AsteroidBase):
+    __slots__ = ()
+
+    _xy = [(0.5, 0.1), (0.1, 0.5), (-0.45, 0.25), (-0.35, -0.4),
+           (0.25, -0.45)]
+
+    def __init__(self, size, position, start_velocity, angular_velocity):
+        super(Asteroid3, self).__init__(size=size, position=position,
+                                        start_velocity=start_velocity,
+                                        angular_velocity=angular_velocity)
+
 
 class Projectile(GamePiece):
+    __slots__ = ('_pool',)
+
     def __init__(self, size, position, velocity):
         super(Projectile, self).__init__(
             size, type="point", position=position, start_velocity=velocity)
+        # The ProjectilePool this projectile is currently handed out by.
+        self._pool = None
+
+    def reset(self, position, velocity):
+        """Reinitializes a detached projectile for reuse."""
+        if self._world is not None:
+            raise RuntimeError("Cannot reset a projectile attached to a world")
+        self.position = position
+        self.velocity = velocity
+        self._sin_angle, self._cos_angle = Rotation.shared.sincos(
+            self._position[2])
+        self._thrust = False
+        self._turn = 0
+        self._gb_repr.xy = (self._position[0], self._position[1])
+        self._world_key = None
+        self._world_repr = None
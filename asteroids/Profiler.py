@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Per-phase instrumentation of GameBoard.step.
+
+A StepProfiler attached to a board times every phase of each step and
+counts the collision tests. After each step it hands one record to its
+exporters, callables exporter(record) with a dict
+    tick         number of the step, from 0,
+    seconds      wall time of each of PHASES,
+    pair_tests   narrow phase tests of pairs of pieces that may collide,
+    axis_tests   separating axis projections of those tests,
+    asteroids, projectiles, ships
+                 entity counts after the step.
+The profiler also keeps a log-scale histogram of the time of each phase.
+Boards without a profiler only pay for one attribute test per step.
+"""
+import bisect
+import json
+import time
+
+import numpy as np
+
+
+PHASES = ('calculate_new_position', 'apply_bounds', 'resolve_collision',
+          'spawn_waves', 'step_sinks')
+
+# Four bins per decade from 100 ns to 10 s.
+DEFAULT_EDGES = tuple((10. ** np.arange(-7., 1.01, 0.25)).tolist())
+
+
+class Histogram(object):
+    """Counts of samples between edges. The first bin holds the samples
+    below edges[0], the last those at or above edges[-1]."""
+    def __init__(self, edges=DEFAULT_EDGES):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, value):
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.
+
+    def percentile(self, q):
+        """Upper edge of the bin holding the q-th percentile; the maximum
+        for the last bin."""
+        if not self.count:
+            return 0.
+        rank = q / 100. * self.count
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                break
+        if idx < len(self.edges):
+            return min(self.edges[idx], self.max)
+        return self.max
+
+    def as_dict(self):
+        return {'edges': list(self.edges), 'counts': list(self.counts),
+                'count': self.count, 'total': self.total, 'max': self.max}
+
+
+class StepProfiler(object):
+    """Collects per-phase timings and counters of the steps of a board."""
+    def __init__(self, exporters=None, edges=DEFAULT_EDGES):
+        self.exporters = list(exporters or [])
+        self.histograms = {phase: Histogram(edges) for phase in PHASES}
+        self.ticks = 0
+        self.pair_tests = 0
+        self.axis_tests = 0
+        self._seconds = None
+        self._pairs = 0
+        self._axes = 0
+        self._mark = 0.
+
+    def attach(self, board):
+        board.profiler = self
+
+    def detach(self, board):
+        board.profiler = None
+
+    def begin(self):
+        self._seconds = dict.fromkeys(PHASES, 0.)
+        self._pairs = 0
+        self._axes = 0
+        self._mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Adds the time since the last lap to phase."""
+        now = time.perf_counter()
+        self._seconds[phase] += now - self._mark
+        self._mark = now
+
+    def count(self, pairs, axes):
+        self._pairs += pairs
+        self._axes += axes
+
+    def end(self, board):
+        seconds = self._seconds
+        for phase in PHASES:
+            self.histograms[phase].add(seconds[phase])
+        self.pair_tests += self._pairs
+        self.axis_tests += self._axes
+        record = {
+            'tick': self.ticks,
+            'seconds': seconds,
+            'pair_tests': self._pairs,
+            'axis_tests': self._axes,
+            'asteroids': len(board._asteroids),
+            'projectiles': len(board._projectiles),
+            'ships': len(board._ships)}
+        self.ticks += 1
+        for exporter in self.exporters:
+            exporter(record)
+
+    def summary(self):
+        """Totals and histograms of all steps so far."""
+        return {'ticks': self.ticks,
+                'pair_tests': self.pair_tests,
+                'axis_tests': self.axis_tests,
+                'phases': {phase: histogram.as_dict()
+                           for phase, histogram in self.histograms.items()}}
+
+
+class JsonLinesExporter(object):
+    """Writes every record as one line of JSON to stream."""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, record):
+        self.stream.write(json.dumps(record, sort_keys=True))
+        self.stream.write('\n')
+
+
+def format_summary(profiler):
+    """Returns a table of the time spent per phase."""
+    total = sum(histogram.total
+                for histogram in profiler.histograms.values())
+    lines = ["{0:<28s}{1:>12s}{2:>8s}{3:>12s}{4:>12s}".format(
+        "phase", "mean us", "share", "p99 us", "max us")]
+    for phase in PHASES:
+        histogram = profiler.histograms[phase]
+        lines.append("{0:<28s}{1:>12.1f}{2:>8.1%}{3:>12.1f}{4:>12.1f}".format(
+            phase, histogram.mean * 1e6,
+            histogram.total / total if total else 0.,
+            histogram.percentile(99.) * 1e6, histogram.max * 1e6))
+    ticks = max(profiler.ticks, 1)
+    lines.append("pair tests per step: {0:.1f}".format(
+        profiler.pair_tests / ticks))
+    lines.append("axis tests per step: {0:.1f}".format(
+        profiler.axis_tests / ticks))
+    return "\n".join(lines)
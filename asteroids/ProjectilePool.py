@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+from asteroids import GamePiece
+
+
+class ProjectilePool(object):
+    """Fixed capacity pool of projectiles with a free list.
+
+    Released projectiles are kept and handed out again by acquire, so
+    sustained fire does not allocate new pieces. The counters tell how
+    large the pool has to be for a given scenario.
+    """
+    def __init__(self, capacity, size):
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Argument 'capacity' has to be a positive int")
+        self.capacity = capacity
+        self.size = size
+        self._free = []
+        self.live = 0
+        self.high_water_mark = 0
+        # Projectiles created, handed out, returned and refused because
+        # the pool was exhausted.
+        self.allocations = 0
+        self.acquisitions = 0
+        self.releases = 0
+        self.rejections = 0
+
+    def __len__(self):
+        return self.live
+
+    @property
+    def free(self):
+        return len(self._free)
+
+    def acquire(self, position, velocity):
+        """Returns a live projectile, or None if the pool is exhausted."""
+        if self.live >= self.capacity:
+            self.rejections += 1
+            return None
+        if self._free:
+            projectile = self._free.pop()
+            projectile.reset(position, velocity)
+        else:
+            projectile = GamePiece.Projectile(
+                size=self.size, position=position, velocity=velocity)
+            self.allocations += 1
+        projectile._pool = self
+        self.live += 1
+        self.acquisitions += 1
+        if self.live > self.high_water_mark:
+            self.high_water_mark = self.live
+        return projectile
+
+    def release(self, projectile):
+        """Returns a projectile handed out by acquire to the free list."""
+        if projectile._pool is not self:
+            raise ValueError("Projectile was not acquired from this pool")
+        projectile._pool = None
+        self._free.append(projectile)
+        self.live -= 1
+        self.releases += 1
+
+    def stats(self):
+        return {'capacity': self.capacity, 'live': self.live,
+                'free': len(self._free),
+                'high_water_mark': self.high_water_mark,
+                'allocations': self.allocations,
+                'acquisitions': self.acquisitions,
+                'releases': self.releases, 'rejections': self.rejections}
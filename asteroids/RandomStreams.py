@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Seeded random streams of a board.
+
+Every GameBoard owns a RandomStreams built from its seed. generator(name)
+returns a numpy Generator seeded from a child of the seed's SeedSequence
+that is derived from the name, so the streams are independent of each
+other and of the order in which they are used. spawn hands out the
+streams of child boards; board_seed(root, index) derives the seed of
+child index directly, so boards seeded from one root in any number of
+processes are reproducible and independent.
+"""
+import zlib
+
+import numpy as np
+
+
+# First spawn key entry of named streams; spawned children use their
+# index, which stays far below it.
+_NAMED = 1 << 32
+
+
+def as_seed_sequence(seed):
+    """Returns seed as a SeedSequence; None draws fresh entropy."""
+    if isinstance(seed, RandomStreams):
+        return seed.seed
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def board_seed(root, index):
+    """Returns the seed of child index of root, the same as
+    as_seed_sequence(root).spawn would hand out for it."""
+    if not isinstance(index, (int, np.integer)) or index < 0:
+        raise ValueError("Argument 'index' has to be a non-negative int")
+    root = as_seed_sequence(root)
+    return np.random.SeedSequence(root.entropy,
+                                  spawn_key=root.spawn_key + (int(index),),
+                                  pool_size=root.pool_size)
+
+
+class RandomStreams(object):
+    """Named numpy Generators derived from one seed, an int, a
+    SeedSequence or None for fresh entropy."""
+    def __init__(self, seed=None):
+        # Fresh entropy is only drawn when a stream is first used.
+        self._seed = None if seed is None else as_seed_sequence(seed)
+        self._generators = {}
+
+    @property
+    def seed(self):
+        """The SeedSequence of the streams."""
+        if self._seed is None:
+            self._seed = np.random.SeedSequence()
+        return self._seed
+
+    @property
+    def entropy(self):
+        """Entropy of the seed; it recreates the streams of a board
+        seeded with None."""
+        return self.seed.entropy
+
+    def generator(self, name):
+        """Returns the Generator of stream name, created on first use."""
+        generator = self._generators.get(name)
+        if generator is None:
+            seed = self.seed
+            child = np.random.SeedSequence(
+                seed.entropy, spawn_key=seed.spawn_key + (
+                    _NAMED, zlib.crc32(name.encode('utf-8'))),
+                pool_size=seed.pool_size)
+            generator = np.random.Generator(np.random.PCG64(child))
+            self._generators[name] = generator
+        return generator
+
+    def spawn(self, count):
+        """Returns the streams of count new child boards."""
+        return [RandomStreams(child) for child in self.seed.spawn(count)]
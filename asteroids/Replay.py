@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Input logs of recorded matches and their replay.
+
+A log starts with FILE_HEADER and holds one record per ship input and per
+step, in the order they were made; inputs to a given ship of a
+multiplayer board carry its entity id. Every keyframe_interval ticks the full
+board state is written as a Snapshot keyframe. Closing a recorder appends
+an index of the keyframes, so a replayer seeks to any tick by restoring
+the nearest keyframe before it and stepping forward from there. Logs
+without an index, e.g. of an interrupted recording, are scanned once.
+"""
+import bisect
+import struct
+
+import numpy as np
+
+from asteroids import Snapshot
+
+
+MAGIC = b'ASTR'
+INDEX_MAGIC = b'ASTI'
+VERSION = 2
+# Version 2 adds the ship-indexed input records.
+VERSIONS = (1, 2)
+
+FILE_HEADER = struct.Struct('<4sH')
+
+TAG_TURN = b't'
+TAG_ACCELERATE = b'a'
+TAG_FIRE = b'f'
+TAG_STEP = b's'
+TAG_SHIP_TURN = b'T'
+TAG_SHIP_ACCELERATE = b'A'
+TAG_SHIP_FIRE = b'F'
+TAG_KEYFRAME = b'k'
+TAG_INDEX = b'i'
+
+TURN = struct.Struct('<cb')
+ACCELERATE = struct.Struct('<cB')
+FIRE = struct.Struct('<c')
+STEP = struct.Struct('<cd')
+# tag, ship id, value.
+SHIP_TURN = struct.Struct('<cqb')
+SHIP_ACCELERATE = struct.Struct('<cqB')
+SHIP_FIRE = struct.Struct('<cq')
+# tag, tick, snapshot length; followed by the snapshot.
+KEYFRAME = struct.Struct('<cQQ')
+# tag, number of ticks, number of keyframes; followed by one INDEX_ENTRY
+# (tick, offset) per keyframe and the FOOTER.
+INDEX = struct.Struct('<cQQ')
+INDEX_ENTRY = struct.Struct('<QQ')
+# offset of the index, magic.
+FOOTER = struct.Struct('<Q4s')
+
+_PAYLOADS = {TAG_TURN: TURN, TAG_ACCELERATE: ACCELERATE, TAG_FIRE: FIRE,
+             TAG_STEP: STEP, TAG_SHIP_TURN: SHIP_TURN,
+             TAG_SHIP_ACCELERATE: SHIP_ACCELERATE, TAG_SHIP_FIRE: SHIP_FIRE,
+             TAG_KEYFRAME: KEYFRAME, TAG_INDEX: INDEX}
+
+
+class Recorder(object):
+    """Writes the inputs and steps of a board to an input log.
+
+    Use the ship_*, ships_input and step methods of the recorder instead
+    of those of the board; they forward to the board and log the call.
+    """
+    def __init__(self, board, path, keyframe_interval=256):
+        if not isinstance(keyframe_interval, int) or keyframe_interval < 1:
+            raise ValueError("Argument 'keyframe_interval' has to be a "
+                             "positive int")
+        self.board = board
+        self.keyframe_interval = keyframe_interval
+        self.ticks = 0
+        self.keyframes = []
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self._write_keyframe()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_keyframe(self):
+        data = self.board.snapshot()
+        self.keyframes.append((self.ticks, self._file.tell()))
+        self._file.write(KEYFRAME.pack(TAG_KEYFRAME, self.ticks, len(data)))
+        self._file.write(data)
+
+    def ship_turn(self, direction, ship_id=None):
+        self.board.ship_turn(direction, ship_id)
+        if ship_id is None:
+            self._file.write(TURN.pack(TAG_TURN, direction))
+        else:
+            self._file.write(SHIP_TURN.pack(TAG_SHIP_TURN, ship_id,
+                                            direction))
+
+    def ship_accelerate(self, value, ship_id=None):
+        self.board.ship_accelerate(value, ship_id)
+        if ship_id is None:
+            self._file.write(ACCELERATE.pack(TAG_ACCELERATE, bool(value)))
+        else:
+            self._file.write(SHIP_ACCELERATE.pack(TAG_SHIP_ACCELERATE,
+                                                  ship_id, bool(value)))
+
+    def ship_fire(self, ship_id=None):
+        projectile = self.board.ship_fire(ship_id)
+        if ship_id is None:
+            self._file.write(FIRE.pack(TAG_FIRE))
+        else:
+            self._file.write(SHIP_FIRE.pack(TAG_SHIP_FIRE, ship_id))
+        return projectile
+
+    def ships_input(self, turn=None, thrust=None, fire=None):
+        """Applies the inputs of all players like GameBoard.ships_input and
+        logs them as one ship-indexed record per ship and input."""
+        ship_ids = self.board.ship_ids
+        projectiles = self.board.ships_input(turn, thrust, fire)
+        # Same order as GameBoard.ships_input: turns, thrusts, then shots.
+        write = self._file.write
+        if turn is not None:
+            for ship_id, value in zip(ship_ids, np.ravel(turn).tolist()):
+                write(SHIP_TURN.pack(TAG_SHIP_TURN, ship_id, int(value)))
+        if thrust is not None:
+            for ship_id, value in zip(ship_ids, np.ravel(thrust).tolist()):
+                write(SHIP_ACCELERATE.pack(TAG_SHIP_ACCELERATE, ship_id,
+                                           bool(value)))
+        if fire is not None:
+            for ship_id, value in zip(ship_ids, np.ravel(fire).tolist()):
+                if value:
+                    write(SHIP_FIRE.pack(TAG_SHIP_FIRE, ship_id))
+        return projectiles
+
+    def step(self, dt):
+        self.board.step(dt)
+        self._file.write(STEP.pack(TAG_STEP, dt))
+        self.ticks += 1
+        if self.ticks % self.keyframe_interval == 0:
+            self._write_keyframe()
+
+    def close(self):
+        """Writes the keyframe index and closes the log."""
+        if self._file.closed:
+            return
+        offset = self._file.tell()
+        self._file.write(INDEX.pack(TAG_INDEX, self.ticks,
+                                    len(self.keyframes)))
+        for entry in self.keyframes:
+            self._file.write(INDEX_ENTRY.pack(*entry))
+        self._file.write(FOOTER.pack(offset, INDEX_MAGIC))
+        self._file.close()
+
+
+def records(stream, offset=FILE_HEADER.size, payloads=False):
+    """Yields (offset, tag, values) for the records of an open log from
+    offset on, reading them one at a time.
+
+    Snapshots of keyframes are skipped, unless payloads is True, in which
+    case the snapshot bytes are appended to the values.
+    """
+    stream.seek(offset)
+    while True:
+        tag = stream.read(1)
+        if not tag or tag == TAG_INDEX:
+            return
+        record = _PAYLOADS.get(tag)
+        if record is None:
+            raise ValueError("Unknown record at offset {0:d}".format(offset))
+        data = tag + stream.read(record.size - 1)
+        if len(data) < record.size:
+            return
+        values = record.unpack(data)[1:]
+        if tag == TAG_KEYFRAME:
+            if payloads:
+                snapshot = stream.read(values[1])
+                if len(snapshot) < values[1]:
+                    return
+                values += (snapshot,)
+            else:
+                stream.seek(values[1], 1)
+        yield offset, tag, values
+        offset = stream.tell()
+
+
+class Replayer(object):
+    """Replays an input log written by a Recorder.
+
+    Every play opens the log on its own, so several replays of the same
+    log can run side by side.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as stream:
+            magic, version = FILE_HEADER.unpack(
+                stream.read(FILE_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("File is not an input log")
+            if version not in VERSIONS:
+                raise ValueError("Unsupported log version "
+                                 "{0:d}".format(version))
+            if not self._read_index(stream):
+                self._scan(stream)
+
+    def _read_index(self, stream):
+        end = stream.seek(0, 2)
+        if end < FILE_HEADER.size + INDEX.size + FOOTER.size:
+            return False
+        stream.seek(end - FOOTER.size)
+        offset, magic = FOOTER.unpack(stream.read(FOOTER.size))
+        if magic != INDEX_MAGIC:
+            return False
+        stream.seek(offset)
+        _, self.ticks, count = INDEX.unpack(stream.read(INDEX.size))
+        self.keyframes = list(INDEX_ENTRY.iter_unpack(
+            stream.read(count * INDEX_ENTRY.size)))
+        return True
+
+    def _scan(self, stream):
+        self.ticks = 0
+        self.keyframes = []
+        for offset, tag, values in records(stream):
+            if tag == TAG_STEP:
+                self.ticks += 1
+            elif tag == TAG_KEYFRAME:
+                self.keyframes.append((values[0], offset))
+        if not self.keyframes:
+            raise ValueError("Input log holds no keyframe")
+
+    def _keyframe_before(self, tick):
+        ticks = [entry[0] for entry in self.keyframes]
+        return self.keyframes[max(bisect.bisect_right(ticks, tick) - 1, 0)]
+
+    def play(self, start=0, stop=None, verify=False):
+        """Yields (tick, board) for the ticks start to stop, where board
+        holds the state after tick steps.
+
+        The same board object is yielded every time and updated in
+        place. With verify, the board is compared against every keyframe
+        it passes and a ValueError is raised on a mismatch.
+        """
+        if stop is None:
+            stop = self.ticks
+        if not 0 <= start <= stop <= self.ticks:
+            raise ValueError("Ticks have to satisfy 0 <= start <= stop <= "
+                             "{0:d}".format(self.ticks))
+        tick, offset = self._keyframe_before(start)
+        board = last = None
+        with open(self.path, 'rb') as stream:
+            for _, tag, values in records(stream, offset, payloads=True):
+                if tag == TAG_STEP:
+                    board.step(values[0])
+                    tick += 1
+                elif tag == TAG_TURN:
+                    board.ship_turn(values[0])
+                elif tag == TAG_ACCELERATE:
+                    board.ship_accelerate(values[0])
+                elif tag == TAG_FIRE:
+                    board.ship_fire()
+                elif tag == TAG_SHIP_TURN:
+                    board.ship_turn(values[1], values[0])
+                elif tag == TAG_SHIP_ACCELERATE:
+                    board.ship_accelerate(values[1], values[0])
+                elif tag == TAG_SHIP_FIRE:
+                    board.ship_fire(values[0])
+                elif board is None:
+                    board = Snapshot.restore(values[2])
+                elif verify and board.snapshot() != values[2]:
+                    raise ValueError("Replay diverged at tick "
+                                     "{0:d}".format(tick))
+
+                if tick >= start and tick != last:
+                    last = tick
+                    yield tick, board
+                    if tick >= stop:
+                        return
+
+    def seek(self, tick):
+        """Returns a board with the state after tick steps."""
+        for _, board in self.play(tick, tick):
+            return board
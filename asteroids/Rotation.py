@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Sine and cosine of piece headings.
+
+The scalar code paths call sin and cos for one angle at a time, where
+numpy ufuncs are several times slower than the math module. All pieces
+share the RotationCache in shared, which computes them in one of three
+modes:
+    exact        math.sin and math.cos of the angle,
+    incremental  a turning heading is rotated by the cached sine and
+                 cosine of its step angle, turn * angular_velocity * dt,
+                 which is the same for every step of a piece,
+    table        angles are rounded to resolution steps per turn and
+                 looked up in a table.
+incremental and table are approximations and change the results of a
+game compared to exact.
+"""
+import math
+
+import numpy as np
+
+
+MODES = ('exact', 'incremental', 'table')
+
+_TWO_PI = 2. * math.pi
+
+
+class RotationCache(object):
+    """Computes sine and cosine of headings in one of MODES.
+
+    sincos(angle) returns sine and cosine of angle. turn(angle, sin_angle,
+    cos_angle, delta) returns them for the heading angle, reached from
+    the heading sin_angle, cos_angle by turning delta. Step rotations are
+    cached per step angle, up to max_steps distinct angles.
+    """
+    def __init__(self, mode='exact', resolution=1 << 16, max_steps=1024):
+        self._steps = {}
+        self.max_steps = max_steps
+        self.configure(mode, resolution)
+
+    def configure(self, mode=None, resolution=None):
+        """Switches the mode and the table resolution."""
+        if mode is None:
+            mode = self.mode
+        if mode not in MODES:
+            raise ValueError("Unknown rotation mode '{0!s}'".format(mode))
+        if resolution is None:
+            resolution = self.resolution
+        if not isinstance(resolution, int) or resolution < 4:
+            raise ValueError("Argument 'resolution' has to be an int of at "
+                             "least 4")
+        self.mode = mode
+        self.resolution = resolution
+        self._scale = resolution / _TWO_PI
+        if mode == 'table':
+            angles = np.arange(resolution) * (_TWO_PI / resolution)
+            self._table = list(zip(np.sin(angles).tolist(),
+                                   np.cos(angles).tolist()))
+            self.sincos = self._sincos_table
+        else:
+            self._table = None
+            self.sincos = _sincos_exact
+        if mode == 'incremental':
+            self.turn = self._turn_incremental
+        else:
+            self.turn = self._turn_direct
+
+    def _sincos_table(self, angle):
+        idx = int(math.floor(angle * self._scale + 0.5))
+        return self._table[idx % self.resolution]
+
+    def _turn_direct(self, angle, sin_angle, cos_angle, delta):
+        return self.sincos(angle)
+
+    def _turn_incremental(self, angle, sin_angle, cos_angle, delta):
+        sin_delta, cos_delta = self.step(delta)
+        sin_new = sin_angle * cos_delta + cos_angle * sin_delta
+        cos_new = cos_angle * cos_delta - sin_angle * sin_delta
+        # First order renormalisation keeps the heading a unit vector
+        # against rounding drift.
+        scale = 1.5 - 0.5 * (sin_new * sin_new + cos_new * cos_new)
+        return sin_new * scale, cos_new * scale
+
+    def step(self, delta):
+        """Returns the cached sine and cosine of the step angle delta."""
+        rotation = self._steps.get(delta)
+        if rotation is None:
+            if len(self._steps) >= self.max_steps:
+                self._steps.clear()
+            rotation = self._steps[delta] = (math.sin(delta),
+                                             math.cos(delta))
+        return rotation
+
+
+def _sincos_exact(angle):
+    return math.sin(angle), math.cos(angle)
+
+
+shared = RotationCache()
+
+
+def configure(mode=None, resolution=None):
+    """Configures the RotationCache shared by all pieces."""
+    shared.configure(mode, resolution)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Headless fixed-timestep simulation runner.
+
+Example:
+    python -m asteroids.Runner --ticks 10000 --dt 0.05 --fast-forward
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Profiler
+from asteroids import RandomStreams
+from asteroids import Rotation
+from asteroids import Spawner
+
+
+ASTEROID_TYPES = (GamePiece.Asteroid1, GamePiece.Asteroid2,
+                  GamePiece.Asteroid3)
+
+
+def make_board(size=(800., 600.), no_asteroids=12, seed=None,
+               vectorized=False, ship_size=10., analytic=False):
+    """Creates a board with a ship in the centre and random asteroids that
+    keep clear of the ship.
+
+    seed also seeds the random streams of the board, see GameBoard. For a
+    SeedSequence or RandomStreams the asteroids are the first wave of its
+    'waves' stream; int and None seeds keep the layout of earlier
+    versions, so recorded seeds replay the same games.
+    """
+    board = GameBoard.GameBoard(size=tuple(size), no_asteroids=no_asteroids,
+                                vectorized=vectorized, analytic=analytic,
+                                seed=seed)
+    centre = (size[0] / 2., size[1] / 2.)
+    board._add_ship(GamePiece.Ship(ship_size, (centre[0], centre[1], 0.)))
+    if isinstance(seed, (np.random.SeedSequence,
+                         RandomStreams.RandomStreams)):
+        Spawner.WaveSpawner(
+            min_size=10., max_size=30., min_speed=0., max_speed=20.,
+            clearance=2. * ship_size + 30.).spawn(board)
+        return board
+    rng = np.random.RandomState(seed)
+    while len(board._asteroids) < no_asteroids:
+        asteroid_size = rng.uniform(10., 30.)
+        x, y = rng.uniform(0., size[0]), rng.uniform(0., size[1])
+        if np.hypot(x - centre[0], y - centre[1]) < 2. * (
+                asteroid_size + ship_size):
+            continue
+        cls = ASTEROID_TYPES[rng.randint(len(ASTEROID_TYPES))]
+        board._add_asteroid(cls(
+            size=asteroid_size, position=(x, y, rng.uniform(0., 2. * np.pi)),
+            start_velocity=tuple(rng.uniform(-20., 20., 2)),
+            angular_velocity=rng.uniform(-1., 1.)))
+    return board
+
+
+def entity_counts(board):
+    return {'asteroids': len(board._asteroids),
+            'projectiles': len(board._projectiles),
+            'ships': len(board._ships)}
+
+
+class RunResult(object):
+    def __init__(self, ticks, dt, seconds, latencies, counts_start,
+                 counts_end, max_entities, gameover):
+        self.ticks = ticks
+        self.dt = dt
+        self.seconds = seconds
+        self.latencies = latencies
+        self.counts_start = counts_start
+        self.counts_end = counts_end
+        self.max_entities = max_entities
+        self.gameover = gameover
+
+    @property
+    def ticks_per_second(self):
+        if self.seconds <= 0.:
+            return float('inf')
+        return self.ticks / self.seconds
+
+    @property
+    def realtime_factor(self):
+        """Simulated seconds per wall clock second."""
+        return self.ticks_per_second * self.dt
+
+    def percentile(self, q):
+        """Step latency percentile in seconds, None in fast-forward mode."""
+        if self.latencies is None or len(self.latencies) == 0:
+            return None
+        return float(np.percentile(self.latencies, q))
+
+    def as_dict(self):
+        return {'ticks': self.ticks, 'dt': self.dt, 'seconds': self.seconds,
+                'ticks_per_second': self.ticks_per_second,
+                'realtime_factor': self.realtime_factor,
+                'p50_step_seconds': self.percentile(50.),
+                'p99_step_seconds': self.percentile(99.),
+                'entities_start': self.counts_start,
+                'entities_end': self.counts_end,
+                'max_entities': self.max_entities,
+                'gameover': self.gameover}
+
+
+def run(board, ticks, dt, fast_forward=False, policy=None,
+        stop_on_gameover=False):
+    """Advances board by up to ticks steps of dt.
+
+    policy(board, tick) is called before each step and may call the
+    ship_* methods of the board. In fast-forward mode the per-step
+    latencies and entity counts are not sampled.
+    """
+    if not isinstance(ticks, int) or ticks < 0:
+        raise ValueError("Argument 'ticks' has to be a non-negative int")
+    if dt <= 0.:
+        raise ValueError("Argument 'dt' has to be positive")
+    counts_start = entity_counts(board)
+    step = board.step
+    done = 0
+
+    if fast_forward:
+        latencies = None
+        start = time.perf_counter()
+        for tick in range(ticks):
+            if policy is not None:
+                policy(board, tick)
+            step(dt)
+            done += 1
+            if stop_on_gameover and board.gameover:
+                break
+        seconds = time.perf_counter() - start
+        max_entities = None
+    else:
+        latencies = np.empty(ticks)
+        max_entities = len(board.moving_objects)
+        clock = time.perf_counter
+        start = clock()
+        for tick in range(ticks):
+            if policy is not None:
+                policy(board, tick)
+            before = clock()
+            step(dt)
+            latencies[tick] = clock() - before
+            done += 1
+            max_entities = max(max_entities, len(board.moving_objects))
+            if stop_on_gameover and board.gameover:
+                break
+        seconds = clock() - start
+        latencies = latencies[:done]
+
+    return RunResult(done, dt, seconds, latencies, counts_start,
+                     entity_counts(board), max_entities, board.gameover)
+
+
+def format_result(result):
+    lines = [
+        "ticks:            {0:d} (dt={1:g})".format(result.ticks, result.dt),
+        "wall time:        {0:.3f} s".format(result.seconds),
+        "ticks per second: {0:.1f}".format(result.ticks_per_second),
+        "realtime factor:  {0:.1f}x".format(result.realtime_factor)]
+    if result.latencies is not None:
+        lines.append("step latency:     p50 {0:.1f} us, p99 {1:.1f} us".format(
+            result.percentile(50.) * 1e6, result.percentile(99.) * 1e6))
+        lines.append("max entities:     {0:d}".format(result.max_entities))
+    lines.append("entities:         {0} -> {1}".format(
+        result.counts_start, result.counts_end))
+    lines.append("game over:        {0}".format(result.gameover))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Advance a headless GameBoard at a fixed timestep.")
+    parser.add_argument('--ticks', type=int, default=1000)
+    parser.add_argument('--dt', type=float, default=1. / 60.)
+    parser.add_argument('--size', type=float, nargs=2, default=(800., 600.))
+    parser.add_argument('--asteroids', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--vectorized', action='store_true',
+                        help="integrate the board with a WorldState")
+    parser.add_argument('--analytic', action='store_true',
+                        help="move asteroids and projectiles in closed form")
+    parser.add_argument('--rotation', choices=Rotation.MODES,
+                        default=Rotation.shared.mode,
+                        help="how scalar pieces compute their heading")
+    parser.add_argument('--split', action='store_true',
+                        help="split asteroids hit by projectiles")
+    parser.add_argument('--waves', action='store_true',
+                        help="spawn a new wave once the board is cleared")
+    parser.add_argument('--fast-forward', action='store_true',
+                        help="skip per-step latency and entity sampling")
+    parser.add_argument('--stop-on-gameover', action='store_true')
+    parser.add_argument('--profile', action='store_true',
+                        help="time the phases of every step")
+    parser.add_argument('--json', action='store_true',
+                        help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    Rotation.configure(args.rotation)
+    board = make_board(size=args.size, no_asteroids=args.asteroids,
+                       seed=args.seed, vectorized=args.vectorized,
+                       analytic=args.analytic)
+    if args.split:
+        board.splitter = Spawner.Splitter()
+    if args.waves:
+        board.spawner = Spawner.WaveSpawner()
+    profiler = None
+    if args.profile:
+        profiler = Profiler.StepProfiler()
+        profiler.attach(board)
+    result = run(board, args.ticks, args.dt, fast_forward=args.fast_forward,
+                 stop_on_gameover=args.stop_on_gameover)
+    if args.json:
+        output = result.as_dict()
+        if profiler is not None:
+            output['profile'] = profiler.summary()
+        print(json.dumps(output, indent=2))
+    else:
+        print(format_result(result))
+        if profiler is not None:
+            print(Profiler.format_summary(profiler))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import numpy as np
+
+
+GROUPS = ('ship', 'asteroids', 'projectiles')
+
+
+class SubstepScheduler(object):
+    """Chooses how many substeps every group of pieces takes in a step.
+
+    A group moving further than tolerance times the smallest collider
+    radius on the board during one step is split into enough substeps to
+    stay below that distance. Counts are powers of two up to
+    max_substeps, so the substeps of all groups line up.
+    """
+    def __init__(self, tolerance=0.5, max_substeps=16):
+        if tolerance <= 0.:
+            raise ValueError("Argument 'tolerance' has to be positive")
+        if (not isinstance(max_substeps, int) or max_substeps < 1 or
+                max_substeps & (max_substeps - 1)):
+            raise ValueError("Argument 'max_substeps' has to be a power "
+                             "of two")
+        self.tolerance = tolerance
+        self.max_substeps = max_substeps
+        # Counts chosen for the last step.
+        self.last = dict.fromkeys(GROUPS, 1)
+
+    def _count(self, distance, length):
+        limit = self.tolerance * length
+        if limit <= 0. or distance <= limit:
+            return 1
+        count = int(np.ceil(distance / limit))
+        return min(1 << (count - 1).bit_length(), self.max_substeps)
+
+    def substeps(self, board, dt):
+        """Returns the number of substeps per group for a step of dt."""
+        counts = dict.fromkeys(GROUPS, 1)
+        asteroids = board._asteroids.items
+        if asteroids:
+            radii = [asteroid.bounding_radius for asteroid in asteroids]
+            ships = board._ships.items
+            radii.extend(ship.bounding_radius for ship in ships)
+            length = min(radii)
+
+            speed = np.hypot(*board._velocities(asteroids).T).max()
+            counts['asteroids'] = self._count(speed * dt, length)
+            if board._projectiles.items:
+                speed = np.hypot(
+                    *board._velocities(board._projectiles.items).T).max()
+                counts['projectiles'] = self._count(speed * dt, length)
+            if ships:
+                # Upper bound of the speed at the end of the step.
+                speed = max(np.hypot(*ship.velocity) +
+                            abs(ship.thrust) * ship._acceleration * dt
+                            for ship in ships)
+                counts['ship'] = self._count(speed * dt, length)
+        self.last = counts
+        return counts
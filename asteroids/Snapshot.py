@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Versioned binary snapshots of a GameBoard.
+
+A snapshot is a fixed size header followed by one packed record per piece
+(see PIECE_DTYPE): the ships first, then the asteroids and the
+projectiles in the order of their registries. All values are stored
+little endian and at full precision, so a restored board steps exactly
+like the original. Since version 3 the records are followed by the
+configuration of the board as UTF-8 JSON, which holds the boundary
+policy and its state, the substep scheduler, the splitter, the wave
+spawner with its wave count, the seed and generator states of the
+random streams and the multiplayer settings: max_ships, friendly fire,
+the team of every ship and the owner of every projectile. Teams have to
+be ints or strings.
+"""
+import json
+import struct
+
+import numpy as np
+
+from asteroids import Boundary
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Scheduler
+from asteroids import Spawner
+
+
+MAGIC = b'ASTB'
+VERSION = 3
+
+# magic, version; the start of the header of every version.
+PREFIX = struct.Struct('<4sH')
+# magic, version, flags, number of pieces, board width and height,
+# no_asteroids, score, projectile pool capacity, next entity id, since
+# version 2 the clock of the analytic pieces and since version 3 the
+# length of the configuration.
+HEADER_V1 = struct.Struct('<4sHHQddqqqq')
+HEADER_V2 = struct.Struct('<4sHHQddqqqqd')
+HEADER = struct.Struct('<4sHHQddqqqqdQ')
+
+FLAG_VECTORIZED = 1
+FLAG_GAMEOVER = 2
+FLAG_SWEPT = 4
+FLAG_ANALYTIC = 8
+
+KIND_SHIP = Boundary.KIND_SHIP
+KIND_ASTEROID = Boundary.KIND_ASTEROID
+KIND_PROJECTILE = Boundary.KIND_PROJECTILE
+
+PIECE_DTYPE_V1 = np.dtype([
+    ('kind', '<u1'),
+    ('pooled', '<u1'),
+    ('thrust', '<i1'),
+    ('turn', '<i1'),
+    ('shape', '<i4'),
+    ('entity_id', '<i8'),
+    ('size', '<f8'),
+    ('position', '<f8', (3,)),
+    ('velocity', '<f8', (2,)),
+    ('sin_angle', '<f8'),
+    ('cos_angle', '<f8'),
+    ('acceleration', '<f8'),
+    ('angular_velocity', '<f8')])
+
+# Version 2 adds the reference pose and time of analytic pieces.
+PIECE_DTYPE = np.dtype(PIECE_DTYPE_V1.descr + [
+    ('origin', '<f8', (3,)),
+    ('t0', '<f8')])
+
+_FORMATS = {1: (HEADER_V1, PIECE_DTYPE_V1), 2: (HEADER_V2, PIECE_DTYPE),
+            3: (HEADER, PIECE_DTYPE)}
+
+_POLICIES = {'Toroidal': Boundary.Toroidal, 'Arena': Boundary.Arena,
+             'ProjectileRange': Boundary.ProjectileRange}
+
+
+def _policy_state(policy):
+    name = type(policy).__name__
+    if _POLICIES.get(name) is not type(policy):
+        raise ValueError("Boundary policy '{0}' cannot be stored in a "
+                         "snapshot".format(name))
+    state = {'type': name}
+    if name == 'ProjectileRange':
+        state['max_distance'] = policy.max_distance
+        state['max_age'] = policy.max_age
+        state['base'] = _policy_state(policy.base)
+        state['origins'] = [[entity_id] + list(origin) for entity_id, origin
+                            in sorted(policy._origins.items())]
+    return state
+
+
+def _make_policy(state):
+    name = state['type']
+    if name not in _POLICIES:
+        raise ValueError("Unknown boundary policy '{0}'".format(name))
+    if name != 'ProjectileRange':
+        return _POLICIES[name]()
+    policy = Boundary.ProjectileRange(state['max_distance'],
+                                      state['max_age'],
+                                      _make_policy(state['base']))
+    policy._origins = {int(origin[0]): list(origin[1:])
+                       for origin in state['origins']}
+    return policy
+
+
+_SPLITTER = ('pieces', 'ratio', 'min_size', 'spread', 'speedup')
+_SPAWNER = ('min_size', 'max_size', 'min_speed', 'max_speed',
+            'max_angular_velocity', 'clearance', 'speedup')
+
+
+def _generator(state):
+    bit_generator = getattr(np.random, state['bit_generator'])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def _team(team):
+    if isinstance(team, np.integer):
+        return int(team)
+    if not isinstance(team, (int, str)):
+        raise ValueError("Team {0!r} cannot be stored in a "
+                         "snapshot".format(team))
+    return team
+
+
+def _ships_state(board):
+    ship = board._ship
+    return {'max_ships': board.max_ships,
+            'friendly_fire': bool(board.friendly_fire),
+            'ship': None if ship is None else board.entity_id(ship),
+            'teams': [[board.entity_id(ship), _team(board._teams[ship])]
+                      for ship in board._ships],
+            'owners': sorted([board.entity_id(projectile), owner,
+                              _team(team)]
+                             for projectile, (owner, team)
+                             in board._owners.items())}
+
+
+def _config(board):
+    """Returns the configuration of board that is not held by the
+    pieces."""
+    config = {'boundary': _policy_state(board.boundary), 'scheduler': None,
+              'splitter': None, 'spawner': None, 'random': None,
+              'ships': _ships_state(board)}
+    scheduler = board.scheduler
+    if scheduler is not None:
+        config['scheduler'] = {'tolerance': scheduler.tolerance,
+                               'max_substeps': scheduler.max_substeps}
+    splitter = board.splitter
+    if splitter is not None:
+        config['splitter'] = {name: getattr(splitter, name)
+                              for name in _SPLITTER}
+    spawner = board.spawner
+    if spawner is not None:
+        config['spawner'] = {name: getattr(spawner, name)
+                             for name in _SPAWNER}
+        config['spawner']['waves'] = spawner.waves
+        config['spawner']['rng'] = (None if spawner.rng is None else
+                                    spawner.rng.bit_generator.state)
+    # Unseeded streams that were never used have no state yet.
+    seed = board.random._seed
+    if seed is not None:
+        entropy = seed.entropy
+        config['random'] = {
+            'entropy': (list(entropy) if isinstance(entropy, (list, tuple))
+                        else entropy),
+            'spawn_key': list(seed.spawn_key), 'pool_size': seed.pool_size,
+            'streams': {name: generator.bit_generator.state
+                        for name, generator
+                        in board.random._generators.items()}}
+    return config
+
+
+def _pieces(board):
+    for ship in board._ships:
+        yield KIND_SHIP, ship
+    for asteroid in board._asteroids:
+        yield KIND_ASTEROID, asteroid
+    for projectile in board._projectiles:
+        yield KIND_PROJECTILE, projectile
+
+
+def snapshot(board):
+    """Packs the state of board into bytes."""
+    kinds, pieces = zip(*_pieces(board)) if board.moving_objects else ((), ())
+    pool = board.projectile_pool
+    records = np.zeros(len(pieces), dtype=PIECE_DTYPE)
+    if pieces:
+        records['kind'] = kinds
+        records['pooled'] = [getattr(piece, '_pool', None) is pool
+                             for piece in pieces]
+        records['thrust'] = [piece.thrust for piece in pieces]
+        records['turn'] = [piece.turn for piece in pieces]
+        records['shape'] = [piece.shape_id if kind == KIND_ASTEROID else -1
+                            for kind, piece in zip(kinds, pieces)]
+        records['entity_id'] = [board.entity_id(piece) for piece in pieces]
+        records['size'] = [piece.size for piece in pieces]
+        records['position'] = [piece.position for piece in pieces]
+        records['velocity'] = [piece.velocity for piece in pieces]
+        headings = [piece._heading() for piece in pieces]
+        records['cos_angle'] = [heading[0] for heading in headings]
+        records['sin_angle'] = [heading[1] for heading in headings]
+        records['acceleration'] = [piece._acceleration for piece in pieces]
+        records['angular_velocity'] = [piece._angular_velocity
+                                       for piece in pieces]
+        if board._analytic is not None:
+            analytic = board._analytic
+            references = [analytic.get_reference(piece._slot)
+                          if piece._world is analytic else
+                          (piece.position, analytic.time)
+                          for piece in pieces]
+            records['origin'] = [reference[0] for reference in references]
+            records['t0'] = [reference[1] for reference in references]
+
+    flags = 0
+    if board._world is not None:
+        flags |= FLAG_VECTORIZED
+    if board.gameover:
+        flags |= FLAG_GAMEOVER
+    if board.swept:
+        flags |= FLAG_SWEPT
+    time = 0.
+    if board._analytic is not None:
+        flags |= FLAG_ANALYTIC
+        time = board._analytic.time
+    config = json.dumps(_config(board), sort_keys=True,
+                        separators=(',', ':')).encode('utf-8')
+    header = HEADER.pack(
+        MAGIC, VERSION, flags, len(records), board.size[0], board.size[1],
+        board.no_asteroids, board.score, board.projectile_pool.capacity,
+        board.moving_objects.next_id, time, len(config))
+    return header + records.tobytes() + config
+
+
+def read(buffer):
+    """Returns the header fields and the piece records of a snapshot.
+
+    The records are a read-only view into buffer, which may be bytes, a
+    memoryview or an mmap; nothing is copied.
+    """
+    view = memoryview(buffer)
+    if len(view) < PREFIX.size:
+        raise ValueError("Buffer is too short for a snapshot header")
+    magic, version = PREFIX.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Buffer does not hold a board snapshot")
+    if version not in _FORMATS:
+        raise ValueError("Unsupported snapshot version {0:d}".format(version))
+    header_struct, dtype = _FORMATS[version]
+    if len(view) < header_struct.size:
+        raise ValueError("Buffer is too short for a snapshot header")
+    fields = header_struct.unpack_from(view)
+    (flags, count, width, height, no_asteroids, score, capacity,
+     next_id) = fields[2:10]
+    time = fields[10] if version >= 2 else 0.
+    end = header_struct.size + count * dtype.itemsize
+    config_end = end + (fields[11] if version >= 3 else 0)
+    if len(view) < config_end:
+        raise ValueError("Snapshot is truncated")
+    records = np.frombuffer(view, dtype=dtype, count=count,
+                            offset=header_struct.size)
+    config = {}
+    if config_end > end:
+        config = json.loads(bytes(view[end:config_end]).decode('utf-8'))
+    header = {'version': version, 'size': (width, height),
+              'no_asteroids': no_asteroids, 'score': score,
+              'projectile_capacity': capacity, 'next_entity_id': next_id,
+              'vectorized': bool(flags & FLAG_VECTORIZED),
+              'gameover': bool(flags & FLAG_GAMEOVER),
+              'swept': bool(flags & FLAG_SWEPT),
+              'analytic': bool(flags & FLAG_ANALYTIC), 'time': time,
+              'config': config}
+    return header, records
+
+
+def _set_state(piece, record):
+    # Written before the piece is added to the board, i.e. while the
+    # piece still holds its own state.
+    position = record['position']
+    velocity = record['velocity']
+    piece._position = (float(position[0]), float(position[1]),
+                       float(position[2]))
+    piece._velocity = (float(velocity[0]), float(velocity[1]))
+    piece._sin_angle = record['sin_angle']
+    piece._cos_angle = record['cos_angle']
+    piece._acceleration = float(record['acceleration'])
+    piece._angular_velocity = float(record['angular_velocity'])
+    piece._thrust = int(record['thrust'])
+    piece._turn = int(record['turn'])
+
+
+def restore(buffer):
+    """Creates a GameBoard from a snapshot."""
+    header, records = read(buffer)
+    config = header['config']
+    boundary = None
+    if 'boundary' in config:
+        boundary = _make_policy(config['boundary'])
+    scheduler = splitter = spawner = seed = None
+    if config.get('scheduler') is not None:
+        scheduler = Scheduler.SubstepScheduler(**config['scheduler'])
+    if config.get('splitter') is not None:
+        splitter = Spawner.Splitter(**config['splitter'])
+    if config.get('spawner') is not None:
+        state = config['spawner']
+        spawner = Spawner.WaveSpawner(**{name: state[name]
+                                         for name in _SPAWNER})
+        spawner.waves = state['waves']
+        if state['rng'] is not None:
+            spawner.rng = _generator(state['rng'])
+    random = config.get('random')
+    if random is not None:
+        seed = np.random.SeedSequence(
+            random['entropy'], spawn_key=tuple(random['spawn_key']),
+            pool_size=random['pool_size'])
+    ships = config.get('ships')
+    if ships is None:
+        # Older snapshots make room for just the stored ships.
+        ships = {'max_ships': max(1, int(np.count_nonzero(
+            records['kind'] == KIND_SHIP))), 'friendly_fire': False,
+            'ship': None, 'teams': [], 'owners': []}
+    teams = {entity_id: team for entity_id, team in ships['teams']}
+    owners = {entity_id: (owner, team)
+              for entity_id, owner, team in ships['owners']}
+    board = GameBoard.GameBoard(
+        size=header['size'], no_asteroids=header['no_asteroids'],
+        vectorized=header['vectorized'],
+        projectile_capacity=header['projectile_capacity'],
+        swept=header['swept'], scheduler=scheduler,
+        analytic=header['analytic'], boundary=boundary, splitter=splitter,
+        spawner=spawner, seed=seed, max_ships=ships['max_ships'],
+        friendly_fire=ships['friendly_fire'])
+    if random is not None:
+        for name, state in random['streams'].items():
+            board.random.generator(name).bit_generator.state = state
+    board.gameover = header['gameover']
+    board.score = header['score']
+    analytic = board._analytic
+    if analytic is not None:
+        analytic.time = header['time']
+
+    for record in records:
+        kind = record['kind']
+        size = float(record['size'])
+        entity_id = int(record['entity_id'])
+        if kind == KIND_SHIP:
+            piece = GamePiece.Ship(size)
+            _set_state(piece, record)
+            board._add_ship(piece, entity_id, teams.get(entity_id))
+        elif kind == KIND_ASTEROID:
+            cls = GamePiece.asteroid_class(int(record['shape']))
+            piece = cls(size, (0., 0., 0.), (0., 0.), 0.)
+            _set_state(piece, record)
+            board._add_asteroid(piece, entity_id)
+        elif kind == KIND_PROJECTILE:
+            if record['pooled']:
+                piece = board.projectile_pool.acquire((0., 0., 0.), (0., 0.))
+                if piece is None:
+                    raise ValueError("Snapshot holds more pooled "
+                                     "projectiles than the pool capacity")
+            else:
+                piece = GamePiece.Projectile(size, (0., 0., 0.), (0., 0.))
+            _set_state(piece, record)
+            board._add_projectile(piece, entity_id)
+            if entity_id in owners:
+                board._owners[piece] = owners[entity_id]
+        else:
+            raise ValueError("Unknown piece kind {0:d}".format(kind))
+        if analytic is not None and piece._world is analytic:
+            analytic.set_reference(piece._slot, record['origin'],
+                                   record['t0'])
+    if ships['ship'] is not None:
+        board._ship = board._ships.get(ships['ship'])
+    board.moving_objects.next_id = header['next_entity_id']
+    return board
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Asteroid splitting and waves.
+
+A Splitter passed to a GameBoard breaks every asteroid destroyed by a
+projectile into smaller ones, and a WaveSpawner fills the board up to
+its no_asteroids asteroids whenever the last one is destroyed. Both
+describe the new asteroids as arrays and create them with
+GamePiece.make_asteroids, and the board adds them in one batch.
+"""
+import numpy as np
+
+from asteroids import BroadPhase
+from asteroids import GamePiece
+from asteroids import RandomStreams
+
+
+class Splitter(object):
+    """Splits an asteroid into pieces asteroids of ratio times its size
+    and of the same shape, unless they would be smaller than min_size.
+
+    The pieces fly off speedup times faster than the asteroid, in
+    directions spread apart by the angle spread around its velocity, and
+    turn in alternating directions.
+    """
+    def __init__(self, pieces=2, ratio=0.5, min_size=10., spread=np.pi / 3.,
+                 speedup=1.5):
+        if not isinstance(pieces, int) or pieces < 1:
+            raise ValueError("Argument 'pieces' has to be a positive int")
+        if not 0. < ratio < 1.:
+            raise ValueError("Argument 'ratio' has to be between 0 and 1")
+        if min_size <= 0.:
+            raise ValueError("Argument 'min_size' has to be positive")
+        self.pieces = pieces
+        self.ratio = ratio
+        self.min_size = min_size
+        self.spread = spread
+        self.speedup = speedup
+
+    def split(self, shape_ids, sizes, positions, velocities,
+              angular_velocities):
+        """Returns the arguments of GamePiece.make_asteroids for the
+        pieces of the asteroids given by the same arrays."""
+        sizes = np.asarray(sizes, dtype=float) * self.ratio
+        keep = sizes >= self.min_size
+        pieces = self.pieces
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)[keep]
+        velocities = np.asarray(velocities, dtype=float).reshape(-1, 2)[keep]
+        speed = np.hypot(velocities[:, 0], velocities[:, 1])
+        # Asteroids at rest split along their heading.
+        heading = np.where(speed > 0.,
+                           np.arctan2(velocities[:, 1], velocities[:, 0]),
+                           positions[:, 2])
+        speed = np.repeat(speed * self.speedup, pieces)
+        shape_ids = np.repeat(np.asarray(shape_ids)[keep], pieces)
+        sizes = np.repeat(sizes[keep], pieces)
+        positions = np.repeat(positions, pieces, axis=0)
+        offsets = (np.arange(pieces) - 0.5 * (pieces - 1)) * self.spread
+        directions = (heading[:, None] + offsets).ravel()
+        velocities = np.column_stack((speed * np.cos(directions),
+                                      speed * np.sin(directions)))
+        signs = np.where(np.arange(pieces) % 2 == 0, 1., -1.)
+        angular_velocities = (np.asarray(angular_velocities,
+                                         dtype=float)[keep][:, None] *
+                              signs).ravel()
+        return shape_ids, sizes, positions, velocities, angular_velocities
+
+
+class WaveSpawner(object):
+    """Fills a board with asteroids whenever it has none left.
+
+    The asteroids of a wave get random shapes, sizes between min_size and
+    max_size, speeds between min_speed and max_speed and angular
+    velocities up to max_angular_velocity. They are placed at least
+    clearance plus their bounding radius away from every ship. Each wave
+    is speedup times faster than the one before.
+
+    The spawner draws from the 'waves' stream of the board, or with a
+    seed from a stream of its own.
+    """
+    def __init__(self, min_size=20., max_size=40., min_speed=10.,
+                 max_speed=30., max_angular_velocity=1., clearance=50.,
+                 speedup=1., seed=None):
+        if not 0. < min_size <= max_size:
+            raise ValueError("Sizes have to be positive and min_size at "
+                             "most max_size")
+        if not 0. <= min_speed <= max_speed:
+            raise ValueError("Speeds have to be non-negative and min_speed "
+                             "at most max_speed")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.max_angular_velocity = max_angular_velocity
+        self.clearance = clearance
+        self.speedup = speedup
+        if seed is None:
+            self.rng = None
+        else:
+            self.rng = RandomStreams.RandomStreams(seed).generator('waves')
+        # Number of waves spawned so far.
+        self.waves = 0
+
+    def update(self, board):
+        """Spawns the next wave if the board has no asteroids left and
+        returns its asteroids."""
+        if len(board._asteroids):
+            return []
+        return self.spawn(board)
+
+    def sample(self, rng, count, size):
+        """Draws the parameters of count asteroids on a board of size
+        with one call to rng and returns the arguments of
+        GamePiece.make_asteroids."""
+        u = rng.random((count, 8))
+        choices = np.array(GamePiece.asteroid_shape_ids())
+        shape_ids = choices[np.minimum((u[:, 0] * len(choices)).astype(int),
+                                       len(choices) - 1)]
+        sizes = self.min_size + (self.max_size - self.min_size) * u[:, 1]
+        positions = u[:, 2:5] * (size[0], size[1], 2. * np.pi)
+        speed = ((self.min_speed + (self.max_speed - self.min_speed) *
+                  u[:, 5]) * self.speedup ** self.waves)
+        direction = 2. * np.pi * u[:, 6]
+        velocities = np.column_stack((speed * np.cos(direction),
+                                      speed * np.sin(direction)))
+        angular_velocities = self.max_angular_velocity * (2. * u[:, 7] - 1.)
+        return shape_ids, sizes, positions, velocities, angular_velocities
+
+    def spawn(self, board, count=None):
+        """Adds count asteroids, by default board.no_asteroids, to board
+        in one batch and returns them."""
+        if count is None:
+            count = board.no_asteroids
+        rng = self.rng if self.rng is not None else board.random.generator(
+            'waves')
+        arrays = self.sample(rng, count, board.size)
+        shape_ids, sizes, positions = arrays[:3]
+        radii = sizes * np.array([GamePiece.shape_template(shape_id).radius
+                                  for shape_id in shape_ids.tolist()])
+        self._place(rng, board, positions, radii)
+        asteroids = GamePiece.make_asteroids(*arrays)
+        board._add_asteroids(asteroids)
+        self.waves += 1
+        return asteroids
+
+    def _place(self, rng, board, positions, radii, max_tries=100):
+        """Draws the positions that are too close to a ship of board
+        again."""
+        ships = board._ships.items
+        if not ships:
+            return
+        size = np.array(board.size, dtype=float)
+        ship_xy = board._positions(ships)[:, :2]
+        ship_radii = np.array([ship.bounding_radius for ship in ships])
+        pending = np.arange(len(radii))
+        for _ in range(max_tries):
+            delta = BroadPhase.wrapped_delta(
+                positions[pending, None, :2], ship_xy[None, :, :], size)
+            distance = np.hypot(delta[..., 0], delta[..., 1])
+            close = (distance < (radii[pending, None] + ship_radii +
+                                 self.clearance)).any(axis=1)
+            pending = pending[close]
+            if not len(pending):
+                return
+            positions[pending, :2] = rng.random((len(pending), 2)) * size
+        raise ValueError("No room for the asteroids clear of the ships")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Memory-mapped recordings of the position and angle of every piece on
+every tick.
+
+A trajectory is a directory with
+    rows.bin       one STATE_DTYPE row per piece and tick, tick by tick,
+    ticks.bin      int64 offset of the first row of every tick, plus the
+                   number of rows at the end,
+    lifetimes.npy  one LIFETIME_DTYPE row per entity,
+    entities.bin   int64 numbers of the rows sorted by entity id and
+                   tick, so the rows of one entity are read without a
+                   scan of its lifetime,
+    meta.json      row and tick counts.
+The binary files grow by doubling while recording and are truncated to
+their used size by close. entities.bin is written by close; trajectories
+of version 1 do not have it.
+"""
+import json
+import os
+
+import numpy as np
+
+from asteroids import Snapshot
+
+
+STATE_DTYPE = np.dtype([
+    ('entity_id', '<i8'),
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('angle', '<f8')])
+
+# death is the first tick the entity is no longer on the board, -1 while
+# it is alive at the end of the recording.
+LIFETIME_DTYPE = np.dtype([
+    ('entity_id', '<i8'),
+    ('kind', '<u1'),
+    ('spawn', '<i8'),
+    ('death', '<i8')])
+
+
+class _GrowableFile(object):
+    """Memory-mapped array in a file that doubles its capacity when
+    full."""
+    def __init__(self, path, dtype, capacity):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self._map(np.memmap(path, dtype=self.dtype, mode='w+',
+                            shape=(capacity,)))
+
+    def _map(self, mapped):
+        self.array = mapped
+        # Slicing a memmap is several times slower than slicing a plain
+        # view of the same memory.
+        self.data = None if mapped is None else mapped.view(np.ndarray)
+
+    def _grow(self, capacity):
+        self.array.flush()
+        self._map(None)
+        with open(self.path, 'r+b') as stream:
+            stream.truncate(capacity * self.dtype.itemsize)
+        self._map(np.memmap(self.path, dtype=self.dtype, mode='r+',
+                            shape=(capacity,)))
+
+    def reserve(self, count):
+        """Returns the next count rows to be filled."""
+        end = self.length + count
+        if end > len(self.data):
+            self._grow(max(end, 2 * len(self.data)))
+        rows = self.data[self.length:end]
+        self.length = end
+        return rows
+
+    def close(self):
+        self.array.flush()
+        self._map(None)
+        with open(self.path, 'r+b') as stream:
+            stream.truncate(self.length * self.dtype.itemsize)
+
+
+class TrajectoryRecorder(object):
+    """Step sink that appends the state of all pieces of a board to a
+    trajectory directory.
+
+    attach records the current state as tick 0 and every following step
+    of the board as the next tick.
+    """
+    def __init__(self, path, capacity=1 << 16):
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.path = path
+        self.ticks = 0
+        self._rows = _GrowableFile(os.path.join(path, 'rows.bin'),
+                                   STATE_DTYPE, capacity)
+        self._offsets = _GrowableFile(os.path.join(path, 'ticks.bin'),
+                                      np.int64, 1024)
+        self._lifetimes = []
+        self._alive = np.zeros(0, dtype=np.int64)
+        self._index = {}
+        self._next_id = 0
+
+    def attach(self, board):
+        board.step_sinks.append(self)
+        self._record(board)
+
+    def detach(self, board):
+        board.step_sinks.remove(self)
+
+    def __call__(self, board):
+        self._record(board)
+
+    def _record(self, board):
+        registry = board.moving_objects
+        pieces = registry.items
+        ids = np.array(registry.ids, dtype=np.int64)
+        self._update_lifetimes(board, ids)
+
+        rows = self._rows.reserve(len(pieces))
+        rows['entity_id'] = ids
+        world = board._world
+        # Analytic boards keep their pieces in two worlds.
+        if world is not None and board._analytic is None:
+            slots = [piece._slot for piece in pieces]
+            rows['x'] = world.position[slots, 0]
+            rows['y'] = world.position[slots, 1]
+            rows['angle'] = world.angle[slots]
+        elif pieces:
+            positions = np.array([piece.position for piece in pieces])
+            rows['x'] = positions[:, 0]
+            rows['y'] = positions[:, 1]
+            rows['angle'] = positions[:, 2]
+        self._offsets.reserve(1)[0] = self._rows.length - len(pieces)
+        self.ticks += 1
+
+    def _update_lifetimes(self, board, ids):
+        tick = self.ticks
+        # Ids are handed out in increasing order, so everything at or
+        # above the last seen next_id has been spawned since.
+        spawned = ids[ids >= self._next_id]
+        if len(self._alive) + len(spawned) != len(ids):
+            dead = self._alive[np.isin(self._alive, ids, invert=True)]
+            for entity_id in dead.tolist():
+                self._lifetimes[self._index.pop(entity_id)][3] = tick
+        for entity_id in spawned.tolist():
+            piece = board.moving_objects.get(entity_id)
+            if piece in board._asteroids:
+                kind = Snapshot.KIND_ASTEROID
+            elif piece in board._projectiles:
+                kind = Snapshot.KIND_PROJECTILE
+            else:
+                kind = Snapshot.KIND_SHIP
+            self._index[entity_id] = len(self._lifetimes)
+            self._lifetimes.append([entity_id, kind, tick, -1])
+        self._alive = ids
+        self._next_id = board.moving_objects.next_id
+
+    def close(self):
+        """Writes the index files and truncates the data files."""
+        if self._rows.array is None:
+            return
+        self._offsets.reserve(1)[0] = self._rows.length
+        rows = self._rows.length
+        # A stable sort keeps the rows of every entity in tick order.
+        np.argsort(self._rows.data['entity_id'][:rows], kind='stable').astype(
+            np.int64).tofile(os.path.join(self.path, 'entities.bin'))
+        self._rows.close()
+        self._offsets.close()
+        lifetimes = np.array([tuple(entry) for entry in self._lifetimes],
+                             dtype=LIFETIME_DTYPE)
+        np.save(os.path.join(self.path, 'lifetimes.npy'), lifetimes)
+        with open(os.path.join(self.path, 'meta.json'), 'w') as stream:
+            json.dump({'version': 2, 'rows': rows, 'ticks': self.ticks},
+                      stream)
+
+
+class Trajectory(object):
+    """Read-only view of a recorded trajectory.
+
+    The rows are memory-mapped; only the parts that are sliced are read
+    from disk.
+    """
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as stream:
+            meta = json.load(stream)
+        self.path = path
+        self.ticks = meta['ticks']
+        if meta['rows']:
+            self.rows = np.memmap(os.path.join(path, 'rows.bin'),
+                                  dtype=STATE_DTYPE, mode='r',
+                                  shape=(meta['rows'],))
+        else:
+            self.rows = np.zeros(0, dtype=STATE_DTYPE)
+        self.offsets = np.memmap(os.path.join(path, 'ticks.bin'),
+                                 dtype=np.int64, mode='r',
+                                 shape=(self.ticks + 1,))
+        self.lifetimes = np.load(os.path.join(path, 'lifetimes.npy'))
+        self._lifetime_index = {
+            entity_id: idx for idx, entity_id in
+            enumerate(self.lifetimes['entity_id'].tolist())}
+        self._entity_rows = None
+        if meta['version'] >= 2:
+            self._entity_rows = np.zeros(0, dtype=np.int64)
+            if meta['rows']:
+                self._entity_rows = np.memmap(
+                    os.path.join(path, 'entities.bin'), dtype=np.int64,
+                    mode='r', shape=(meta['rows'],))
+            # An entity has one row per tick of its lifetime, so its rows
+            # start after those of all entities with smaller ids.
+            lengths = self._ends() - self.lifetimes['spawn']
+            order = np.argsort(self.lifetimes['entity_id'], kind='stable')
+            self._entity_start = np.zeros(len(lengths), dtype=np.int64)
+            self._entity_start[order] = (np.cumsum(lengths[order]) -
+                                         lengths[order])
+
+    def __len__(self):
+        return self.ticks
+
+    def tick(self, tick):
+        """Returns the rows of all pieces on the board at tick."""
+        if not 0 <= tick < self.ticks:
+            raise IndexError("Tick {0:d} is not recorded".format(tick))
+        return self.rows[self.offsets[tick]:self.offsets[tick + 1]]
+
+    def lifetime(self, entity_id):
+        return self.lifetimes[self._lifetime_index[entity_id]]
+
+    def _ends(self):
+        death = self.lifetimes['death']
+        return np.where(death >= 0, death, self.ticks)
+
+    def entity(self, entity_id):
+        """Returns the ticks and rows of one entity over its lifetime."""
+        idx = self._lifetime_index[entity_id]
+        lifetime = self.lifetimes[idx]
+        spawn = int(lifetime['spawn'])
+        end = int(lifetime['death']) if lifetime['death'] >= 0 else self.ticks
+        if self._entity_rows is not None:
+            start = self._entity_start[idx]
+            index = self._entity_rows[start:start + end - spawn]
+            return np.arange(spawn, end), self.rows[np.asarray(index)]
+        # Version 1: scan the rows of all pieces over the lifetime.
+        begin = self.offsets[spawn]
+        rows = self.rows[begin:self.offsets[end]]
+        mask = rows['entity_id'] == entity_id
+        ticks = np.searchsorted(self.offsets[:end + 1],
+                                begin + np.nonzero(mask)[0],
+                                side='right') - 1
+        return ticks, rows[mask]
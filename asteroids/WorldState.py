@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import numpy as np
+
+
+class WorldState(object):
+    """Structure-of-arrays storage for the physics state of many pieces.
+
+    Pieces attached to the world become thin views: their position,
+    velocity, thrust and turn properties read and write the rows of the
+    arrays below, and all attached pieces are integrated by one call to
+    step.
+    """
+    def __init__(self, capacity=64):
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Argument 'capacity' has to be a positive int")
+        self._pieces = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = getattr(self, 'position', None)
+        n = len(self._pieces)
+        arrays = {
+            'position': np.zeros((capacity, 2)),
+            'angle': np.zeros(capacity),
+            'velocity': np.zeros((capacity, 2)),
+            'sin_angle': np.zeros(capacity),
+            'cos_angle': np.ones(capacity),
+            'acceleration': np.zeros(capacity),
+            'angular_velocity': np.zeros(capacity),
+            'thrust': np.zeros(capacity, dtype=np.int8),
+            'turn': np.zeros(capacity, dtype=np.int8)}
+        for name, array in arrays.items():
+            if old is not None:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+        self._capacity = capacity
+
+    def __len__(self):
+        return len(self._pieces)
+
+    def __contains__(self, piece):
+        return piece._world is self
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def pieces(self):
+        return self._pieces
+
+    def attach(self, piece):
+        """Moves the physics state of piece into the world arrays."""
+        if piece._world is not None:
+            raise RuntimeError("Piece is already attached to a world")
+        slot = len(self._pieces)
+        if slot == self._capacity:
+            self._allocate(2 * self._capacity)
+        pos = piece._position
+        self.position[slot] = pos[0], pos[1]
+        self.angle[slot] = pos[2]
+        self.velocity[slot] = piece._velocity
+        self.sin_angle[slot] = piece._sin_angle
+        self.cos_angle[slot] = piece._cos_angle
+        self.acceleration[slot] = piece._acceleration
+        self.angular_velocity[slot] = piece._angular_velocity
+        self.thrust[slot] = piece._thrust
+        self.turn[slot] = piece._turn
+        self._pieces.append(piece)
+        piece._world = self
+        piece._slot = slot
+
+    def attach_many(self, pieces):
+        """Attaches pieces like attach, with one array write per field."""
+        if any(piece._world is not None for piece in pieces):
+            raise RuntimeError("Piece is already attached to a world")
+        start = len(self._pieces)
+        stop = start + len(pieces)
+        capacity = self._capacity
+        while capacity < stop:
+            capacity *= 2
+        if capacity != self._capacity:
+            self._allocate(capacity)
+        if not pieces:
+            return
+        poses = np.array([piece._position for piece in pieces], dtype=float)
+        self.position[start:stop] = poses[:, :2]
+        self.angle[start:stop] = poses[:, 2]
+        self.velocity[start:stop] = [piece._velocity for piece in pieces]
+        self.sin_angle[start:stop] = [piece._sin_angle for piece in pieces]
+        self.cos_angle[start:stop] = [piece._cos_angle for piece in pieces]
+        self.acceleration[start:stop] = [piece._acceleration
+                                         for piece in pieces]
+        self.angular_velocity[start:stop] = [piece._angular_velocity
+                                             for piece in pieces]
+        self.thrust[start:stop] = [piece._thrust for piece in pieces]
+        self.turn[start:stop] = [piece._turn for piece in pieces]
+        self._pieces.extend(pieces)
+        for slot, piece in enumerate(pieces, start):
+            piece._world = self
+            piece._slot = slot
+
+    def detach(self, piece):
+        """Copies the state back into piece and frees its slot.
+
+        The last attached piece is moved into the freed slot so the arrays
+        stay dense.
+        """
+        if piece._world is not self:
+            raise RuntimeError("Piece is not attached to this world")
+        slot = piece._slot
+        piece._position = self.get_position(slot)
+        piece._velocity = self.get_velocity(slot)
+        piece._cos_angle, piece._sin_angle = self.get_heading(slot)
+        piece._thrust = self.get_thrust(slot)
+        piece._turn = self.get_turn(slot)
+        piece._world = None
+        piece._slot = None
+
+        last = len(self._pieces) - 1
+        moved = self._pieces.pop()
+        if slot != last:
+            for name in ('position', 'angle', 'velocity', 'sin_angle',
+                         'cos_angle', 'acceleration', 'angular_velocity',
+                         'thrust', 'turn'):
+                array = getattr(self, name)
+                array[slot] = array[last]
+            self._pieces[slot] = moved
+            moved._slot = slot
+
+    def poses(self, slots):
+        """Returns x, y and angle of the slots as (N, 3)."""
+        return np.column_stack((self.position[slots], self.angle[slots]))
+
+    def velocities(self, slots):
+        return self.velocity[slots]
+
+    def get_position(self, slot):
+        return (float(self.position[slot, 0]), float(self.position[slot, 1]),
+                float(self.angle[slot]))
+
+    def set_position(self, slot, value):
+        self.position[slot] = value[0], value[1]
+        self.angle[slot] = value[2]
+
+    def get_velocity(self, slot):
+        return (float(self.velocity[slot, 0]), float(self.velocity[slot, 1]))
+
+    def set_velocity(self, slot, value):
+        self.velocity[slot] = value[0], value[1]
+
+    def get_heading(self, slot):
+        return float(self.cos_angle[slot]), float(self.sin_angle[slot])
+
+    def get_thrust(self, slot):
+        return int(self.thrust[slot])
+
+    def set_thrust(self, slot, value):
+        self.thrust[slot] = value
+
+    def get_turn(self, slot):
+        return int(self.turn[slot])
+
+    def set_turn(self, slot, value):
+        self.turn[slot] = value
+
+    def step(self, dt, slots=None):
+        """Integrates all attached pieces, or only the given slots.
+
+        Uses the same explicit Euler update as PhysicsEngine.step.
+        """
+        if slots is None:
+            slots = slice(0, len(self._pieces))
+        elif isinstance(slots, int):
+            slots = slice(slots, slots + 1)
+        elif not isinstance(slots, slice):
+            self._step_indexed(dt, np.asarray(slots, dtype=np.intp))
+            return
+        # Slicing returns views, so the masked updates below write straight
+        # into the world arrays.
+        angle = self.angle[slots]
+        turn = self.turn[slots]
+        turning = turn != 0
+        if turning.any():
+            new_angle = (angle[turning] + turn[turning] *
+                         self.angular_velocity[slots][turning] * dt)
+            new_angle %= 2. * np.pi
+            angle[turning] = new_angle
+            self.sin_angle[slots][turning] = np.sin(new_angle)
+            self.cos_angle[slots][turning] = np.cos(new_angle)
+
+        thrust = self.thrust[slots]
+        thrusting = thrust != 0
+        if thrusting.any():
+            factor = thrust[thrusting] * self.acceleration[slots][thrusting]
+            velocity = self.velocity[slots]
+            velocity[thrusting, 0] += (
+                factor * self.cos_angle[slots][thrusting] * dt)
+            velocity[thrusting, 1] += (
+                factor * self.sin_angle[slots][thrusting] * dt)
+
+        self.position[slots] += self.velocity[slots] * dt
+
+    def _step_indexed(self, dt, idx):
+        # Same update as step for an array of slots. Fancy indexing returns
+        # copies, so every result is written back by index.
+        turning = idx[self.turn[idx] != 0]
+        if len(turning):
+            new_angle = (self.angle[turning] + self.turn[turning] *
+                         self.angular_velocity[turning] * dt)
+            new_angle %= 2. * np.pi
+            self.angle[turning] = new_angle
+            self.sin_angle[turning] = np.sin(new_angle)
+            self.cos_angle[turning] = np.cos(new_angle)
+
+        thrusting = idx[self.thrust[idx] != 0]
+        if len(thrusting):
+            factor = self.thrust[thrusting] * self.acceleration[thrusting]
+            self.velocity[thrusting, 0] += (
+                factor * self.cos_angle[thrusting] * dt)
+            self.velocity[thrusting, 1] += (
+                factor * self.sin_angle[thrusting] * dt)
+
+        self.position[idx] += self.velocity[idx] * dt
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares the cost of moving pieces with per-step integration and in
+closed form.
+
+Run from the repository root:
+    python -m benchmarks.bench_analytic
+"""
+import argparse
+import time
+
+from asteroids import Runner
+
+
+MODES = (("scalar", {}), ("vectorized", {'vectorized': True}),
+         ("analytic", {'analytic': True}))
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def move(board, dt):
+    """The integration part of GameBoard.step."""
+    board._calculate_new_position(dt)
+    board._asteroids_out_of_bounds()
+    board._ship_out_of_bounds()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--asteroids', type=int, nargs='+',
+                        default=[100, 1000, 10000])
+    parser.add_argument('--ticks', type=int, default=100)
+    parser.add_argument('--dt', type=float, default=1. / 60.)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print("{0:>8s}{1:>12s}{2:>14s}{3:>14s}{4:>16s}".format(
+        "pieces", "mode", "move us", "step us", "jump 1h us"))
+    for count in args.asteroids:
+        for name, kwargs in MODES:
+            board = Runner.make_board(size=(8000., 8000.), no_asteroids=count,
+                                      seed=0, **kwargs)
+            moving = best_of(args.repeat, lambda: [
+                move(board, args.dt) for _ in range(args.ticks)])
+            stepping = best_of(args.repeat, lambda: [
+                board.step(args.dt) for _ in range(args.ticks)])
+            # Moves every piece by one hour of simulated time.
+            jump = best_of(args.repeat, lambda: move(board, 3600.))
+            print("{0:>8d}{1:>12s}{2:>14.1f}{3:>14.1f}{4:>16.1f}".format(
+                len(board.moving_objects), name,
+                moving / args.ticks * 1e6, stepping / args.ticks * 1e6,
+                jump * 1e6))
+
+
+if __name__ == "__main__":
+    main()
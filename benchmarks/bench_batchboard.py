@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares stepping K boards one by one with stepping them as a BatchBoard,
+with and without projectiles in flight. The brute column steps the batch
+with the BruteForce broad phase.
+
+Run from the repository root:
+    python -m benchmarks.bench_batchboard
+"""
+import argparse
+import time
+
+import numpy as np
+
+from asteroids import BatchBoard
+from asteroids import BroadPhase
+from asteroids import Runner
+
+
+def actions_at(tick, turn_thrust, fire_every):
+    """Actions of tick; with fire_every the boards take turns firing, so
+    every board fires once per fire_every ticks."""
+    count = len(turn_thrust)
+    fire = np.zeros(count, dtype=int)
+    if fire_every:
+        fire[np.arange(count) % fire_every == tick % fire_every] = 1
+    return np.column_stack((turn_thrust, fire))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--boards', type=int, nargs='+',
+                        default=[1, 16, 256, 1024])
+    parser.add_argument('--ticks', type=int, default=50)
+    parser.add_argument('--asteroids', type=int, default=12)
+    parser.add_argument('--fire-every', type=int, nargs='+', default=[0, 4],
+                        help="ticks between the shots of a board, 0 for "
+                        "none")
+    args = parser.parse_args(argv)
+
+    print("{0:>8s}{1:>6s}{2:>16s}{3:>16s}{4:>16s}{5:>10s}{6:>8s}".format(
+        "boards", "fire", "loop ticks/s", "batch ticks/s", "brute ticks/s",
+        "speedup", "shots"))
+    for count in args.boards:
+        for fire_every in args.fire_every:
+            boards = [Runner.make_board(no_asteroids=args.asteroids,
+                                        seed=seed) for seed in range(count)]
+            batch = BatchBoard.BatchBoard.from_boards(boards)
+            brute = BatchBoard.BatchBoard.from_boards(
+                boards, broad_phase=BroadPhase.BruteForce())
+            rng = np.random.RandomState(0)
+            turn_thrust = np.column_stack((rng.randint(-1, 2, count),
+                                           rng.randint(0, 2, count)))
+            actions = [actions_at(tick, turn_thrust, fire_every)
+                       for tick in range(args.ticks)]
+
+            start = time.perf_counter()
+            for tick in range(args.ticks):
+                for board, action in zip(boards, actions[tick]):
+                    board.ship_turn(int(action[0]))
+                    board.ship_accelerate(bool(action[1]))
+                    if action[2]:
+                        board.ship_fire()
+                    board.step(1. / 60.)
+            loop = count * args.ticks / (time.perf_counter() - start)
+
+            rates = []
+            for stepped in (batch, brute):
+                start = time.perf_counter()
+                for tick in range(args.ticks):
+                    stepped.step(1. / 60., actions[tick])
+                rates.append(count * args.ticks /
+                             (time.perf_counter() - start))
+            print("{0:>8d}{1:>6d}{2:>16.0f}{3:>16.0f}{4:>16.0f}{5:>10.1f}"
+                  "{6:>8.1f}".format(
+                      count, fire_every, loop, rates[0], rates[1],
+                      rates[0] / loop,
+                      batch.projectile_alive.sum() / count))
+
+
+if __name__ == "__main__":
+    main()
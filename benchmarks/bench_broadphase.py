@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares the collision broad phases against the brute-force path.
+
+Run from the repository root:
+    python -m benchmarks.bench_broadphase
+"""
+import argparse
+import time
+
+import numpy as np
+
+from asteroids import BroadPhase
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+BOARD_SIZE = (1000., 1000.)
+BROAD_PHASES = (
+    ('brute', BroadPhase.BruteForce),
+    ('grid', BroadPhase.UniformGrid),
+    ('sap', BroadPhase.SweepAndPrune))
+
+
+def make_board(count, broad_phase, seed=0):
+    rng = np.random.RandomState(seed)
+    gameboard = GameBoard.GameBoard(size=BOARD_SIZE, no_asteroids=count,
+                                    broad_phase=broad_phase)
+    for x, y in rng.uniform(0., BOARD_SIZE[0], (count, 2)):
+        gameboard._add_asteroid(GamePiece.Asteroid1(
+            10., (float(x), float(y), 0.), (0., 0.), 0.))
+    for x, y in rng.uniform(0., BOARD_SIZE[0], (count, 2)):
+        gameboard._add_projectile(GamePiece.Projectile(
+            1., (float(x), float(y), 0.), (0., 0.)))
+    return gameboard
+
+
+def time_resolve(count, broad_phase, repeat):
+    best = np.inf
+    for seed in range(repeat):
+        gameboard = make_board(count, broad_phase, seed)
+        start = time.perf_counter()
+        gameboard._resolve_collision()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_pairs(count, broad_phase, repeat):
+    rng = np.random.RandomState(0)
+    pos_a = rng.uniform(0., BOARD_SIZE[0], (count, 2))
+    pos_b = rng.uniform(0., BOARD_SIZE[0], (count, 2))
+    radius_a = np.full(count, 5.)
+    radius_b = np.zeros(count)
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        broad_phase.candidate_pairs(pos_a, radius_a, pos_b, radius_b,
+                                    BOARD_SIZE)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-brute', type=int, default=200,
+                        help="largest count run through the brute force")
+    args = parser.parse_args(argv)
+
+    print("_resolve_collision, N asteroids x N projectiles [ms]")
+    print("{0:>8s}".format("N") + "".join(
+        "{0:>10s}".format(name) for name, _ in BROAD_PHASES))
+    for count in (25, 50, 100, 200, 400, 800):
+        row = "{0:>8d}".format(count)
+        for name, cls in BROAD_PHASES:
+            if name == 'brute' and count > args.max_brute:
+                row += "{0:>10s}".format("-")
+                continue
+            seconds = time_resolve(count, cls(), args.repeat)
+            row += "{0:>10.2f}".format(seconds * 1e3)
+        print(row)
+
+    print("\ncandidate_pairs only, N x N [ms]")
+    print("{0:>8s}".format("N") + "".join(
+        "{0:>10s}".format(name) for name, _ in BROAD_PHASES))
+    for count in (100, 1000, 10000, 100000):
+        row = "{0:>8d}".format(count)
+        for name, cls in BROAD_PHASES:
+            if name == 'brute' and count > 3000:
+                row += "{0:>10s}".format("-")
+                continue
+            seconds = time_pairs(count, cls(), args.repeat)
+            row += "{0:>10.2f}".format(seconds * 1e3)
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
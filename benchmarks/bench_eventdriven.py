@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares fixed-step stepping of an analytic board with event-driven
+stepping on sparse boards.
+
+Run from the repository root:
+    python -m benchmarks.bench_eventdriven
+"""
+import argparse
+import time
+
+from asteroids import EventDriven
+from asteroids import Runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--asteroids', type=int, nargs='+',
+                        default=[5, 20, 100])
+    parser.add_argument('--size', type=float, default=8000.)
+    parser.add_argument('--ticks', type=int, default=6000)
+    parser.add_argument('--dt', type=float, default=1. / 60.)
+    parser.add_argument('--fire-every', type=int, default=120)
+    args = parser.parse_args(argv)
+
+    print("{0:>10s}{1:>14s}{2:>14s}{3:>10s}{4:>10s}{5:>8s}".format(
+        "asteroids", "fixed ms", "event ms", "speedup", "visited", "score"))
+    for count in args.asteroids:
+        size = (args.size, args.size)
+        board = Runner.make_board(size=size, no_asteroids=count, seed=0,
+                                  analytic=True)
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            if tick % args.fire_every == 0:
+                board.ship_turn(1)
+                board.ship_fire()
+            board.step(args.dt)
+        fixed = time.perf_counter() - start
+        score = board.score
+
+        board = Runner.make_board(size=size, no_asteroids=count, seed=0,
+                                  analytic=True)
+        simulator = EventDriven.EventSimulator(board, args.dt)
+        start = time.perf_counter()
+        for tick in range(0, args.ticks, args.fire_every):
+            simulator.ship_turn(1)
+            simulator.ship_fire()
+            simulator.advance(min(args.fire_every, args.ticks - tick))
+        event = time.perf_counter() - start
+        if board.score != score:
+            print("score differs: {0:d} != {1:d}".format(board.score, score))
+        print("{0:>10d}{1:>14.1f}{2:>14.1f}{3:>10.1f}{4:>10d}{5:>8d}".format(
+            count, fixed * 1e3, event * 1e3, fixed / event,
+            simulator.visited, board.score))
+
+
+if __name__ == "__main__":
+    main()
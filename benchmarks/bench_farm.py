@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Measures how the board farm scales with the number of worker processes.
+
+Run from the repository root:
+    python -m benchmarks.bench_farm
+"""
+import argparse
+import os
+
+from asteroids import Farm
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--boards', type=int, default=256)
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--asteroids', type=int, default=12)
+    parser.add_argument('--workers', type=int, nargs='+', default=None)
+    parser.add_argument('--root-seed', type=int, default=None,
+                        help="seed the boards with children of this seed")
+    args = parser.parse_args(argv)
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers
+    if workers is None:
+        workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    print("{0:>8s}{1:>14s}{2:>10s}{3:>12s}".format(
+        "workers", "ticks/s", "speedup", "efficiency"))
+    base = None
+    for count in workers:
+        result = Farm.run_farm(range(args.boards), args.ticks, 1. / 60.,
+                               no_asteroids=args.asteroids, workers=count,
+                               stop_on_gameover=False,
+                               root_seed=args.root_seed)
+        if base is None:
+            base = result.ticks_per_second
+        print("{0:>8d}{1:>14.0f}{2:>10.2f}{3:>12.2f}".format(
+            count, result.ticks_per_second,
+            result.ticks_per_second / base, result.efficiency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Reports the memory held per live game piece.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory
+"""
+import argparse
+import gc
+import tracemalloc
+
+from asteroids import GamePiece
+
+
+FACTORIES = (
+    ('Projectile', lambda i: GamePiece.Projectile(
+        1., (float(i), 2., 0.), (1., 0.))),
+    ('Asteroid1', lambda i: GamePiece.Asteroid1(
+        3., (float(i), 2., 0.), (1., 0.), 0.5)),
+    ('Ship', lambda i: GamePiece.Ship(2., (float(i), 2., 0.))))
+
+
+def bytes_per_object(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    pieces = [factory(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    # The list holding the pieces is not part of their footprint.
+    used -= pieces.__sizeof__()
+    del pieces
+    return used / float(count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--counts', type=int, nargs='+',
+                        default=[10000, 100000, 1000000])
+    args = parser.parse_args(argv)
+
+    print("bytes per live object")
+    print("{0:>12s}".format("N") + "".join(
+        "{0:>12s}".format(name) for name, _ in FACTORIES))
+    for count in args.counts:
+        row = "{0:>12d}".format(count)
+        for _, factory in FACTORIES:
+            row += "{0:>12.1f}".format(bytes_per_object(factory, count))
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
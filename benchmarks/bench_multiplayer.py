@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Times one tick of a multiplayer board, with batched inputs for all ships,
+against the number of ships.
+
+The ships are spread over a board of constant density, so with a linear
+broad phase the time per ship should stay about the same. Ships fire a
+few times per second and are not replaced when they are destroyed.
+
+Run from the repository root:
+    python -m benchmarks.bench_multiplayer
+"""
+import argparse
+import time
+
+import numpy as np
+
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+ASTEROID_TYPES = (GamePiece.Asteroid1, GamePiece.Asteroid2,
+                  GamePiece.Asteroid3)
+
+
+def make_board(ships, asteroids, vectorized, seed=0):
+    side = 120. * np.sqrt(ships)
+    rng = np.random.RandomState(seed)
+    board = GameBoard.GameBoard(size=(side, side), no_asteroids=asteroids,
+                                vectorized=vectorized, max_ships=ships)
+    for _ in range(asteroids):
+        cls = ASTEROID_TYPES[rng.randint(len(ASTEROID_TYPES))]
+        board._add_asteroid(cls(
+            size=float(rng.uniform(5., 15.)),
+            position=(float(rng.uniform(0., side)),
+                      float(rng.uniform(0., side)), 0.),
+            start_velocity=tuple(rng.uniform(-20., 20., 2).tolist()),
+            angular_velocity=float(rng.uniform(-1., 1.))))
+    # A grid of ships, far enough apart not to collide at the start.
+    columns = int(np.ceil(np.sqrt(ships)))
+    step = side / columns
+    for idx in range(ships):
+        board._add_ship(GamePiece.Ship(10., (
+            (idx % columns + 0.5) * step, (idx // columns + 0.5) * step,
+            float(rng.uniform(0., 2. * np.pi)))))
+    return board
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--ships', type=int, nargs='+',
+                        default=[2, 16, 128, 1024])
+    parser.add_argument('--asteroids-per-ship', type=int, default=2)
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--dt', type=float, default=1. / 60.)
+    parser.add_argument('--vectorized', action='store_true')
+    args = parser.parse_args(argv)
+
+    print("{0:>8s}{1:>14s}{2:>16s}{3:>8s}{4:>10s}".format(
+        "ships", "us per tick", "us per ship", "alive", "fired"))
+    for count in args.ships:
+        board = make_board(count, count * args.asteroids_per_ship,
+                           args.vectorized)
+        rng = np.random.RandomState(1)
+        fired = 0
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            alive = len(board._ships)
+            if not alive:
+                break
+            fired += len(board.ships_input(
+                turn=rng.randint(-1, 2, alive),
+                thrust=rng.rand(alive) < 0.3,
+                fire=rng.rand(alive) < 0.05))
+            board.step(args.dt)
+        seconds = (time.perf_counter() - start) / args.ticks
+        print("{0:>8d}{1:>14.1f}{2:>16.2f}{3:>8d}{4:>10d}".format(
+            count, seconds * 1e6, seconds * 1e6 / count, len(board._ships),
+            fired))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares the cost of stepping a scalar board in the rotation modes.
+
+Run from the repository root:
+    python -m benchmarks.bench_rotation
+"""
+import argparse
+import time
+
+from asteroids import Rotation
+from asteroids import Runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--asteroids', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--dt', type=float, default=1. / 60.)
+    args = parser.parse_args(argv)
+
+    mode = Rotation.shared.mode
+    print("{0:>12s}{1:>14s}".format("mode", "step us"))
+    try:
+        for name in Rotation.MODES:
+            Rotation.configure(name)
+            board = Runner.make_board(size=(8000., 8000.),
+                                      no_asteroids=args.asteroids, seed=0)
+            for asteroid in board._asteroids:
+                asteroid.turn = 1
+            start = time.perf_counter()
+            for _ in range(args.ticks):
+                board.step(args.dt)
+            seconds = time.perf_counter() - start
+            print("{0:>12s}{1:>14.1f}".format(
+                name, seconds / args.ticks * 1e6))
+    finally:
+        Rotation.configure(mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares binary board snapshots with pickling the board object graph.
+
+Run from the repository root:
+    python -m benchmarks.bench_snapshot
+"""
+import argparse
+import pickle
+import time
+
+from asteroids import GameBoard
+from asteroids import Runner
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--asteroids', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print("{0:>8s}{1:>12s}{2:>12s}{3:>12s}{4:>12s}{5:>12s}{6:>12s}".format(
+        "pieces", "pickle B", "snap B", "pickle ms", "snap ms",
+        "unpickle ms", "restore ms"))
+    for count in args.asteroids:
+        board = Runner.make_board(size=(4000., 4000.), no_asteroids=count,
+                                  seed=0)
+        dump_pickle, pickled = best_of(
+            args.repeat, lambda: pickle.dumps(board, protocol=-1))
+        dump_snap, snap = best_of(args.repeat, board.snapshot)
+        load_pickle, _ = best_of(args.repeat, lambda: pickle.loads(pickled))
+        load_snap, _ = best_of(args.repeat,
+                               lambda: GameBoard.GameBoard.restore(snap))
+        print("{0:>8d}{1:>12d}{2:>12d}{3:>12.2f}{4:>12.2f}{5:>12.2f}"
+              "{6:>12.2f}".format(
+                  len(board.moving_objects), len(pickled), len(snap),
+                  dump_pickle * 1e3, dump_snap * 1e3, load_pickle * 1e3,
+                  load_snap * 1e3))
+
+
+if __name__ == "__main__":
+    main()
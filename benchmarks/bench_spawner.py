@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Times spawning a wave of asteroids in one batch against creating and
+adding them one at a time, drawing the parameters of a wave, and a
+cascade of splits.
+
+The one-at-a-time variant calls the asteroid constructors and
+GameBoard._add_asteroid with the same values the WaveSpawner drew.
+
+Run from the repository root:
+    python -m benchmarks.bench_spawner
+"""
+import argparse
+import time
+
+import numpy as np
+
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Spawner
+
+
+def make_board(count, vectorized, spawner=None, splitter=None):
+    side = 40. * np.sqrt(count)
+    board = GameBoard.GameBoard(size=(side, side), no_asteroids=count,
+                                vectorized=vectorized, spawner=spawner,
+                                splitter=splitter)
+    board._add_ship(GamePiece.Ship(10., (side / 2., side / 2., 0.)))
+    return board
+
+
+def time_wave(count, vectorized, repeat):
+    bulk = []
+    single = []
+    for seed in range(repeat):
+        spawner = Spawner.WaveSpawner(seed=seed)
+        board = make_board(count, vectorized, spawner)
+        start = time.perf_counter()
+        asteroids = spawner.spawn(board)
+        bulk.append(time.perf_counter() - start)
+
+        values = [(asteroid.shape_id, asteroid.size, asteroid.position,
+                   asteroid.velocity, asteroid.turn * asteroid._angular_velocity)
+                  for asteroid in asteroids]
+        board = make_board(count, vectorized)
+        start = time.perf_counter()
+        for shape_id, size, position, velocity, angular_velocity in values:
+            board._add_asteroid(GamePiece.asteroid_class(shape_id)(
+                size, position, velocity, angular_velocity))
+        single.append(time.perf_counter() - start)
+    return min(bulk), min(single)
+
+
+def time_sample(count, repeat):
+    spawner = Spawner.WaveSpawner()
+    rng = np.random.default_rng(0)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        spawner.sample(rng, count, (1000., 1000.))
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def time_cascade(count, vectorized):
+    """Splits count asteroids of size 80 with one projectile each, until
+    the pieces are too small."""
+    board = make_board(count, vectorized,
+                       spawner=Spawner.WaveSpawner(min_size=80.,
+                                                   max_size=80., seed=0),
+                       splitter=Spawner.Splitter(min_size=10.))
+    board.spawner.spawn(board)
+    board.spawner = None
+    seconds = 0.
+    rounds = 0
+    while len(board._asteroids):
+        for asteroid in list(board._asteroids):
+            board._add_projectile(GamePiece.Projectile(
+                1., asteroid.position, (0., 0.)))
+        start = time.perf_counter()
+        board._resolve_collision()
+        seconds += time.perf_counter() - start
+        rounds += 1
+    return seconds, rounds, board.score
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--counts', type=int, nargs='+',
+                        default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--vectorized', action='store_true')
+    args = parser.parse_args(argv)
+
+    print("{0:>8s}{1:>12s}{2:>12s}{3:>10s}{4:>12s}{5:>14s}{6:>10s}".format(
+        "count", "wave ms", "single ms", "speedup", "sample ms",
+        "cascade ms", "destroyed"))
+    for count in args.counts:
+        bulk, single = time_wave(count, args.vectorized, args.repeat)
+        sample = time_sample(count, args.repeat)
+        cascade, _, destroyed = time_cascade(count, args.vectorized)
+        print("{0:>8d}{1:>12.1f}{2:>12.1f}{3:>10.1f}{4:>12.2f}{5:>14.1f}"
+              "{6:>10d}".format(count, bulk * 1e3, single * 1e3,
+                                single / bulk, sample * 1e3, cascade * 1e3,
+                                destroyed))
+
+
+if __name__ == "__main__":
+    main()
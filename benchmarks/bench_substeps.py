@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares adaptive substepping with uniform fine and coarse timesteps on a
+board of slow asteroids and fast projectiles.
+
+Run from the repository root:
+    python -m benchmarks.bench_substeps
+"""
+import argparse
+import time
+
+import numpy as np
+
+from asteroids import GamePiece
+from asteroids import Runner
+from asteroids import Scheduler
+
+
+def make_board(args, scheduler=None):
+    board = Runner.make_board(size=(2000., 2000.), no_asteroids=args.asteroids,
+                              seed=args.seed, vectorized=args.vectorized)
+    board.scheduler = scheduler
+    rng = np.random.RandomState(args.seed)
+    for _ in range(args.projectiles):
+        angle = rng.uniform(0., 2. * np.pi)
+        board._add_projectile(GamePiece.Projectile(
+            1., (float(rng.uniform(0., 2000.)),
+                 float(rng.uniform(0., 2000.)), 0.),
+            (args.speed * np.cos(angle), args.speed * np.sin(angle))))
+    board._ship.thrust = 1
+    return board
+
+
+def simulate(board, dt, seconds):
+    ticks = int(round(seconds / dt))
+    start = time.perf_counter()
+    for _ in range(ticks):
+        board.step(dt)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--asteroids', type=int, default=300)
+    parser.add_argument('--projectiles', type=int, default=300)
+    parser.add_argument('--speed', type=float, default=300.)
+    parser.add_argument('--seconds', type=float, default=2.)
+    parser.add_argument('--dt', type=float, default=1. / 15.)
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    parser.add_argument('--vectorized', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    scheduler = Scheduler.SubstepScheduler(tolerance=args.tolerance)
+    substeps = scheduler.substeps(make_board(args), args.dt)
+    fine = args.dt / max(substeps.values())
+    runs = [("uniform fine", make_board(args), fine),
+            ("uniform coarse", make_board(args), args.dt),
+            ("adaptive", make_board(args, scheduler), args.dt)]
+    print("substeps per step: {0}".format(substeps))
+    print("{0:>16s}{1:>10s}{2:>8s}{3:>14s}{4:>16s}".format(
+        "mode", "dt", "hits", "ship error", "s per sim s"))
+    reference = None
+    for name, board, dt in runs:
+        seconds = simulate(board, dt, args.seconds)
+        ship = np.array(board._ship.position[:2])
+        if reference is None:
+            reference = ship
+        print("{0:>16s}{1:>10.4f}{2:>8d}{3:>14.2e}{4:>16.3f}".format(
+            name, dt, board.score, np.hypot(*(ship - reference)),
+            seconds / args.seconds))
+
+
+if __name__ == "__main__":
+    main()
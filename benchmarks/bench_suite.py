@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Times the hot paths of the engine at a range of entity counts and checks
+the results against a stored baseline.
+
+Every case is run at every count up to its limit. The results are
+written as JSON with --save; with --baseline they are compared against an
+earlier result file, and the script exits with status 1 if any case got
+slower than the baseline by more than the threshold. Baselines are only
+meaningful on the machine they were recorded on.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_suite --save benchmarks/baseline.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+VERSION = 1
+COUNTS = (10, 100, 1000, 10000, 100000)
+# Scalar cases loop over all pieces in Python, so each sample takes at
+# least this long before it is repeated.
+MIN_SAMPLE = 0.005
+ASTEROID_TYPES = (GamePiece.Asteroid1, GamePiece.Asteroid2,
+                  GamePiece.Asteroid3)
+
+
+def board_size(count):
+    # Same density of pieces at every count.
+    side = 40. * np.sqrt(max(count, 10))
+    return (side, side)
+
+
+def make_asteroids(count, size, rng):
+    asteroids = []
+    for _ in range(count):
+        cls = ASTEROID_TYPES[rng.randint(len(ASTEROID_TYPES))]
+        asteroids.append(cls(
+            size=float(rng.uniform(5., 15.)),
+            position=(float(rng.uniform(0., size[0])),
+                      float(rng.uniform(0., size[1])),
+                      float(rng.uniform(0., 2. * np.pi))),
+            start_velocity=tuple(rng.uniform(-20., 20., 2).tolist()),
+            angular_velocity=float(rng.uniform(-1., 1.))))
+    return asteroids
+
+
+def make_board(count, vectorized=False, seed=0):
+    """Board with count asteroids, count // 10 projectiles and a ship.
+
+    Projectiles that hit an asteroid right away are removed, so the
+    collision cases do the same work on every call."""
+    rng = np.random.RandomState(seed)
+    size = board_size(count)
+    board = GameBoard.GameBoard(size=size, no_asteroids=count,
+                                vectorized=vectorized)
+    board._add_ship(GamePiece.Ship(10., (size[0] / 2., size[1] / 2., 0.)))
+    for asteroid in make_asteroids(count, size, rng):
+        board._add_asteroid(asteroid)
+    for _ in range(count // 10):
+        angle = float(rng.uniform(0., 2. * np.pi))
+        board._add_projectile(GamePiece.Projectile(
+            1., (float(rng.uniform(0., size[0])),
+                 float(rng.uniform(0., size[1])), 0.),
+            (10. * np.cos(angle), 10. * np.sin(angle))))
+    board._resolve_collision()
+    return board
+
+
+def case_physics_step(count):
+    pieces = make_asteroids(count, board_size(count),
+                            np.random.RandomState(0))
+    for piece in pieces:
+        piece.turn = 1
+
+    def run():
+        for piece in pieces:
+            piece.step(1e-3)
+    return run
+
+
+def polygons(count, rng):
+    size = board_size(count)
+    return [asteroid.world_repr()
+            for asteroid in make_asteroids(count, size, rng)]
+
+
+def case_polygon_collides(count):
+    # Pairs of overlapping polygons, so the separating axis test has to
+    # try every axis.
+    rng = np.random.RandomState(0)
+    first = polygons(count, rng)
+    second = [polygon.transformed(0.3, (2., 1.)) for polygon in first]
+    for polygon in first + second:
+        polygon.intervals()
+
+    def run():
+        for a, b in zip(first, second):
+            a.collides(b)
+    return run
+
+
+def case_point_inside(count):
+    rng = np.random.RandomState(0)
+    shapes = polygons(count, rng)
+    points = [(polygon.xy[0][0] * 0.5 + polygon.xy[1][0] * 0.5,
+               polygon.xy[0][1] * 0.5 + polygon.xy[1][1] * 0.5)
+              for polygon in shapes]
+    for polygon in shapes:
+        polygon.intervals()
+
+    def run():
+        for polygon, point in zip(shapes, points):
+            polygon.point_inside(point)
+    return run
+
+
+def case_resolve_collision(count):
+    board = make_board(count)
+    return board._resolve_collision
+
+
+def case_wrap_bounds(count):
+    board = make_board(count)
+    return board._apply_bounds
+
+
+def board_step(vectorized):
+    def case(count):
+        board = make_board(count, vectorized=vectorized)
+
+        def run():
+            board.step(1e-3)
+        return run
+    return case
+
+
+# name, setup(count) returning the function to time, largest count
+CASES = (
+    ('physics_step', case_physics_step, 100000),
+    ('polygon_collides', case_polygon_collides, 100000),
+    ('point_inside', case_point_inside, 100000),
+    ('resolve_collision', case_resolve_collision, 100000),
+    ('wrap_bounds', case_wrap_bounds, 100000),
+    ('board_step', board_step(False), 100000),
+    ('board_step_vectorized', board_step(True), 100000))
+
+
+def measure(run, repeat, max_seconds):
+    """Returns the best and median seconds per call of run."""
+    run()
+    start = time.perf_counter()
+    run()
+    once = time.perf_counter() - start
+    number = max(1, int(MIN_SAMPLE / max(once, 1e-9)))
+    samples = []
+    budget = time.perf_counter() + max_seconds
+    while len(samples) < repeat and (not samples or
+                                     time.perf_counter() < budget):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        samples.append((time.perf_counter() - start) / number)
+    return min(samples), float(np.median(samples)), number * len(samples)
+
+
+def run_case(name, count, repeat=5, max_seconds=2.):
+    setup = {case[0]: case[1] for case in CASES}[name]
+    best, median, calls = measure(setup(count), repeat, max_seconds)
+    return {'case': name, 'count': count, 'best': best, 'median': median,
+            'calls': calls}
+
+
+def run_suite(names=None, counts=COUNTS, repeat=5, max_seconds=2.,
+              out=None):
+    """Runs the cases and returns the results as a dict."""
+    results = {}
+    for name, _, limit in CASES:
+        if names and name not in names:
+            continue
+        for count in counts:
+            if count > limit:
+                continue
+            entry = run_case(name, count, repeat, max_seconds)
+            results['{0:s}/{1:d}'.format(name, count)] = entry
+            if out is not None:
+                out.write("{0:>24s}{1:>9d}{2:>14.1f}{3:>14.1f}\n".format(
+                    name, count, entry['best'] * 1e6,
+                    entry['median'] * 1e6))
+                out.flush()
+    return {'version': VERSION,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'results': results}
+
+
+def compare(results, baseline, threshold=0.25):
+    """Returns (key, baseline seconds, seconds, ratio) for every case
+    that is slower than in baseline by more than threshold.
+
+    Best times are compared, as they are the least affected by other
+    load on the machine. Cases missing from either side are skipped."""
+    regressions = []
+    old = baseline['results']
+    for key, entry in sorted(results['results'].items()):
+        if key not in old:
+            continue
+        ratio = entry['best'] / old[key]['best']
+        if ratio > 1. + threshold:
+            regressions.append((key, old[key]['best'], entry['best'],
+                                ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--cases', nargs='+',
+                        choices=[case[0] for case in CASES])
+    parser.add_argument('--counts', type=int, nargs='+', default=COUNTS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=2.,
+                        help="time budget of the samples of one case")
+    parser.add_argument('--save', help="write the results to this file")
+    parser.add_argument('--baseline', help="compare with this result file")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed relative slowdown")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="times to measure a slow case again")
+    args = parser.parse_args(argv)
+
+    sys.stdout.write("{0:>24s}{1:>9s}{2:>14s}{3:>14s}\n".format(
+        "case", "count", "best us", "median us"))
+    results = run_suite(args.cases, args.counts, args.repeat,
+                        args.max_seconds, out=sys.stdout)
+    if args.save:
+        with open(args.save, 'w') as stream:
+            json.dump(results, stream, indent=2, sort_keys=True)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as stream:
+        baseline = json.load(stream)
+    regressions = compare(results, baseline, args.threshold)
+    for _ in range(args.retries):
+        if not regressions:
+            break
+        # Measure the slow cases again, to tell regressions from load
+        # on the machine.
+        for key, _, _, _ in regressions:
+            entry = results['results'][key]
+            again = run_case(entry['case'], entry['count'], args.repeat,
+                             args.max_seconds)
+            if again['best'] < entry['best']:
+                results['results'][key] = again
+        regressions = compare(results, baseline, args.threshold)
+    for key, old, new, ratio in regressions:
+        print("REGRESSION {0:s}: {1:.1f} us -> {2:.1f} us ({3:.2f}x)".format(
+            key, old * 1e6, new * 1e6, ratio))
+    if regressions:
+        return 1
+    print("no regressions above {0:.0%}".format(args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Compares discrete and swept projectile collisions at coarse timesteps
+against discrete collisions at a fine timestep.
+
+Run from the repository root:
+    python -m benchmarks.bench_swept
+"""
+import argparse
+import time
+
+import numpy as np
+
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+def make_board(seed, asteroids, projectiles, speed, swept):
+    rng = np.random.RandomState(seed)
+    size = (1000., 1000.)
+    board = GameBoard.GameBoard(size=size, no_asteroids=asteroids,
+                                swept=swept)
+    for _ in range(asteroids):
+        board._add_asteroid(GamePiece.Asteroid1(
+            float(rng.uniform(2., 5.)),
+            (float(rng.uniform(0., size[0])), float(rng.uniform(0., size[1])),
+             float(rng.uniform(0., 2. * np.pi))),
+            tuple(rng.uniform(-10., 10., 2)), float(rng.uniform(-1., 1.))))
+    for _ in range(projectiles):
+        angle = rng.uniform(0., 2. * np.pi)
+        board._add_projectile(GamePiece.Projectile(
+            1., (float(rng.uniform(0., size[0])),
+                 float(rng.uniform(0., size[1])), 0.),
+            (speed * np.cos(angle), speed * np.sin(angle))))
+    return board
+
+
+def simulate(args, dt, swept):
+    board = make_board(args.seed, args.asteroids, args.projectiles,
+                       args.speed, swept)
+    ticks = int(round(args.seconds / dt))
+    start = time.perf_counter()
+    for _ in range(ticks):
+        board.step(dt)
+    return board.score, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--asteroids', type=int, default=400)
+    parser.add_argument('--projectiles', type=int, default=400)
+    parser.add_argument('--speed', type=float, default=400.)
+    parser.add_argument('--seconds', type=float, default=2.)
+    parser.add_argument('--fine-dt', type=float, default=1. / 480.)
+    parser.add_argument('--dt', type=float, nargs='+',
+                        default=[1. / 60., 1. / 30., 1. / 15.])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    reference, seconds = simulate(args, args.fine_dt, swept=False)
+    print("reference: discrete dt={0:.4f}: {1:d} hits in {2:.2f} s".format(
+        args.fine_dt, reference, seconds))
+    print("{0:>8s}{1:>10s}{2:>12s}{3:>12s}{4:>12s}".format(
+        "dt", "mode", "hits", "error %", "seconds"))
+    for dt in args.dt:
+        for swept in (False, True):
+            hits, seconds = simulate(args, dt, swept)
+            print("{0:>8.4f}{1:>10s}{2:>12d}{3:>12.1f}{4:>12.3f}".format(
+                dt, "swept" if swept else "discrete", hits,
+                100. * (hits - reference) / max(reference, 1), seconds))
+
+
+if __name__ == "__main__":
+    main()
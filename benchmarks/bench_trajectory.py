@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+
+Measures the per-tick overhead of recording a trajectory.
+
+Run from the repository root:
+    python -m benchmarks.bench_trajectory
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+from asteroids import Runner
+from asteroids import Trajectory
+
+
+def time_steps(board, ticks, dt):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        board.step(dt)
+    return (time.perf_counter() - start) / ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--asteroids', type=int, nargs='+',
+                        default=[10, 100, 1000])
+    parser.add_argument('--ticks', type=int, default=500)
+    parser.add_argument('--dt', type=float, default=1. / 60.)
+    parser.add_argument('--vectorized', action='store_true')
+    args = parser.parse_args(argv)
+
+    print("{0:>8s}{1:>14s}{2:>14s}{3:>12s}{4:>12s}".format(
+        "pieces", "step us", "record us", "overhead", "MB"))
+    for count in args.asteroids:
+        kwargs = dict(size=(4000., 4000.), no_asteroids=count, seed=0,
+                      vectorized=args.vectorized)
+        plain = time_steps(Runner.make_board(**kwargs), args.ticks, args.dt)
+
+        path = tempfile.mkdtemp()
+        try:
+            board = Runner.make_board(**kwargs)
+            recorder = Trajectory.TrajectoryRecorder(path)
+            recorder.attach(board)
+            recorded = time_steps(board, args.ticks, args.dt)
+            recorder.close()
+            size = Trajectory.Trajectory(path).rows.nbytes
+        finally:
+            shutil.rmtree(path)
+        print("{0:>8d}{1:>14.1f}{2:>14.1f}{3:>11.1f}%{4:>12.2f}".format(
+            len(board.moving_objects), plain * 1e6, recorded * 1e6,
+            (recorded / plain - 1.) * 100., size / 2.**20))
+
+
+if __name__ == "__main__":
+    main()
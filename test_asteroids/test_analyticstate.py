@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import AnalyticState
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Runner
+from asteroids import Scheduler
+
+import numpy as np
+
+
+class TestAnalyticState(unittest.TestCase):
+    def setUp(self):
+        self.state = AnalyticState.AnalyticState((100., 50.), capacity=1)
+
+    def test_matches_euler(self):
+        reference = GamePiece.Asteroid1(2., (90., 10., 0.5), (7., -3.), 0.8)
+        asteroid = GamePiece.Asteroid1(2., (90., 10., 0.5), (7., -3.), 0.8)
+        projectile = GamePiece.Projectile(1., (5., 5., 0.), (1., 2.))
+        self.state.attach(asteroid, wrap=True)
+        self.state.attach(projectile)
+        self.assertEqual(self.state.capacity, 2)
+        for _ in range(100):
+            reference.step(0.1)
+            pos = reference.position
+            reference.position = (pos[0] % 100., pos[1] % 50., pos[2])
+            self.state.step(0.1)
+        np.testing.assert_allclose(asteroid.position, reference.position)
+        np.testing.assert_allclose(asteroid._heading(),
+                                   reference._heading())
+        # Projectiles are not wrapped.
+        np.testing.assert_allclose(projectile.position[:2], (15., 25.))
+        np.testing.assert_allclose(
+            self.state.poses([1, 0]),
+            [projectile.position, asteroid.position])
+
+    def test_writes_rebase(self):
+        asteroid = GamePiece.Asteroid1(2., (10., 10., 0.), (1., 0.), 1.)
+        self.state.attach(asteroid, wrap=True)
+        self.state.step(2.)
+        asteroid.velocity = (0., 1.)
+        np.testing.assert_allclose(asteroid.position, (12., 10., 2.))
+        asteroid.turn = 0
+        self.state.step(3.)
+        np.testing.assert_allclose(asteroid.position, (12., 13., 2.))
+        asteroid.position = (1., 2., 3.)
+        self.assertEqual(asteroid.position, (1., 2., 3.))
+
+    def test_thrust(self):
+        ship = GamePiece.Ship(1.)
+        ship.thrust = 1
+        with self.assertRaises(ValueError):
+            self.state.attach(ship)
+        ship.thrust = 0
+        self.state.attach(ship)
+        with self.assertRaises(ValueError):
+            ship.thrust = 1
+        with self.assertRaises(ValueError):
+            self.state.step(0.1, slots=[0])
+
+    def test_detach(self):
+        first = GamePiece.Projectile(1., (1., 1., 0.), (1., 0.))
+        second = GamePiece.Projectile(1., (2., 2., 0.), (0., 1.))
+        self.state.attach(first)
+        self.state.attach(second)
+        self.state.step(1.)
+        self.state.detach(first)
+        self.assertIsNone(first._world)
+        self.assertEqual(first.position, (2., 1., 0.))
+        self.assertEqual(second._slot, 0)
+        self.assertEqual(second.position, (2., 3., 0.))
+
+
+class TestAnalyticGameBoard(unittest.TestCase):
+    def test_matches_integrated_board(self):
+        for vectorized in (False, True):
+            plain = Runner.make_board(no_asteroids=10, seed=2)
+            analytic = Runner.make_board(no_asteroids=10, seed=2,
+                                         vectorized=vectorized,
+                                         analytic=True)
+            for board in (plain, analytic):
+                board._ship.thrust = 1
+                for tick in range(200):
+                    if tick % 10 == 0:
+                        board.ship_fire()
+                    board.step(0.05)
+            self.assertEqual(analytic.score, plain.score)
+            self.assertEqual(len(analytic._projectiles),
+                             len(plain._projectiles))
+            for a, b in zip(analytic.moving_objects, plain.moving_objects):
+                np.testing.assert_allclose(a.position, b.position)
+
+    def test_projectile_hit_and_cull(self):
+        board = GameBoard.GameBoard(size=(100., 100.), no_asteroids=1,
+                                    analytic=True)
+        board._add_asteroid(GamePiece.Asteroid1(
+            4., (50., 50., 0.), (0., 0.), 0.))
+        board._add_projectile(
+            GamePiece.Projectile(1., (40., 50., 0.), (10., 0.)))
+        board._add_projectile(
+            GamePiece.Projectile(1., (95., 10., 0.), (10., 0.)))
+        board.step(1.)
+        self.assertEqual(board.score, 1)
+        self.assertEqual(len(board._projectiles), 0)
+        self.assertEqual(len(board._analytic), 0)
+
+    def test_scheduler(self):
+        with self.assertRaises(AttributeError):
+            GameBoard.GameBoard(size=(10., 10.), no_asteroids=0,
+                                analytic=True,
+                                scheduler=Scheduler.SubstepScheduler())
+
+
+if __name__ == u"__main__":
+    unittest.main()
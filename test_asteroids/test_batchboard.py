@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import BatchBoard
+from asteroids import BroadPhase
+from asteroids import Runner
+
+import numpy as np
+
+
+def apply_actions(board, action):
+    board.ship_turn(int(action[0]))
+    board.ship_accelerate(bool(action[1]))
+    if action[2]:
+        board.ship_fire()
+
+
+class TestBatchBoard(unittest.TestCase):
+    def setUp(self):
+        self.boards = [Runner.make_board(size=(400., 300.), no_asteroids=8,
+                                         seed=seed) for seed in range(4)]
+        self.batch = BatchBoard.BatchBoard.from_boards(self.boards,
+                                                       max_projectiles=32)
+
+    def test_init_wrong_arguments(self):
+        with self.assertRaises(AttributeError):
+            BatchBoard.BatchBoard((1., 2., 3.), 2, 4)
+        with self.assertRaises(ValueError):
+            BatchBoard.BatchBoard((100., 100.), 0, 4)
+
+    def test_from_boards(self):
+        self.assertEqual(self.batch.n_boards, 4)
+        self.assertEqual(self.batch.asteroid_alive.sum(), 32)
+        np.testing.assert_allclose(self.batch.ship_position[0],
+                                   self.boards[0]._ship.position[:2])
+
+    def test_wrong_turn(self):
+        with self.assertRaises(ValueError):
+            self.batch.step(0.1, np.full((4, 3), 2))
+
+    def test_matches_gameboard(self):
+        rng = np.random.RandomState(5)
+        for tick in range(120):
+            actions = np.column_stack((rng.randint(-1, 2, 4),
+                                       rng.randint(0, 2, 4),
+                                       rng.uniform(size=4) < 0.2))
+            for board, action in zip(self.boards, actions):
+                apply_actions(board, action)
+                board.step(0.1)
+            observations, done = self.batch.step(0.1, actions)
+        for k, board in enumerate(self.boards):
+            self.assertEqual(done[k], board.gameover)
+            self.assertEqual(observations['score'][k], board.score)
+            np.testing.assert_allclose(
+                observations['ship'][k, :3], board._ship.position)
+            alive = observations['asteroid_alive'][k]
+            expected = sorted(asteroid.position[:2]
+                              for asteroid in board._asteroids)
+            actual = sorted(tuple(xy) for xy in
+                            observations['asteroid_position'][k][alive])
+            np.testing.assert_allclose(actual, expected)
+            self.assertEqual(observations['projectile_alive'][k].sum(),
+                             len(board._projectiles))
+        self.assertGreater(self.batch.score.sum(), 0)
+
+    def test_broad_phase(self):
+        batches = [BatchBoard.BatchBoard.from_boards(
+            self.boards, max_projectiles=32, broad_phase=broad_phase)
+            for broad_phase in (BroadPhase.BruteForce(),
+                                BroadPhase.UniformGrid(brute_force_below=0))]
+        actions = np.column_stack((np.ones(4, dtype=int),
+                                   np.zeros(4, dtype=int),
+                                   np.ones(4, dtype=int)))
+        for _ in range(150):
+            observations = [batch.step(0.1, actions)[0] for batch in batches]
+        self.assertGreater(batches[0].score.sum(), 0)
+        for name in ('asteroid_alive', 'projectile_alive', 'score'):
+            np.testing.assert_array_equal(observations[0][name],
+                                          observations[1][name])
+        with self.assertRaises(AttributeError):
+            BatchBoard.BatchBoard((100., 100.), 2, 4, broad_phase=10)
+
+    def test_projectile_capacity(self):
+        batch = BatchBoard.BatchBoard.from_boards(self.boards[:1],
+                                                  max_projectiles=2)
+        for _ in range(3):
+            batch.step(0.01, [[0, 0, 1]])
+        self.assertEqual(batch.projectile_alive.sum(), 2)
+
+
+    def test_default_projectile_capacity(self):
+        boards = self.boards[:2]
+        batch = BatchBoard.BatchBoard.from_boards(boards)
+        self.assertEqual(batch.projectile_alive.shape[1],
+                         boards[0].projectile_pool.capacity)
+        # Firing on every tick keeps more shots in flight than the old
+        # default of 64 slots.
+        actions = np.array([[1, 0, 1]] * 2)
+        for _ in range(100):
+            for board, action in zip(boards, actions):
+                apply_actions(board, action)
+                board.step(0.01)
+            observations, _ = batch.step(0.01, actions)
+        for k, board in enumerate(boards):
+            self.assertGreater(len(board._projectiles), 64)
+            self.assertEqual(observations['projectile_alive'][k].sum(),
+                             len(board._projectiles))
+            self.assertEqual(observations['score'][k], board.score)
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import os
+import subprocess
+import sys
+import unittest
+from asteroids import Boundary
+from asteroids import EventDriven
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+import numpy as np
+
+
+class TestBoundary(unittest.TestCase):
+    def make_board(self, boundary=None, vectorized=False):
+        board = GameBoard.GameBoard(size=(100., 50.), no_asteroids=0,
+                                    vectorized=vectorized, boundary=boundary)
+        self.ship = GamePiece.Ship(5., (-10., 20., 1.))
+        board._add_ship(self.ship)
+        self.asteroid = GamePiece.Asteroid1(1., (120., -5., 2.), (3., -4.),
+                                            1.)
+        board._add_asteroid(self.asteroid)
+        self.inside = GamePiece.Projectile(1., (50., 25., 0.), (10., 0.))
+        board._add_projectile(self.inside)
+        self.outside = GamePiece.Projectile(1., (50., 60., 0.), (0., 1.))
+        board._add_projectile(self.outside)
+        return board
+
+    def test_toroidal(self):
+        class Batched(Boundary.Toroidal):
+            pass
+
+        # Scalar boards with the default policy skip the BoundsBatch.
+        for boundary, vectorized in ((None, False), (None, True),
+                                     (Batched(), False)):
+            board = self.make_board(boundary, vectorized=vectorized)
+            outside_id = board.entity_id(self.outside)
+            self.assertEqual(board._apply_bounds(), [outside_id])
+            self.assertEqual(self.ship.position, (90., 20., 1.))
+            self.assertEqual(self.asteroid.position, (20., 45., 2.))
+            self.assertEqual(list(board._projectiles), [self.inside])
+            self.assertEqual(board._apply_bounds(), [])
+
+    def test_groups(self):
+        board = self.make_board()
+        self.assertEqual(board._apply_bounds(('ship',)), [])
+        self.assertEqual(self.ship.position, (90., 20., 1.))
+        self.assertEqual(self.asteroid.position, (120., -5., 2.))
+        self.assertEqual(len(board._projectiles), 2)
+
+    def test_arena(self):
+        board = self.make_board(Boundary.Arena())
+        board._apply_bounds()
+        self.assertEqual(self.ship.position, (10., 20., 1.))
+        self.assertEqual(self.asteroid.position, (80., 5., 2.))
+        self.assertEqual(self.asteroid.velocity, (-3., 4.))
+        self.assertEqual(list(board._projectiles), [self.inside])
+
+    def test_projectile_range(self):
+        board = self.make_board(Boundary.ProjectileRange(max_distance=15.))
+        board._apply_bounds()
+        self.assertEqual(list(board._projectiles), [self.inside])
+        board.step(1.)
+        self.assertEqual(len(board._projectiles), 1)
+        board.step(1.)
+        self.assertEqual(len(board._projectiles), 0)
+
+    def test_projectile_age(self):
+        # The age counts from the first step that sees the projectile.
+        board = self.make_board(Boundary.ProjectileRange(max_age=2.5))
+        for _ in range(3):
+            board.step(1.)
+            self.assertEqual(list(board._projectiles), [self.inside])
+        board.step(1.)
+        self.assertEqual(len(board._projectiles), 0)
+
+    def test_step_matches_passes(self):
+        board = self.make_board()
+        board.step(0.5)
+        reference = self.make_board()
+        reference._calculate_new_position(0.5)
+        reference._asteroids_out_of_bounds()
+        reference._projectiles_out_of_bounds()
+        reference._ship_out_of_bounds()
+        np.testing.assert_array_equal(
+            [piece.position for piece in board.moving_objects],
+            [piece.position for piece in reference.moving_objects])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Boundary.ProjectileRange()
+        with self.assertRaises(AttributeError):
+            GameBoard.GameBoard(size=(100., 50.), no_asteroids=0,
+                                boundary=object())
+        with self.assertRaises(AttributeError):
+            GameBoard.GameBoard(size=(100., 50.), no_asteroids=0,
+                                analytic=True, boundary=Boundary.Arena())
+        board = GameBoard.GameBoard(
+            size=(100., 50.), no_asteroids=0, analytic=True,
+            boundary=Boundary.ProjectileRange(max_distance=10.))
+        with self.assertRaises(ValueError):
+            EventDriven.EventSimulator(board, 0.1)
+
+
+class TestImports(unittest.TestCase):
+    def test_import_first(self):
+        # Every module imports cleanly into a fresh interpreter.
+        package = os.path.dirname(os.path.abspath(Boundary.__file__))
+        root = os.path.dirname(package)
+        names = sorted(name[:-3] for name in os.listdir(package)
+                       if name.endswith('.py') and not name.startswith('_'))
+        for name in names:
+            result = subprocess.run(
+                [sys.executable, '-c', 'from asteroids import ' + name],
+                cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.assertEqual(result.returncode, 0,
+                             name + ': ' + result.stderr.decode())
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import BroadPhase
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+import numpy as np
+
+
+def reference_pairs(pos_a, radius_a, pos_b, radius_b, size):
+    pairs = set()
+    for i in range(len(pos_a)):
+        for j in range(len(pos_b)):
+            delta = BroadPhase.wrapped_delta(pos_a[i], pos_b[j], size)
+            if np.hypot(*delta) <= radius_a[i] + radius_b[j]:
+                pairs.add((i, j))
+    return pairs
+
+
+class TestBroadPhase(unittest.TestCase):
+    size = (100., 80.)
+
+    def setUp(self):
+        rng = np.random.RandomState(3)
+        self.pos_a = rng.uniform(-10., 110., (60, 2))
+        self.radius_a = rng.uniform(0.5, 6., 60)
+        self.pos_b = rng.uniform(0., 100., (80, 2))
+        self.radius_b = np.zeros(80)
+        self.expected = reference_pairs(self.pos_a, self.radius_a,
+                                        self.pos_b, self.radius_b, self.size)
+
+    def check(self, broad_phase):
+        ia, ib = broad_phase.candidate_pairs(
+            self.pos_a, self.radius_a, self.pos_b, self.radius_b, self.size)
+        self.assertSetEqual(set(zip(ia.tolist(), ib.tolist())),
+                            self.expected)
+
+    def test_brute_force(self):
+        ia, ib = BroadPhase.BruteForce().candidate_pairs(
+            self.pos_a, self.radius_a, self.pos_b, self.radius_b, self.size)
+        self.assertEqual(len(ia), 60 * 80)
+
+    def test_uniform_grid(self):
+        self.check(BroadPhase.UniformGrid())
+        self.check(BroadPhase.UniformGrid(cell_size=40.))
+
+    def test_sweep_and_prune(self):
+        self.check(BroadPhase.SweepAndPrune())
+
+    def test_wrap_around(self):
+        for broad_phase in (BroadPhase.UniformGrid(),
+                            BroadPhase.SweepAndPrune()):
+            ia, ib = broad_phase.candidate_pairs(
+                [(99., 79.)], [3.], [(0.5, 0.5)], [0.], self.size)
+            self.assertEqual(len(ia), 1)
+
+    def test_radius_b(self):
+        rng = np.random.RandomState(5)
+        pos_b = rng.uniform(-5., 105., (80, 2))
+        radius_b = rng.uniform(0., 6., 80)
+        expected = reference_pairs(self.pos_a, self.radius_a, pos_b,
+                                   radius_b, self.size)
+        for broad_phase in (BroadPhase.UniformGrid(),
+                            BroadPhase.UniformGrid(brute_force_below=0),
+                            BroadPhase.SweepAndPrune()):
+            ia, ib = broad_phase.candidate_pairs(
+                self.pos_a, self.radius_a, pos_b, radius_b, self.size)
+            self.assertTrue(expected <= set(zip(ia.tolist(), ib.tolist())))
+
+    def test_seam_radius_b(self):
+        # The pair overlaps across x = 0 only with the radius of b.
+        for broad_phase in (BroadPhase.UniformGrid(),
+                            BroadPhase.SweepAndPrune()):
+            for pos_a, pos_b in (((1., 50.), (99.5, 50.)),
+                                 ((99.5, 50.), (1., 50.))):
+                ia, ib = broad_phase.candidate_pairs(
+                    [pos_a], [1.], [pos_b], [1.], self.size)
+                self.assertEqual(len(ia), 1)
+
+    def test_batched(self):
+        rng = np.random.RandomState(4)
+        board_a = rng.randint(3, size=60)
+        board_b = rng.randint(3, size=80)
+        expected = set()
+        for k in range(3):
+            a = np.nonzero(board_a == k)[0]
+            b = np.nonzero(board_b == k)[0]
+            expected |= {(a[i], b[j]) for i, j in reference_pairs(
+                self.pos_a[a], self.radius_a[a], self.pos_b[b],
+                self.radius_b[b], self.size)}
+        for broad_phase in (BroadPhase.UniformGrid(),
+                            BroadPhase.UniformGrid(brute_force_below=0),
+                            BroadPhase.SweepAndPrune()):
+            ia, ib = broad_phase.batched_pairs(
+                board_a, self.pos_a, self.radius_a, board_b, self.pos_b,
+                self.radius_b, self.size)
+            self.assertSetEqual(set(zip(ia.tolist(), ib.tolist())),
+                                expected)
+
+    def test_empty(self):
+        ia, ib = BroadPhase.UniformGrid().candidate_pairs(
+            np.zeros((0, 2)), [], [(1., 1.)], [0.], self.size)
+        self.assertEqual(len(ia), 0)
+
+    def test_wrong_cell_size(self):
+        with self.assertRaises(ValueError):
+            BroadPhase.UniformGrid(cell_size=0.)
+
+
+class TestGameBoardBroadPhase(unittest.TestCase):
+    def test_wrong_broad_phase(self):
+        with self.assertRaises(AttributeError):
+            GameBoard.GameBoard(size=(100., 100.), no_asteroids=1,
+                                broad_phase=10)
+
+    def test_far_projectile_is_skipped(self):
+        gameboard = GameBoard.GameBoard(
+            size=(100., 100.), no_asteroids=1,
+            broad_phase=BroadPhase.SweepAndPrune())
+        asteroid = GamePiece.Asteroid1(2., (10., 10., 0.), (0., 0.), 0.)
+        projectile = GamePiece.Projectile(1., (60., 60., 0.), (0., 0.))
+        gameboard._add_asteroid(asteroid)
+        gameboard._add_projectile(projectile)
+        gameboard._resolve_collision()
+        self.assertIn(asteroid, gameboard._asteroids)
+        self.assertIn(projectile, gameboard._projectiles)
+
+
+if __name__ == u"__main__":
+    unittest.main()
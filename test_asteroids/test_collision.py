@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import Collision
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+import numpy as np
+
+
+class TestCollision(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(7)
+        self.pieces_a = []
+        self.pieces_b = []
+        for _ in range(200):
+            x, y, angle_a, angle_b = rng.uniform(-2., 2., 4)
+            self.pieces_a.append(GamePiece.Ship(
+                2., position=(0., 0., float(angle_a))))
+            self.pieces_b.append(GamePiece.Asteroid1(
+                2., (float(x), float(y), float(angle_b)), (0., 0.), 0.))
+        self.points = rng.uniform(-1., 1., (200, 2))
+
+    def world(self, pieces):
+        vertices, normals = Collision.stack_polygons(
+            [piece._gb_repr for piece in pieces])
+        positions = [piece.position for piece in pieces]
+        return Collision.to_world(vertices, normals, positions)
+
+    def test_stack_ragged(self):
+        vertices, normals = Collision.stack_polygons(
+            [self.pieces_a[0]._gb_repr, self.pieces_b[0]._gb_repr])
+        self.assertEqual(vertices.shape, (2, 7, 2))
+        self.assertSequenceEqual(vertices[0, 6].tolist(),
+                                 list(self.pieces_a[0]._gb_repr.xy[-1]))
+
+    def test_stack_shapes(self):
+        asteroids = [GamePiece.Asteroid2(3., (0., 0., 0.), (0., 0.), 0.),
+                     GamePiece.Asteroid3(2., (0., 0., 0.), (0., 0.), 0.)]
+        vertices, normals = Collision.stack_shapes(
+            [asteroid.shape_id for asteroid in asteroids], [3., 2.])
+        expected = Collision.stack_polygons(
+            [asteroid._gb_repr for asteroid in asteroids],
+            n_vertices=vertices.shape[1])
+        np.testing.assert_allclose(vertices, expected[0])
+        np.testing.assert_allclose(normals, expected[1])
+
+    def test_to_world(self):
+        vertices, _ = self.world(self.pieces_b[:1])
+        expected = self.pieces_b[0].world_repr().xy
+        np.testing.assert_allclose(vertices[0], expected)
+
+    def test_polygons_collide(self):
+        mask = Collision.polygons_collide(*(self.world(self.pieces_a) +
+                                            self.world(self.pieces_b)))
+        expected = [a.collides(b) for a, b in
+                    zip(self.pieces_a, self.pieces_b)]
+        self.assertSequenceEqual(mask.tolist(), expected)
+        self.assertTrue(0 < mask.sum() < len(mask))
+
+    def test_points_inside(self):
+        vertices, normals = self.world(self.pieces_a)
+        mask = Collision.points_inside(vertices, normals, self.points)
+        expected = [a.world_repr().point_inside(pt) for a, pt in
+                    zip(self.pieces_a, self.points)]
+        self.assertSequenceEqual(mask.tolist(), expected)
+        self.assertTrue(0 < mask.sum() < len(mask))
+
+    def test_empty(self):
+        empty = np.zeros((0, 3, 2))
+        self.assertEqual(len(Collision.points_inside(empty, empty,
+                                                     np.zeros((0, 2)))), 0)
+
+    def test_swept_points(self):
+        vertices, normals = self.world(self.pieces_b)
+        hit, toi = Collision.swept_points(vertices, normals, self.points,
+                                          np.zeros_like(self.points))
+        self.assertSequenceEqual(
+            hit.tolist(),
+            Collision.points_inside(vertices, normals, self.points).tolist())
+        self.assertTrue(np.all(toi[hit] == 0.))
+
+    def test_swept_points_time_of_impact(self):
+        # Square of side 2 around the origin.
+        square = GamePiece.ConvexPolygon([(-1., -1.), (1., -1.), (1., 1.),
+                                          (-1., 1.)])
+        vertices, normals = Collision.stack_polygons([square] * 4)
+        points = [(5., 0.), (0., 5.), (5., 3.), (-0.5, 0.)]
+        displacements = [(10., 0.), (0., 8.), (10., 0.), (-0.25, 0.)]
+        hit, toi = Collision.swept_points(vertices, normals, points,
+                                          displacements)
+        self.assertSequenceEqual(hit.tolist(), [True, True, False, True])
+        self.assertAlmostEqual(toi[0], 0.4)
+        self.assertAlmostEqual(toi[1], 0.25)
+        self.assertEqual(toi[3], 0.)
+
+
+class TestGameBoardCollision(unittest.TestCase):
+    def setUp(self):
+        self.gameboard = GameBoard.GameBoard(size=(100., 100.),
+                                             no_asteroids=2)
+
+    def test_collision_across_edge(self):
+        asteroid = GamePiece.Asteroid1(4., (99.5, 50., 0.), (0., 0.), 0.)
+        projectile = GamePiece.Projectile(1., (0.5, 50., 0.), (0., 0.))
+        self.gameboard._add_asteroid(asteroid)
+        self.gameboard._add_projectile(projectile)
+        self.gameboard._resolve_collision()
+        self.assertNotIn(asteroid, self.gameboard._asteroids)
+        self.assertNotIn(projectile, self.gameboard.moving_objects)
+
+    def test_no_collision_apart(self):
+        ship = GamePiece.Ship(1., (10., 10., 0.))
+        asteroid = GamePiece.Asteroid1(1., (20., 10., 0.), (0., 0.), 0.)
+        self.gameboard._add_ship(ship)
+        self.gameboard._add_asteroid(asteroid)
+        self.gameboard._resolve_collision()
+        self.assertFalse(self.gameboard.gameover)
+
+    def fire_through(self, swept):
+        gameboard = GameBoard.GameBoard(size=(100., 100.), no_asteroids=1,
+                                        swept=swept)
+        asteroid = GamePiece.Asteroid1(2., (50., 50., 0.), (0., 0.), 0.)
+        # Moves from x=40 to x=60 in one step of 0.5, over the asteroid.
+        projectile = GamePiece.Projectile(1., (40., 50., 0.), (40., 0.))
+        gameboard._add_asteroid(asteroid)
+        gameboard._add_projectile(projectile)
+        gameboard.step(0.5)
+        return gameboard
+
+    def test_tunneling(self):
+        self.assertEqual(self.fire_through(swept=False).score, 0)
+
+    def test_swept(self):
+        gameboard = self.fire_through(swept=True)
+        self.assertEqual(gameboard.score, 1)
+        self.assertEqual(len(gameboard._projectiles), 0)
+        (asteroid_id, projectile_id, time), = gameboard.impacts
+        self.assertEqual((asteroid_id, projectile_id), (0, 1))
+        self.assertGreater(time, 0.1)
+        self.assertLess(time, 0.25)
+
+
+if __name__ == u"__main__":
+    unittest.main()
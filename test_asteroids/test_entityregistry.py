@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import EntityRegistry
+from asteroids import GameBoard
+from asteroids import GamePiece
+
+
+class TestEntityRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = EntityRegistry.EntityRegistry()
+        self.items = [object() for _ in range(5)]
+        self.ids = [self.registry.append(item) for item in self.items]
+
+    def test_append(self):
+        self.assertEqual(len(self.registry), 5)
+        self.assertIs(self.registry[-1], self.items[-1])
+        self.assertSequenceEqual(self.ids, list(range(5)))
+        with self.assertRaises(ValueError):
+            self.registry.append(self.items[0])
+
+    def test_remove_swaps_last(self):
+        self.registry.remove(self.items[1])
+        self.assertNotIn(self.items[1], self.registry)
+        self.assertIs(self.registry[1], self.items[4])
+        self.assertEqual(self.registry.id_of(self.items[4]), 4)
+        self.assertIs(self.registry.get(4), self.items[4])
+        with self.assertRaises(KeyError):
+            self.registry.get(1)
+
+    def test_ids_are_not_reused(self):
+        self.registry.remove(self.items[4])
+        self.assertEqual(self.registry.append(object()), 5)
+
+    def test_deferred_removal(self):
+        items = self.registry.items
+        for item in self.items[::2]:
+            self.registry.kill(item)
+        self.assertEqual(len(self.registry), 5)
+        self.assertFalse(self.registry.is_alive(self.items[0]))
+        self.assertTrue(self.registry.is_alive(self.items[1]))
+        removed = self.registry.flush()
+        self.assertSequenceEqual(removed, self.items[::2])
+        self.assertIs(self.registry.items, items)
+        self.assertSetEqual(set(self.registry),
+                            {self.items[1], self.items[3]})
+        self.assertEqual(self.registry.pending, 0)
+
+    def test_kill_unknown(self):
+        with self.assertRaises(ValueError):
+            self.registry.kill(object())
+
+
+class TestGameBoardRegistry(unittest.TestCase):
+    def test_projectiles_out_of_bounds(self):
+        gameboard = GameBoard.GameBoard(size=(100., 100.), no_asteroids=1)
+        inside = [GamePiece.Projectile(1., (float(x), 50., 0.), (0., 0.))
+                  for x in (10., 20., 30.)]
+        outside = [GamePiece.Projectile(1., (float(x), 50., 0.), (0., 0.))
+                   for x in (-10., 110., 120.)]
+        for projectile in (inside[0], outside[0], inside[1], outside[1],
+                           outside[2], inside[2]):
+            gameboard._add_projectile(projectile)
+        ids = [gameboard.entity_id(projectile) for projectile in inside]
+        gameboard._projectiles_out_of_bounds()
+        self.assertSetEqual(set(gameboard._projectiles), set(inside))
+        self.assertSetEqual(set(gameboard.moving_objects), set(inside))
+        self.assertSequenceEqual(
+            [gameboard.entity_id(projectile) for projectile in inside], ids)
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import EventDriven
+from asteroids import GamePiece
+from asteroids import Runner
+
+import numpy as np
+
+
+def inputs(tick):
+    """Ship inputs of a scripted game: turn, thrust and fire."""
+    turn = (1, 0, -1, 0)[(tick // 25) % 4]
+    thrust = 60 <= tick < 70
+    fire = tick % 15 == 0
+    return turn, thrust, fire
+
+
+class TestEventSimulator(unittest.TestCase):
+    def make_board(self, vectorized=False):
+        return Runner.make_board(size=(400., 300.), no_asteroids=8, seed=5,
+                                 vectorized=vectorized, analytic=True)
+
+    def state(self, board):
+        return {board.entity_id(piece): piece.position
+                for piece in board.moving_objects}
+
+    def check_state(self, board, reference):
+        self.assertEqual(board.score, reference.score)
+        self.assertEqual(board.gameover, reference.gameover)
+        state = self.state(board)
+        expected = self.state(reference)
+        self.assertEqual(sorted(state), sorted(expected))
+        for entity_id, position in expected.items():
+            np.testing.assert_allclose(state[entity_id][:2], position[:2],
+                                       atol=1e-6)
+            # Angles may differ by a full turn.
+            delta = (state[entity_id][2] - position[2] + np.pi) % (
+                2. * np.pi) - np.pi
+            self.assertAlmostEqual(delta, 0., places=6)
+
+    def run_game(self, vectorized, chunk):
+        dt = 0.1
+        reference = self.make_board(vectorized)
+        board = self.make_board(vectorized)
+        simulator = EventDriven.EventSimulator(board, dt)
+        for tick in range(0, 200, chunk):
+            turn, thrust, fire = inputs(tick)
+            reference.ship_turn(turn)
+            reference.ship_accelerate(thrust)
+            if fire:
+                reference.ship_fire()
+            for _ in range(chunk):
+                reference.step(dt)
+            simulator.ship_turn(turn)
+            simulator.ship_accelerate(thrust)
+            if fire:
+                simulator.ship_fire()
+            self.assertEqual(simulator.advance(chunk), chunk)
+            self.check_state(board, reference)
+        self.assertGreater(reference.score, 0)
+        self.assertLess(simulator.visited, simulator.tick)
+
+    def test_matches_fixed_step(self):
+        self.run_game(vectorized=False, chunk=5)
+
+    def test_matches_fixed_step_vectorized(self):
+        self.run_game(vectorized=True, chunk=5)
+
+    def test_gameover(self):
+        board = Runner.make_board(size=(400., 300.), no_asteroids=0,
+                                  analytic=True)
+        board._add_asteroid(GamePiece.Asteroid1(
+            10., (50., 150., 0.), (30., 0.), 0.))
+        simulator = EventDriven.EventSimulator(board, 0.1)
+        ticks = simulator.advance(1000, stop_on_gameover=True)
+        self.assertTrue(board.gameover)
+        self.assertLess(ticks, 1000)
+        self.assertLess(simulator.visited, 20)
+
+    def test_projectile_outside(self):
+        # A projectile outside the board is removed on the next tick
+        # instead of being due again and again.
+        reference = self.make_board()
+        board = self.make_board()
+        simulator = EventDriven.EventSimulator(board, 0.05)
+        simulator.advance(3)
+        for _ in range(3):
+            reference.step(0.05)
+        for game in (reference, board):
+            game._add_projectile(GamePiece.Projectile(
+                1., (405.6, 100., 0.), (10., 0.)))
+        reference.step(0.05)
+        self.assertEqual(simulator.advance(1), 1)
+        self.assertEqual(len(board._projectiles), 0)
+        self.check_state(board, reference)
+
+    def test_invalid(self):
+        board = Runner.make_board(size=(400., 300.), no_asteroids=1)
+        with self.assertRaises(ValueError):
+            EventDriven.EventSimulator(board, 0.1)
+        board = self.make_board()
+        with self.assertRaises(ValueError):
+            EventDriven.EventSimulator(board, 0.)
+        simulator = EventDriven.EventSimulator(board, 0.1)
+        with self.assertRaises(ValueError):
+            simulator.advance(-1)
+
+
+if __name__ == u"__main__":
+    unittest.main()
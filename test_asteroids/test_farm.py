@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import Farm
+
+
+import numpy as np
+
+
+def fire_policy(board, tick):
+    if tick % 5 == 0:
+        board.ship_fire()
+
+
+class TestFarm(unittest.TestCase):
+    def test_inline(self):
+        result = Farm.run_farm([3, 4, 5], 20, 0.05, no_asteroids=4,
+                               workers=0, stop_on_gameover=False)
+        self.assertEqual(result.results.dtype, Farm.RESULT_DTYPE)
+        self.assertSequenceEqual(result.results['seed'].tolist(), [3, 4, 5])
+        self.assertSequenceEqual(result.results['ticks'].tolist(),
+                                 [20, 20, 20])
+        self.assertEqual(result.board_ticks, 60)
+        self.assertGreater(result.ticks_per_second, 0.)
+
+    def test_process_pool_matches_inline(self):
+        kwargs = dict(seeds=range(6), ticks=30, dt=0.05, no_asteroids=6,
+                      batch_ticks=8, policy=fire_policy)
+        inline = Farm.run_farm(workers=0, **kwargs)
+        pooled = Farm.run_farm(workers=2, **kwargs)
+        for name in ('gameover', 'score', 'ticks', 'asteroids',
+                     'projectiles'):
+            np.testing.assert_array_equal(inline.results[name],
+                                          pooled.results[name])
+        self.assertGreater(len(pooled.worker_seconds), 0)
+
+    def test_stop_on_gameover(self):
+        result = Farm.run_farm([1], 5000, 0.05, no_asteroids=12, workers=0)
+        self.assertTrue(result.results['gameover'][0])
+        self.assertLess(result.results['ticks'][0], 5000)
+
+    def test_wrong_arguments(self):
+        with self.assertRaises(ValueError):
+            Farm.run_farm([1], -1, 0.05, workers=0)
+        with self.assertRaises(ValueError):
+            Farm.run_farm([1], 1, 0.05, workers=0, batch_ticks=0)
+
+
+if __name__ == u"__main__":
+    unittest.main()
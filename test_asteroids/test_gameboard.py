@@ -100,6 +100,13 @@ class TestGameBoardHiddenMethods(unittest.TestCase):
         self.gameboard._ship_out_of_bounds()
         self.assertSequenceEqual(ship.position, (70., 20., 1.))
 
+    def test_calculate_new_position(self):
+        asteroid = GamePiece.Asteroid1(1., (10., 10., 0.), (1., 2.), 1.)
+        self.gameboard._add_asteroid(asteroid)
+        self.gameboard._calculate_new_position(1.)
+        self.assertAlmostEqual(asteroid.position[0], 11.)
+        self.assertAlmostEqual(asteroid.position[1], 12.)
+
     def test_collision_asteroid_collides_ship(self):
         ship = GamePiece.Ship(size=1.,position=(0., 0., 2.))
         asteroid = GamePiece.Asteroid1(size=1., position=(0., 0., 4.),
@@ -120,6 +127,7 @@ class TestGameBoardHiddenMethods(unittest.TestCase):
         self.gameboard._resolve_collision()
         self.assertNotIn(asteroid, self.gameboard._asteroids)
         self.assertNotIn(projectile, self.gameboard._projectiles)
+        self.assertEqual(self.gameboard.score, 1)
 
 
 class TestGameBoardUserMethods(unittest.TestCase):
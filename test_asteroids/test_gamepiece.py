@@ -151,6 +151,14 @@ class TestConvexPolygon(unittest.TestCase):
         poly.rotate(np.pi/2.)
         self.assertAlmostEqual(poly.xy[1][0], -1.)
 
+    def test_intervals(self):
+        poly = GamePiece.ConvexPolygon([(0., 0.), (1., 0.), (0., 1.)])
+        intervals = poly.intervals()
+        self.assertIs(poly.intervals(), intervals)
+        self.assertAlmostEqual(intervals[0][0], 0.)
+        poly.rotate(np.pi)
+        self.assertIsNot(poly.intervals(), intervals)
+
     def test_pt_inside(self):
         poly1 = GamePiece.ConvexPolygon([(0., 0.), (1., 1.), (0., 1.)])
         # Only points within the polygon's area return True.
@@ -189,6 +197,34 @@ class TestGamePiece(unittest.TestCase):
         self.assertTrue(gb1.collides(gb2))
         self.assertFalse(gb1.collides(gb3))
 
+    def test_col_poly_poly_moved(self):
+        gb1 = GamePiece.GamePiece(1.0, 'polygon', position=(5., 0., 0.),
+                                  xy=[(0., 0.), (2., 0.), (0., 1.)])
+        gb2 = GamePiece.GamePiece(1.0, 'polygon',
+                                  xy=[(1., 0.), (4., 2.), (4., 0.)])
+        self.assertFalse(gb1.collides(gb2))
+        gb1.position = (2., 0., np.pi)
+        self.assertTrue(gb1.collides(gb2))
+
+    def test_world_repr_cache(self):
+        gb = GamePiece.GamePiece(1.0, 'polygon', position=(1., 2., 0.5),
+                                 xy=[(0., 0.), (2., 0.), (0., 1.)])
+        world = gb.world_repr()
+        self.assertIs(gb.world_repr(), world)
+        rotated = gb._rotated
+        gb.position = (3., 2., 0.5)
+        moved = gb.world_repr()
+        self.assertIsNot(moved, world)
+        self.assertIs(gb._rotated, rotated)
+        self.assertAlmostEqual(moved.xy[0][0], world.xy[0][0] + 2.)
+        expected = GamePiece.ConvexPolygon(moved.xy).intervals()
+        for (lo, hi), (exp_lo, exp_hi) in zip(moved.intervals(), expected):
+            self.assertAlmostEqual(lo, exp_lo)
+            self.assertAlmostEqual(hi, exp_hi)
+        gb.position = (3., 2., 1.5)
+        gb.world_repr()
+        self.assertIsNot(gb._rotated, rotated)
+
     def test_col_pt_pt(self):
         pt1 = GamePiece.GamePiece(1.0, 'point', position=(1., 0., 0.))
         pt2 = GamePiece.GamePiece(1.0, 'point', position=(1., 0., 0.))
@@ -233,6 +269,61 @@ class TestAsteroids(unittest.TestCase):
                                3.6+1.2+0.+10.)
 
 
+class TestSlots(unittest.TestCase):
+    def test_no_instance_dict(self):
+        pieces = [
+            GamePiece.PhysicsEngine(),
+            GamePiece.Point((1., 2.)),
+            GamePiece.ConvexPolygon([(0., 0.), (1., 0.), (0., 1.)]),
+            GamePiece.ScaledPolygon(GamePiece.Asteroid1._shape, 2.),
+            GamePiece.Ship(1.),
+            GamePiece.Asteroid1(1., (0., 0., 0.), (0., 0.), 1.),
+            GamePiece.Projectile(1., (0., 0., 0.), (1., 0.))]
+        for piece in pieces:
+            self.assertFalse(hasattr(piece, '__dict__'))
+
+
+class TestShapeTemplates(unittest.TestCase):
+    def test_shared_template(self):
+        asteroid1 = GamePiece.Asteroid1(2., (0., 0., 0.), (0., 0.), 1.)
+        asteroid2 = GamePiece.Asteroid1(3., (1., 0., 0.), (0., 0.), 1.)
+        self.assertIs(asteroid1._gb_repr.side_normal,
+                      asteroid2._gb_repr.side_normal)
+        self.assertEqual(asteroid1.shape_id, asteroid2.shape_id)
+
+    def test_scaled_polygon(self):
+        asteroid = GamePiece.Asteroid1(2., (0., 0., 0.), (0., 0.), 1.)
+        expected = GamePiece.ConvexPolygon(
+            [(2. * x, 2. * y) for (x, y) in GamePiece.Asteroid1._xy])
+        np.testing.assert_allclose(asteroid._gb_repr.xy, expected.xy)
+        np.testing.assert_allclose(asteroid._gb_repr.side_normal,
+                                   expected.side_normal)
+        np.testing.assert_allclose(asteroid._gb_repr.intervals(),
+                                   expected.intervals())
+        self.assertAlmostEqual(asteroid.bounding_radius, 2. * np.max(
+            np.hypot(*np.array(GamePiece.Asteroid1._xy).T)))
+
+    def test_scaled_polygon_rotate(self):
+        poly = GamePiece.ScaledPolygon(GamePiece.Asteroid2._shape, 2.)
+        poly.rotate(np.pi)
+        self.assertAlmostEqual(poly.xy[0][0], -1.)
+        self.assertAlmostEqual(poly.intervals()[0][1],
+                               max(poly.projection(poly.side_normal[0])))
+        self.assertAlmostEqual(GamePiece.Asteroid2._shape.xy[0][0], 0.5)
+
+    def test_wrong_scale(self):
+        with self.assertRaises(ValueError):
+            GamePiece.ScaledPolygon(GamePiece.Asteroid2._shape, 0.)
+
+    def test_shapes_registered(self):
+        shape_ids = {cls._shape.shape_id for cls in (
+            GamePiece.Asteroid1, GamePiece.Asteroid2, GamePiece.Asteroid3)}
+        self.assertEqual(len(shape_ids), 3)
+        for shape_id in shape_ids:
+            self.assertEqual(GamePiece.shape_template(shape_id).shape_id,
+                             shape_id)
+
+
 class TestProjectile(unittest.TestCase):
     def test_init_(self):
         projectile = GamePiece.Projectile(size=1., position=(2., 3., 4.),
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Snapshot
+
+import numpy as np
+
+
+class TestMultiplayer(unittest.TestCase):
+    def make_board(self, positions, vectorized=False, friendly_fire=False,
+                   teams=None):
+        board = GameBoard.GameBoard(size=(300., 200.), no_asteroids=0,
+                                    vectorized=vectorized, max_ships=4,
+                                    friendly_fire=friendly_fire)
+        teams = teams or [None] * len(positions)
+        self.ships = [GamePiece.Ship(10., position) for position in positions]
+        for ship, team in zip(self.ships, teams):
+            board._add_ship(ship, team=team)
+        return board
+
+    def test_add_ships(self):
+        board = self.make_board([(50., 50., 0.), (150., 50., 0.)])
+        self.assertIs(board._ship, self.ships[0])
+        self.assertEqual(board.ship_ids, [0, 1])
+        board._add_ship(GamePiece.Ship(10., (250., 50., 0.)))
+        board._add_ship(GamePiece.Ship(10., (50., 150., 0.)))
+        with self.assertRaises(RuntimeError):
+            board._add_ship(GamePiece.Ship(10., (150., 150., 0.)))
+        with self.assertRaises(AttributeError):
+            GameBoard.GameBoard(size=(300., 200.), no_asteroids=0,
+                                max_ships=0)
+
+    def test_ship_collision(self):
+        board = self.make_board([(50., 50., 0.), (53., 52., 0.),
+                                 (150., 50., 0.)])
+        board._resolve_collision()
+        self.assertEqual(sorted(board.ship_hits), [(0, 1), (1, 0)])
+        self.assertEqual(list(board._ships), [self.ships[2]])
+        self.assertIs(board._ship, self.ships[2])
+        self.assertFalse(board.gameover)
+
+    def test_ship_collision_across_edge(self):
+        board = self.make_board([(1., 50., 0.), (299., 50., 0.)])
+        board._resolve_collision()
+        self.assertEqual(len(board._ships), 0)
+        self.assertTrue(board.gameover)
+
+    def test_team_mates_pass(self):
+        positions = [(50., 50., 0.), (53., 52., 0.)]
+        board = self.make_board(positions, teams=['red', 'red'])
+        board._resolve_collision()
+        self.assertEqual(len(board._ships), 2)
+        board = self.make_board(positions, friendly_fire=True,
+                                teams=['red', 'red'])
+        board._resolve_collision()
+        self.assertEqual(len(board._ships), 0)
+
+    def test_asteroid_hits_ship(self):
+        board = self.make_board([(50., 50., 0.), (150., 50., 0.)])
+        asteroid = GamePiece.Asteroid1(10., (150., 50., 0.), (0., 0.), 0.)
+        board._add_asteroid(asteroid)
+        board._resolve_collision()
+        self.assertEqual(board.ship_hits, [(1, board.entity_id(asteroid))])
+        self.assertEqual(list(board._ships), [self.ships[0]])
+
+    def fire_at(self, board, shooter, target_x):
+        # Moves the projectile onto the target right away.
+        projectile = board.ship_fire(shooter)
+        projectile.position = (target_x, 50., 0.)
+        return projectile
+
+    def test_projectile_hits_other_ship(self):
+        board = self.make_board([(50., 50., 0.), (150., 50., 0.)])
+        own = self.fire_at(board, 0, 50.)
+        other = board.entity_id(self.fire_at(board, 0, 150.))
+        board._resolve_collision()
+        self.assertEqual(board.ship_hits, [(1, other)])
+        self.assertEqual(list(board._projectiles), [own])
+        self.assertEqual(list(board._ships), [self.ships[0]])
+
+    def test_friendly_fire(self):
+        positions = [(50., 50., 0.), (150., 50., 0.)]
+        board = self.make_board(positions, teams=[1, 1])
+        self.fire_at(board, 0, 150.)
+        board._resolve_collision()
+        self.assertEqual(len(board._ships), 2)
+        board = self.make_board(positions, friendly_fire=True, teams=[1, 1])
+        self.fire_at(board, 0, 150.)
+        board._resolve_collision()
+        self.assertEqual(list(board._ships), [self.ships[0]])
+
+    def test_unowned_projectile(self):
+        board = self.make_board([(50., 50., 0.), (150., 50., 0.)])
+        board._add_projectile(GamePiece.Projectile(
+            1., (50., 50., 0.), (0., 0.)))
+        board._resolve_collision()
+        self.assertEqual(list(board._ships), [self.ships[1]])
+        self.assertEqual(len(board._projectiles), 0)
+
+    def test_ships_input(self):
+        positions = [(50., 50., 0.), (150., 50., 0.), (250., 50., 0.)]
+        for vectorized in (False, True):
+            board = self.make_board(positions, vectorized=vectorized)
+            fired = board.ships_input(turn=[1, 0, -1], thrust=[0, 1, 1],
+                                      fire=[True, False, True])
+            self.assertEqual([ship.turn for ship in self.ships], [1, 0, -1])
+            self.assertEqual([ship.thrust for ship in self.ships], [0, 1, 1])
+            self.assertEqual(len(fired), 2)
+            self.assertEqual(board._owners[fired[1]], (2, 2))
+            board.step(0.1)
+            reference = self.make_board(positions)
+            for ship_id, turn, thrust in ((0, 1, 0), (1, 0, 1), (2, -1, 1)):
+                reference.ship_turn(turn, ship_id)
+                reference.ship_accelerate(thrust, ship_id)
+                if ship_id != 1:
+                    reference.ship_fire(ship_id)
+            reference.step(0.1)
+            np.testing.assert_allclose(
+                [piece.position for piece in board.moving_objects],
+                [piece.position for piece in reference.moving_objects])
+
+    def test_ships_input_invalid(self):
+        board = self.make_board([(50., 50., 0.), (150., 50., 0.)])
+        with self.assertRaises(ValueError):
+            board.ships_input(turn=[1])
+        with self.assertRaises(ValueError):
+            board.ships_input(turn=[2, 0])
+        with self.assertRaises(ValueError):
+            board.ships_input(fire=[1, 0, 1])
+
+    def test_snapshot(self):
+        board = self.make_board([(50., 50., 0.), (150., 50., 0.),
+                                 (250., 50., 0.)], friendly_fire=True,
+                                teams=['red', 'red', None])
+        board.ship_turn(1, 2)
+        board.ship_fire(1)
+        restored = Snapshot.restore(board.snapshot())
+        self.assertEqual(restored.max_ships, 4)
+        self.assertTrue(restored.friendly_fire)
+        self.assertEqual(restored.ship_ids, board.ship_ids)
+        self.assertEqual([ship.position for ship in restored._ships],
+                         [ship.position for ship in board._ships])
+        self.assertEqual(restored._ships.get(2).turn, 1)
+        self.assertEqual([restored._teams[ship] for ship in restored._ships],
+                         ['red', 'red', 2])
+        projectile, = restored._projectiles
+        self.assertEqual(restored._owners[projectile], (1, 'red'))
+        self.assertEqual(restored.snapshot(), board.snapshot())
+
+    def test_snapshot_last_ship(self):
+        # A multiplayer board with one ship left stays multiplayer.
+        board = self.make_board([(50., 50., 0.), (53., 52., 0.),
+                                 (150., 50., 0.)])
+        board._resolve_collision()
+        restored = Snapshot.restore(board.snapshot())
+        self.assertEqual(restored.max_ships, 4)
+        self.assertIs(restored._ship, restored._ships.get(2))
+
+    def test_snapshot_bad_team(self):
+        board = self.make_board([(50., 50., 0.)], teams=[('red',)])
+        with self.assertRaises(ValueError):
+            board.snapshot()
+
+
+if __name__ == u"__main__":
+    unittest.main()
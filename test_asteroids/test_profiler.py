@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import io
+import json
+import time
+import unittest
+from asteroids import GamePiece
+from asteroids import Profiler
+from asteroids import Runner
+from asteroids import Scheduler
+from asteroids import Spawner
+
+
+class SlowSpawner(Spawner.WaveSpawner):
+    def update(self, board):
+        time.sleep(0.02)
+        return []
+
+
+class TestHistogram(unittest.TestCase):
+    def test_bins(self):
+        histogram = Profiler.Histogram(edges=(1., 10., 100.))
+        for value in (0.5, 2., 3., 50., 500.):
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.mean, 111.1)
+        self.assertEqual(histogram.percentile(50.), 10.)
+        self.assertEqual(histogram.percentile(100.), 500.)
+        self.assertEqual(Profiler.Histogram().percentile(50.), 0.)
+
+
+class TestStepProfiler(unittest.TestCase):
+    def setUp(self):
+        self.board = Runner.make_board(size=(300., 200.), no_asteroids=0)
+        self.board._add_asteroid(GamePiece.Asteroid1(
+            20., (50., 50., 0.), (0., 0.), 0.))
+        # One projectile well inside the asteroid, one next to it.
+        self.board._add_projectile(GamePiece.Projectile(
+            1., (50., 50., 0.), (0., 0.)))
+        self.board._add_projectile(GamePiece.Projectile(
+            1., (58., 54., 0.), (0., 0.)))
+        self.records = []
+        self.profiler = Profiler.StepProfiler(
+            exporters=[self.records.append])
+        self.profiler.attach(self.board)
+
+    def test_records(self):
+        self.board.step(0.1)
+        self.board.step(0.1)
+        self.assertEqual([record['tick'] for record in self.records], [0, 1])
+        first = self.records[0]
+        self.assertEqual(sorted(first['seconds']), sorted(Profiler.PHASES))
+        self.assertTrue(all(seconds >= 0.
+                            for seconds in first['seconds'].values()))
+        self.assertEqual(first['pair_tests'], 2)
+        self.assertGreater(first['axis_tests'], 2)
+        self.assertEqual((first['asteroids'], first['projectiles'],
+                          first['ships']), (0, 1, 1))
+        self.assertEqual(self.records[1]['pair_tests'], 0)
+        summary = self.profiler.summary()
+        self.assertEqual(summary['ticks'], 2)
+        self.assertEqual(summary['pair_tests'], 2)
+        self.assertEqual(
+            summary['phases']['resolve_collision']['count'], 2)
+        self.assertIn('resolve_collision',
+                      Profiler.format_summary(self.profiler))
+
+    def test_substeps(self):
+        self.board.scheduler = Scheduler.SubstepScheduler()
+        self.board.step(0.1)
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.board.score, 1)
+
+    def test_spawner(self):
+        self.board.spawner = SlowSpawner()
+        self.board.step(0.1)
+        seconds = self.records[0]['seconds']
+        self.assertGreaterEqual(seconds['spawn_waves'], 0.02)
+        self.assertLess(seconds['resolve_collision'], 0.02)
+
+    def test_detach(self):
+        self.profiler.detach(self.board)
+        self.board.step(0.1)
+        self.assertEqual(self.records, [])
+        self.assertEqual(self.board.score, 1)
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        self.profiler.exporters = [Profiler.JsonLinesExporter(stream)]
+        self.board.step(0.1)
+        self.board.step(0.1)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1])['tick'], 1)
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import ProjectilePool
+
+
+class TestProjectilePool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ProjectilePool.ProjectilePool(capacity=2, size=1.)
+
+    def test_init_wrong_capacity(self):
+        with self.assertRaises(ValueError):
+            ProjectilePool.ProjectilePool(capacity=0, size=1.)
+
+    def test_reuse(self):
+        projectile = self.pool.acquire((1., 2., 0.), (3., 4.))
+        projectile.step(1.)
+        self.pool.release(projectile)
+        again = self.pool.acquire((5., 6., 0.5), (1., 0.))
+        self.assertIs(again, projectile)
+        self.assertSequenceEqual(again.position, (5., 6., 0.5))
+        self.assertSequenceEqual(again.velocity, (1., 0.))
+        self.assertEqual(self.pool.allocations, 1)
+        self.assertEqual(self.pool.acquisitions, 2)
+        self.assertEqual(self.pool.releases, 1)
+
+    def test_exhausted(self):
+        first = self.pool.acquire((0., 0., 0.), (1., 0.))
+        self.pool.acquire((0., 0., 0.), (1., 0.))
+        self.assertIsNone(self.pool.acquire((0., 0., 0.), (1., 0.)))
+        self.assertEqual(self.pool.rejections, 1)
+        self.assertEqual(self.pool.high_water_mark, 2)
+        self.pool.release(first)
+        self.assertEqual(len(self.pool), 1)
+        self.assertEqual(self.pool.stats()['high_water_mark'], 2)
+
+    def test_release_foreign(self):
+        projectile = GamePiece.Projectile(1., (0., 0., 0.), (1., 0.))
+        with self.assertRaises(ValueError):
+            self.pool.release(projectile)
+        projectile = self.pool.acquire((0., 0., 0.), (1., 0.))
+        self.pool.release(projectile)
+        with self.assertRaises(ValueError):
+            self.pool.release(projectile)
+
+
+class TestGameBoardProjectilePool(unittest.TestCase):
+    def test_fire_reuses_projectile(self):
+        gameboard = GameBoard.GameBoard(size=(100., 100.), no_asteroids=1,
+                                        projectile_capacity=4)
+        gameboard._add_ship(GamePiece.Ship(1., (99., 50., 0.)))
+        projectile = gameboard.ship_fire()
+        gameboard.step(1.)
+        self.assertNotIn(projectile, gameboard._projectiles)
+        self.assertIs(gameboard.ship_fire(), projectile)
+        self.assertEqual(gameboard.projectile_pool.allocations, 1)
+
+    def test_fire_exhausted(self):
+        gameboard = GameBoard.GameBoard(size=(100., 100.), no_asteroids=1,
+                                        projectile_capacity=1)
+        gameboard._add_ship(GamePiece.Ship(1., (50., 50., 0.)))
+        gameboard.ship_fire()
+        self.assertIsNone(gameboard.ship_fire())
+        self.assertEqual(len(gameboard._projectiles), 1)
+
+
+if __name__ == u"__main__":
+    unittest.main()
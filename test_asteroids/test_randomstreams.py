@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import Farm
+from asteroids import GameBoard
+from asteroids import RandomStreams
+from asteroids import Runner
+from asteroids import Spawner
+
+import numpy as np
+
+
+def fire_policy(board, tick):
+    if tick % 4 == 0:
+        board.ship_turn(1)
+        board.ship_fire()
+
+
+class TestRandomStreams(unittest.TestCase):
+    def test_reproducible(self):
+        first = RandomStreams.RandomStreams(7)
+        second = RandomStreams.RandomStreams(7)
+        # Streams do not depend on the order they are used in.
+        a = first.generator('a').random(4)
+        b = first.generator('b').random(4)
+        self.assertEqual(second.generator('b').random(4).tolist(),
+                         b.tolist())
+        self.assertEqual(second.generator('a').random(4).tolist(),
+                         a.tolist())
+        self.assertNotEqual(a.tolist(), b.tolist())
+        self.assertIs(first.generator('a'), first.generator('a'))
+        self.assertNotEqual(
+            RandomStreams.RandomStreams(8).generator('a').random(4).tolist(),
+            a.tolist())
+
+    def test_entropy(self):
+        streams = RandomStreams.RandomStreams()
+        again = RandomStreams.RandomStreams(streams.entropy)
+        self.assertEqual(streams.generator('waves').random(3).tolist(),
+                         again.generator('waves').random(3).tolist())
+
+    def test_board_seed(self):
+        children = RandomStreams.RandomStreams(11).spawn(3)
+        for index, child in enumerate(children):
+            direct = RandomStreams.RandomStreams(
+                RandomStreams.board_seed(11, index))
+            self.assertEqual(child.generator('x').random(3).tolist(),
+                             direct.generator('x').random(3).tolist())
+        with self.assertRaises(ValueError):
+            RandomStreams.board_seed(11, -1)
+
+    def test_board(self):
+        board = GameBoard.GameBoard(size=(100., 100.), no_asteroids=0,
+                                    seed=5)
+        self.assertEqual(board.random.generator('waves').random(2).tolist(),
+                         RandomStreams.RandomStreams(5).generator(
+                             'waves').random(2).tolist())
+
+
+class TestWaveSampling(unittest.TestCase):
+    def test_one_draw(self):
+        spawner = Spawner.WaveSpawner()
+        rng = np.random.default_rng(3)
+        reference = np.random.default_rng(3)
+        shape_ids, sizes, positions, velocities, angular = spawner.sample(
+            rng, 1000, (600., 400.))
+        reference.random((1000, 8))
+        # The whole wave came from a single draw.
+        self.assertEqual(rng.random(), reference.random())
+        self.assertEqual(len(shape_ids), 1000)
+        self.assertTrue(((sizes >= 20.) & (sizes <= 40.)).all())
+        self.assertTrue((positions[:, :2] <= (600., 400.)).all())
+        speed = np.hypot(velocities[:, 0], velocities[:, 1])
+        self.assertTrue(((speed >= 10. - 1e-9) & (speed <= 30.)).all())
+        self.assertTrue((np.abs(angular) <= 1.).all())
+
+    def test_seeded_boards(self):
+        seed = RandomStreams.board_seed(42, 3)
+        first = Runner.make_board(seed=seed, vectorized=True)
+        second = Runner.make_board(seed=RandomStreams.board_seed(42, 3))
+        self.assertEqual(len(first._asteroids), 12)
+        self.assertEqual([asteroid.position for asteroid in first._asteroids],
+                         [asteroid.position
+                          for asteroid in second._asteroids])
+        other = Runner.make_board(seed=RandomStreams.board_seed(42, 4))
+        self.assertNotEqual(
+            [asteroid.position for asteroid in first._asteroids],
+            [asteroid.position for asteroid in other._asteroids])
+
+
+class TestFarmRootSeed(unittest.TestCase):
+    def test_independent_of_sharding(self):
+        kwargs = dict(ticks=200, dt=0.05, no_asteroids=6, root_seed=9,
+                      policy=fire_policy, stop_on_gameover=False)
+        all_boards = Farm.run_farm(range(4), workers=0, **kwargs)
+        some = Farm.run_farm([2, 3], workers=0, shards_per_worker=2,
+                             **kwargs)
+        for name in ('score', 'asteroids', 'projectiles', 'ticks'):
+            np.testing.assert_array_equal(all_boards.results[name][2:],
+                                          some.results[name])
+
+
+if __name__ == u"__main__":
+    unittest.main()
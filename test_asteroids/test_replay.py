@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from asteroids import Boundary
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Replay
+from asteroids import Runner
+from asteroids import Scheduler
+from asteroids import Spawner
+
+
+def record(path, ticks, keyframe_interval, close=True, board=None):
+    if board is None:
+        board = Runner.make_board(size=(300., 200.), no_asteroids=6, seed=7)
+    recorder = Replay.Recorder(board, path, keyframe_interval)
+    states = [board.snapshot()]
+    for tick in range(ticks):
+        recorder.ship_turn((tick // 7) % 3 - 1)
+        recorder.ship_accelerate(tick % 4 == 0)
+        if tick % 3 == 0:
+            recorder.ship_fire()
+        recorder.step(0.1 if tick % 2 else 0.05)
+        states.append(board.snapshot())
+    if close:
+        recorder.close()
+    else:
+        recorder._file.close()
+    return states
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'match.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_index(self):
+        record(self.path, 45, 10)
+        replayer = Replay.Replayer(self.path)
+        self.assertEqual(replayer.ticks, 45)
+        self.assertEqual([tick for tick, _ in replayer.keyframes],
+                         [0, 10, 20, 30, 40])
+
+    def test_play_is_bit_identical(self):
+        states = record(self.path, 45, 10)
+        replayer = Replay.Replayer(self.path)
+        ticks = []
+        for tick, board in replayer.play(verify=True):
+            self.assertEqual(board.snapshot(), states[tick])
+            ticks.append(tick)
+        self.assertEqual(ticks, list(range(46)))
+
+    def test_seek(self):
+        states = record(self.path, 45, 10)
+        replayer = Replay.Replayer(self.path)
+        for tick in (0, 9, 10, 11, 37, 45):
+            self.assertEqual(replayer.seek(tick).snapshot(), states[tick])
+
+    def test_play_range(self):
+        states = record(self.path, 45, 10)
+        replayer = Replay.Replayer(self.path)
+        played = [(tick, board.snapshot())
+                  for tick, board in replayer.play(15, 22)]
+        self.assertEqual(played, [(tick, states[tick])
+                                  for tick in range(15, 23)])
+        with self.assertRaises(ValueError):
+            list(replayer.play(10, 46))
+
+    def test_unindexed_log(self):
+        states = record(self.path, 25, 10, close=False)
+        replayer = Replay.Replayer(self.path)
+        self.assertEqual(replayer.ticks, 25)
+        self.assertEqual(replayer.seek(23).snapshot(), states[23])
+
+    def test_boundary(self):
+        board = Runner.make_board(size=(300., 200.), no_asteroids=6, seed=7)
+        board.boundary = Boundary.ProjectileRange(max_distance=60.,
+                                                  base=Boundary.Arena())
+        states = record(self.path, 45, 10, board=board)
+        replayer = Replay.Replayer(self.path)
+        for tick, board in replayer.play(verify=True):
+            self.assertEqual(board.snapshot(), states[tick])
+        self.assertIsInstance(board.boundary.base, Boundary.Arena)
+
+    def test_scheduler(self):
+        board = Runner.make_board(size=(300., 200.), no_asteroids=6, seed=7)
+        board.scheduler = Scheduler.SubstepScheduler(tolerance=0.25,
+                                                     max_substeps=8)
+        states = record(self.path, 45, 10, board=board)
+        replayer = Replay.Replayer(self.path)
+        for tick, board in replayer.play(verify=True):
+            self.assertEqual(board.snapshot(), states[tick])
+        self.assertEqual(board.scheduler.max_substeps, 8)
+        self.assertEqual(board.scheduler.tolerance, 0.25)
+
+    def test_waves(self):
+        board = Runner.make_board(size=(200., 150.), no_asteroids=2, seed=0)
+        board.splitter = Spawner.Splitter(min_size=15.)
+        board.spawner = Spawner.WaveSpawner(min_size=10., max_size=20.,
+                                            min_speed=0., max_speed=5.,
+                                            clearance=40.)
+        recorder = Replay.Recorder(board, self.path, 50)
+        states = []
+        for _ in range(400):
+            recorder.ship_turn(1)
+            recorder.ship_fire()
+            recorder.step(0.1)
+            states.append(board.snapshot())
+        recorder.close()
+        self.assertGreater(board.spawner.waves, 2)
+        replayer = Replay.Replayer(self.path)
+        for tick, board in replayer.play(1, verify=True):
+            self.assertEqual(board.snapshot(), states[tick - 1])
+        self.assertEqual(replayer.seek(320).snapshot(), states[319])
+
+    def test_multiplayer(self):
+        board = GameBoard.GameBoard(size=(300., 200.), no_asteroids=4,
+                                    max_ships=3, seed=3)
+        for position, team in (((60., 60., 0.), 'red'),
+                               ((240., 60., 3.), 'red'),
+                               ((150., 150., 1.5), 'blue')):
+            board._add_ship(GamePiece.Ship(10., position), team=team)
+        Spawner.WaveSpawner(min_size=10., max_size=20., min_speed=0.,
+                            max_speed=10., clearance=40.).spawn(board)
+        recorder = Replay.Recorder(board, self.path, 10)
+        states = [board.snapshot()]
+        owned = 0
+        for tick in range(60):
+            count = len(board.ship_ids)
+            recorder.ships_input(
+                turn=[(tick // 5 + idx) % 3 - 1 for idx in range(count)],
+                thrust=[(tick + idx) % 4 == 0 for idx in range(count)],
+                fire=[(tick + idx) % 3 == 0 for idx in range(count)])
+            if tick % 7 == 0 and count:
+                recorder.ship_turn(1, board.ship_ids[-1])
+                recorder.ship_fire(board.ship_ids[-1])
+            recorder.step(0.1)
+            owned = max(owned, len(board._owners))
+            states.append(board.snapshot())
+        recorder.close()
+        self.assertGreater(owned, 0)
+        replayer = Replay.Replayer(self.path)
+        for tick, board in replayer.play(verify=True):
+            self.assertEqual(board.snapshot(), states[tick])
+        board = replayer.seek(35)
+        self.assertEqual(board.max_ships, 3)
+        self.assertEqual(sorted(board._teams.values()),
+                         sorted(board._teams[ship] for ship in board._ships))
+
+    def test_not_a_log(self):
+        with open(self.path, 'wb') as stream:
+            stream.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            Replay.Replayer(self.path)
+
+
+if __name__ == u"__main__":
+    unittest.main()
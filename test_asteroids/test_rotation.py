@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import GamePiece
+from asteroids import Rotation
+
+import numpy as np
+
+
+class TestRotationCache(unittest.TestCase):
+    def setUp(self):
+        self.angles = np.random.RandomState(0).uniform(
+            0., 2. * np.pi, 1000).tolist()
+
+    def tearDown(self):
+        Rotation.configure('exact')
+
+    def test_exact(self):
+        cache = Rotation.RotationCache()
+        for angle in self.angles:
+            self.assertEqual(cache.sincos(angle), (np.sin(angle),
+                                                   np.cos(angle)))
+            self.assertEqual(cache.turn(angle, 0., 1., 0.1),
+                             (np.sin(angle), np.cos(angle)))
+
+    def test_table(self):
+        cache = Rotation.RotationCache('table', resolution=1024)
+        for angle in self.angles:
+            sin_angle, cos_angle = cache.sincos(angle)
+            self.assertLessEqual(abs(sin_angle - np.sin(angle)),
+                                 np.pi / 1024)
+            self.assertLessEqual(abs(cos_angle - np.cos(angle)),
+                                 np.pi / 1024)
+        self.assertEqual(cache.sincos(2. * np.pi), cache.sincos(0.))
+
+    def test_incremental(self):
+        cache = Rotation.RotationCache('incremental')
+        angle, sin_angle, cos_angle = 0.3, np.sin(0.3), np.cos(0.3)
+        for _ in range(10000):
+            angle = (angle + 0.05) % (2. * np.pi)
+            sin_angle, cos_angle = cache.turn(angle, sin_angle, cos_angle,
+                                              0.05)
+        self.assertAlmostEqual(sin_angle, np.sin(angle), places=10)
+        self.assertAlmostEqual(cos_angle, np.cos(angle), places=10)
+        self.assertEqual(len(cache._steps), 1)
+
+    def test_step_cache_bounded(self):
+        cache = Rotation.RotationCache(max_steps=4)
+        for idx in range(10):
+            cache.step(idx * 0.1)
+        self.assertLessEqual(len(cache._steps), 4)
+
+    def test_configure(self):
+        with self.assertRaises(ValueError):
+            Rotation.RotationCache('fast')
+        with self.assertRaises(ValueError):
+            Rotation.RotationCache(resolution=2)
+        cache = Rotation.RotationCache('table', resolution=64)
+        cache.configure('exact')
+        self.assertEqual(cache.resolution, 64)
+        self.assertEqual(cache.sincos(1.), (np.sin(1.), np.cos(1.)))
+
+    def test_shared_by_pieces(self):
+        reference = GamePiece.Asteroid1(2., (0., 0., 0.5), (1., 0.), 0.3)
+        reference.turn = 1
+        Rotation.configure('incremental')
+        asteroid = GamePiece.Asteroid1(2., (0., 0., 0.5), (1., 0.), 0.3)
+        asteroid.turn = 1
+        for _ in range(500):
+            asteroid.step(0.1)
+        Rotation.configure('exact')
+        for _ in range(500):
+            reference.step(0.1)
+        self.assertEqual(asteroid.position, reference.position)
+        np.testing.assert_allclose(asteroid._heading(),
+                                   reference._heading(), atol=1e-12)
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import contextlib
+import io
+import json
+import unittest
+from asteroids import Runner
+
+
+class TestRunner(unittest.TestCase):
+    def test_make_board(self):
+        board = Runner.make_board(size=(400., 300.), no_asteroids=5, seed=2)
+        self.assertEqual(len(board._asteroids), 5)
+        self.assertIsNotNone(board._ship)
+        self.assertFalse(board.gameover)
+
+    def test_run(self):
+        board = Runner.make_board(no_asteroids=3, seed=2)
+        result = Runner.run(board, 50, 0.01)
+        self.assertEqual(result.ticks, 50)
+        self.assertEqual(len(result.latencies), 50)
+        self.assertLessEqual(result.percentile(50.), result.percentile(99.))
+        self.assertGreater(result.ticks_per_second, 0.)
+        self.assertEqual(result.max_entities, 4)
+
+    def test_fast_forward(self):
+        board = Runner.make_board(no_asteroids=3, seed=2)
+        result = Runner.run(board, 50, 0.01, fast_forward=True)
+        self.assertEqual(result.ticks, 50)
+        self.assertIsNone(result.percentile(50.))
+        self.assertIsNone(result.as_dict()['p99_step_seconds'])
+
+    def test_policy(self):
+        board = Runner.make_board(no_asteroids=3, seed=2)
+
+        def policy(board, tick):
+            if tick % 10 == 0:
+                board.ship_fire()
+        result = Runner.run(board, 5, 0.01, policy=policy)
+        self.assertEqual(result.counts_end['projectiles'], 1)
+
+    def test_stop_on_gameover(self):
+        board = Runner.make_board(no_asteroids=3, seed=2)
+        board.gameover = True
+        result = Runner.run(board, 50, 0.01, stop_on_gameover=True)
+        self.assertEqual(result.ticks, 1)
+
+    def test_wrong_arguments(self):
+        board = Runner.make_board(no_asteroids=1, seed=2)
+        with self.assertRaises(ValueError):
+            Runner.run(board, -1, 0.01)
+        with self.assertRaises(ValueError):
+            Runner.run(board, 1, 0.)
+
+    def test_main(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            Runner.main(['--ticks', '20', '--asteroids', '2', '--seed', '1',
+                         '--vectorized', '--json'])
+        self.assertEqual(json.loads(out.getvalue())['ticks'], 20)
+
+
+if __name__ == u"__main__":
+    unittest.main()
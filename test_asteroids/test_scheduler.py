@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Runner
+from asteroids import Scheduler
+
+
+class TestSubstepScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler.SubstepScheduler(tolerance=0.5,
+                                                    max_substeps=16)
+        self.gameboard = GameBoard.GameBoard(size=(1000., 1000.),
+                                             no_asteroids=1)
+        # Bounding radius 2.26, so pieces may move 1.13 per substep.
+        self.gameboard._add_asteroid(GamePiece.Asteroid1(
+            4., (500., 500., 0.), (1., 0.), 0.))
+
+    def test_arguments(self):
+        with self.assertRaises(ValueError):
+            Scheduler.SubstepScheduler(tolerance=0.)
+        with self.assertRaises(ValueError):
+            Scheduler.SubstepScheduler(max_substeps=3)
+        with self.assertRaises(AttributeError):
+            GameBoard.GameBoard(size=(10., 10.), no_asteroids=0,
+                                scheduler=object())
+
+    def test_counts(self):
+        self.gameboard._add_projectile(
+            GamePiece.Projectile(1., (10., 10., 0.), (5., 0.)))
+        self.gameboard._add_projectile(
+            GamePiece.Projectile(1., (10., 10., 0.), (0., 30.)))
+        self.gameboard._add_ship(GamePiece.Ship(10., (100., 100., 0.)))
+        counts = self.scheduler.substeps(self.gameboard, 0.1)
+        self.assertEqual(counts, {'ship': 1, 'asteroids': 1,
+                                  'projectiles': 4})
+        counts = self.scheduler.substeps(self.gameboard, 1.)
+        self.assertEqual(counts, {'ship': 1, 'asteroids': 1,
+                                  'projectiles': 16})
+        self.assertEqual(self.scheduler.last, counts)
+
+    def test_no_asteroids(self):
+        gameboard = GameBoard.GameBoard(size=(10., 10.), no_asteroids=0)
+        gameboard._add_projectile(
+            GamePiece.Projectile(1., (1., 1., 0.), (100., 0.)))
+        self.assertEqual(set(self.scheduler.substeps(gameboard, 1.).values()),
+                         {1})
+
+    def test_slow_board_unchanged(self):
+        plain = Runner.make_board(size=(800., 600.), no_asteroids=8, seed=1)
+        scheduled = Runner.make_board(size=(800., 600.), no_asteroids=8,
+                                      seed=1)
+        scheduled.scheduler = Scheduler.SubstepScheduler(tolerance=100.)
+        for _ in range(50):
+            plain.step(0.05)
+            scheduled.step(0.05)
+        # Snapshots store the scheduler; compare everything else.
+        scheduled.scheduler = None
+        self.assertEqual(scheduled.snapshot(), plain.snapshot())
+
+    def test_fast_projectile(self):
+        for vectorized in (False, True):
+            gameboard = GameBoard.GameBoard(
+                size=(1000., 1000.), no_asteroids=1, vectorized=vectorized,
+                scheduler=self.scheduler)
+            gameboard._add_asteroid(GamePiece.Asteroid1(
+                1., (500., 500., 0.), (1., 0.), 0.))
+            # Passes the asteroid between the ends of one step of 0.5.
+            gameboard._add_projectile(
+                GamePiece.Projectile(1., (495.5, 500., 0.), (18., 0.)))
+            gameboard.step(0.5)
+            self.assertEqual(gameboard.score, 1)
+            self.assertEqual(self.scheduler.last['projectiles'], 16)
+            (_, _, time), = gameboard.impacts
+            self.assertGreater(time, 0.)
+            self.assertLess(time, 0.5)
+
+    def test_fast_projectile_tunnels_without_scheduler(self):
+        self.gameboard._add_projectile(
+            GamePiece.Projectile(1., (495.5, 500., 0.), (18., 0.)))
+        self.gameboard.step(0.5)
+        self.assertEqual(self.gameboard.score, 0)
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import mmap
+import tempfile
+import unittest
+from asteroids import Boundary
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Runner
+from asteroids import Snapshot
+from asteroids import Spawner
+
+
+def board_state(board):
+    return ([(board.entity_id(piece), piece.position, piece.velocity)
+             for _, piece in Snapshot._pieces(board)],
+            board.gameover, board.score)
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.board = Runner.make_board(size=(300., 200.), no_asteroids=6,
+                                       seed=4)
+        self.board._add_projectile(
+            GamePiece.Projectile(1., (10., 10., 0.), (1., 0.)))
+        for tick in range(30):
+            self.board.ship_turn(1)
+            self.board.ship_accelerate(tick % 2 == 0)
+            if tick % 5 == 0:
+                self.board.ship_fire()
+            self.board.step(0.1)
+
+    def test_roundtrip(self):
+        data = self.board.snapshot()
+        restored = GameBoard.GameBoard.restore(data)
+        self.assertEqual(board_state(restored), board_state(self.board))
+        self.assertEqual(restored.snapshot(), data)
+        self.assertEqual(restored.projectile_pool.live,
+                         self.board.projectile_pool.live)
+
+    def test_next_step_is_identical(self):
+        restored = GameBoard.GameBoard.restore(self.board.snapshot())
+        for board in (self.board, restored):
+            board.ship_fire()
+            for _ in range(20):
+                board.step(0.1)
+        self.assertEqual(restored.snapshot(), self.board.snapshot())
+
+    def test_vectorized(self):
+        board = Runner.make_board(no_asteroids=3, seed=1, vectorized=True)
+        board.step(0.1)
+        restored = GameBoard.GameBoard.restore(board.snapshot())
+        self.assertIsNotNone(restored._world)
+        board.step(0.1)
+        restored.step(0.1)
+        self.assertEqual(restored.snapshot(), board.snapshot())
+
+    def test_analytic(self):
+        board = Runner.make_board(no_asteroids=5, seed=1, analytic=True)
+        board.ship_fire()
+        for _ in range(7):
+            board.step(0.1)
+        restored = GameBoard.GameBoard.restore(board.snapshot())
+        self.assertEqual(restored._analytic.time, board._analytic.time)
+        for _ in range(20):
+            board.step(0.1)
+            restored.step(0.1)
+        self.assertEqual(restored.snapshot(), board.snapshot())
+
+    def test_read_version_1(self):
+        header, records = Snapshot.read(self.board.snapshot())
+        old = records[list(Snapshot.PIECE_DTYPE_V1.names)].astype(
+            Snapshot.PIECE_DTYPE_V1)
+        data = Snapshot.HEADER_V1.pack(
+            Snapshot.MAGIC, 1, 0, len(old), 300., 200.,
+            header['no_asteroids'], header['score'],
+            header['projectile_capacity'],
+            header['next_entity_id']) + old.tobytes()
+        restored = GameBoard.GameBoard.restore(data)
+        self.assertEqual(board_state(restored), board_state(self.board))
+
+    def test_read_version_2(self):
+        data = self.board.snapshot()
+        header, records = Snapshot.read(data)
+        fields = Snapshot.HEADER.unpack_from(data)
+        old = Snapshot.HEADER_V2.pack(Snapshot.MAGIC, 2, *fields[2:11])
+        restored = GameBoard.GameBoard.restore(old + records.tobytes())
+        self.assertEqual(board_state(restored), board_state(self.board))
+        self.assertIsInstance(restored.boundary, Boundary.Toroidal)
+
+    def test_boundary(self):
+        self.board.boundary = Boundary.ProjectileRange(
+            max_distance=30., base=Boundary.Arena())
+        self.board.ship_fire()
+        self.board.step(0.1)
+        restored = GameBoard.GameBoard.restore(self.board.snapshot())
+        self.assertIsInstance(restored.boundary, Boundary.ProjectileRange)
+        self.assertIsInstance(restored.boundary.base, Boundary.Arena)
+        self.assertEqual(restored.boundary._origins,
+                         self.board.boundary._origins)
+        for board in (self.board, restored):
+            for _ in range(40):
+                board.step(0.1)
+        self.assertEqual(restored.snapshot(), self.board.snapshot())
+
+        class Custom(Boundary.Toroidal):
+            pass
+
+        self.board.boundary = Custom()
+        with self.assertRaises(ValueError):
+            self.board.snapshot()
+
+    def test_spawner(self):
+        for spawner in (Spawner.WaveSpawner(speedup=1.5),
+                        Spawner.WaveSpawner(speedup=1.5, seed=3)):
+            board = GameBoard.GameBoard(
+                size=(300., 200.), no_asteroids=4, seed=9, spawner=spawner,
+                splitter=Spawner.Splitter(pieces=3, min_size=5.))
+            board.step(0.1)
+            board.random.generator('other').random()
+            restored = GameBoard.GameBoard.restore(board.snapshot())
+            self.assertEqual(restored.spawner.waves, 1)
+            self.assertEqual(restored.splitter.pieces, 3)
+            for game in (board, restored):
+                for _ in range(2):
+                    for asteroid in list(game._asteroids):
+                        game._kill(game._asteroids, asteroid)
+                    game._flush()
+                    game.step(0.1)
+                game.random.generator('other').random()
+            self.assertEqual(restored.spawner.waves, 3)
+            self.assertEqual(restored.snapshot(), board.snapshot())
+
+    def test_unused_random_streams(self):
+        first = GameBoard.GameBoard(size=(300., 200.), no_asteroids=0)
+        second = GameBoard.GameBoard(size=(300., 200.), no_asteroids=0)
+        self.assertEqual(first.snapshot(), second.snapshot())
+        self.assertIsNone(Snapshot.read(first.snapshot())[0]['config'][
+            'random'])
+
+    def test_read_is_zero_copy(self):
+        data = bytearray(self.board.snapshot())
+        header, records = Snapshot.read(memoryview(data))
+        self.assertEqual(header['size'], (300., 200.))
+        self.assertEqual(len(records), len(self.board.moving_objects))
+        self.assertFalse(records.flags.owndata)
+        data[Snapshot.HEADER.size + Snapshot.PIECE_DTYPE.fields[
+            'size'][1]] ^= 1
+        self.assertNotEqual(records['size'][0], self.board._ship.size)
+
+    def test_restore_from_mmap(self):
+        data = self.board.snapshot()
+        with tempfile.TemporaryFile() as handle:
+            handle.write(data)
+            handle.flush()
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            restored = GameBoard.GameBoard.restore(mapped)
+            self.assertEqual(board_state(restored), board_state(self.board))
+            del restored
+            mapped.close()
+
+    def test_bad_buffers(self):
+        data = self.board.snapshot()
+        with self.assertRaises(ValueError):
+            Snapshot.read(b'XXXX' + data[4:])
+        with self.assertRaises(ValueError):
+            Snapshot.read(data[:-1])
+        with self.assertRaises(ValueError):
+            Snapshot.read(data[:10])
+
+
+if __name__ == u"__main__":
+    unittest.main()
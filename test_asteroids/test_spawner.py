@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import EventDriven
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import Spawner
+
+import numpy as np
+
+
+def slot_values(obj):
+    """Values of all slots of obj, with those of its outline."""
+    values = {}
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            value = getattr(obj, name)
+            if name == '_gb_repr':
+                value = (type(value), slot_values(value))
+            values[name] = value
+    return values
+
+
+class TestMakeAsteroids(unittest.TestCase):
+    def test_matches_constructors(self):
+        rng = np.random.RandomState(0)
+        shape_ids = rng.randint(3, size=20)
+        sizes = rng.uniform(5., 30., 20)
+        positions = rng.uniform(0., 100., (20, 3))
+        velocities = rng.uniform(-10., 10., (20, 2))
+        angular_velocities = rng.uniform(-1., 1., 20)
+        angular_velocities[0] = 0.
+        bulk = GamePiece.make_asteroids(shape_ids, sizes, positions,
+                                        velocities, angular_velocities)
+        for k, asteroid in enumerate(bulk):
+            reference = GamePiece.asteroid_class(int(shape_ids[k]))(
+                float(sizes[k]), tuple(positions[k].tolist()),
+                tuple(velocities[k].tolist()), float(angular_velocities[k]))
+            self.assertIs(type(asteroid), type(reference))
+            self.assertEqual(slot_values(asteroid), slot_values(reference))
+            self.assertEqual(asteroid.position, reference.position)
+            self.assertEqual(asteroid.velocity, reference.velocity)
+            self.assertEqual(asteroid.turn, reference.turn)
+            self.assertEqual(asteroid._heading(), reference._heading())
+            self.assertEqual(asteroid.bounding_radius,
+                             reference.bounding_radius)
+            self.assertEqual(asteroid.world_repr().xy,
+                             reference.world_repr().xy)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            GamePiece.make_asteroids([0, 1], [1.], [(0., 0., 0.)],
+                                     [(0., 0.)], [0.])
+        with self.assertRaises(ValueError):
+            GamePiece.make_asteroids([0], [0.], [(0., 0., 0.)], [(0., 0.)],
+                                     [0.])
+
+    def test_add_asteroids(self):
+        for vectorized, analytic in ((False, False), (True, False),
+                                     (False, True), (True, True)):
+            board = GameBoard.GameBoard(size=(300., 200.), no_asteroids=0,
+                                        vectorized=vectorized,
+                                        analytic=analytic)
+            reference = GameBoard.GameBoard(size=(300., 200.),
+                                            no_asteroids=0,
+                                            vectorized=vectorized,
+                                            analytic=analytic)
+            arrays = ([0, 1, 2], [10., 20., 30.],
+                      [(10., 20., 0.), (100., 50., 1.), (290., 190., 2.)],
+                      [(5., 0.), (0., -5.), (3., 4.)], [0.5, -0.5, 0.])
+            board._add_asteroids(GamePiece.make_asteroids(*arrays))
+            for asteroid in GamePiece.make_asteroids(*arrays):
+                reference._add_asteroid(asteroid)
+            for _ in range(3):
+                board.step(0.5)
+                reference.step(0.5)
+            self.assertEqual(
+                [asteroid.position for asteroid in board._asteroids],
+                [asteroid.position for asteroid in reference._asteroids])
+
+
+class TestSplitter(unittest.TestCase):
+    def test_split(self):
+        splitter = Spawner.Splitter(pieces=2, ratio=0.5, min_size=10.,
+                                    spread=np.pi / 2., speedup=2.)
+        shape_ids, sizes, positions, velocities, angular = splitter.split(
+            [1, 2], [40., 15.], [(10., 20., 0.), (50., 50., 0.)],
+            [(3., 0.), (1., 0.)], [0.5, 0.5])
+        self.assertEqual(shape_ids.tolist(), [1, 1])
+        self.assertEqual(sizes.tolist(), [20., 20.])
+        self.assertEqual(positions.tolist(), [[10., 20., 0.]] * 2)
+        np.testing.assert_allclose(velocities, [(3. * np.sqrt(2.),
+                                                 -3. * np.sqrt(2.)),
+                                                (3. * np.sqrt(2.),
+                                                 3. * np.sqrt(2.))])
+        self.assertEqual(angular.tolist(), [0.5, -0.5])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Spawner.Splitter(pieces=0)
+        with self.assertRaises(ValueError):
+            Spawner.Splitter(ratio=1.)
+        with self.assertRaises(AttributeError):
+            GameBoard.GameBoard(size=(300., 200.), no_asteroids=0,
+                                splitter=object())
+
+    def test_board_splits(self):
+        for vectorized in (False, True):
+            board = GameBoard.GameBoard(size=(300., 200.), no_asteroids=0,
+                                        vectorized=vectorized,
+                                        splitter=Spawner.Splitter())
+            board._add_asteroid(GamePiece.Asteroid2(
+                40., (100., 100., 0.), (10., 0.), 0.2))
+            board._add_projectile(GamePiece.Projectile(
+                1., (100., 100., 0.), (0., 0.)))
+            board._resolve_collision()
+            self.assertEqual(board.score, 1)
+            self.assertEqual([asteroid.size for asteroid in board._asteroids],
+                             [20., 20.])
+            self.assertEqual([type(asteroid) for asteroid in board._asteroids],
+                             [GamePiece.Asteroid2] * 2)
+            # Pieces of size 20 split once more, those of size 10 not.
+            for size in (20., 10.):
+                asteroid = [asteroid for asteroid in board._asteroids
+                            if asteroid.size == size][0]
+                board._add_projectile(GamePiece.Projectile(
+                    1., asteroid.position, (0., 0.)))
+                board._resolve_collision()
+            self.assertEqual(board.score, 3)
+            self.assertEqual(sorted(asteroid.size
+                                    for asteroid in board._asteroids),
+                             [10., 20.])
+
+
+class TestWaveSpawner(unittest.TestCase):
+    def make_board(self, spawner):
+        board = GameBoard.GameBoard(size=(600., 400.), no_asteroids=50,
+                                    spawner=spawner)
+        board._add_ship(GamePiece.Ship(10., (300., 200., 0.)))
+        return board
+
+    def test_spawn(self):
+        spawner = Spawner.WaveSpawner(clearance=40., seed=0)
+        board = self.make_board(spawner)
+        asteroids = spawner.spawn(board)
+        self.assertEqual(len(board._asteroids), 50)
+        self.assertEqual(list(board._asteroids), asteroids)
+        for asteroid in asteroids:
+            x, y, _ = asteroid.position
+            self.assertTrue(0. <= x <= 600. and 0. <= y <= 400.)
+            self.assertGreater(np.hypot(x - 300., y - 200.),
+                               40. + asteroid.bounding_radius)
+            self.assertTrue(20. <= asteroid.size <= 40.)
+            self.assertTrue(10. <= np.hypot(*asteroid.velocity) <= 30.)
+        self.assertEqual(spawner.waves, 1)
+
+    def test_waves(self):
+        spawner = Spawner.WaveSpawner(speedup=2., seed=1)
+        board = self.make_board(spawner)
+        board.step(0.01)
+        self.assertEqual(len(board._asteroids), 50)
+        speeds = [np.hypot(*asteroid.velocity) for asteroid in board._asteroids]
+        board.step(0.01)
+        self.assertEqual(spawner.waves, 1)
+        for asteroid in list(board._asteroids):
+            board._kill(board._asteroids, asteroid)
+        board._flush()
+        board.step(0.01)
+        self.assertEqual(spawner.waves, 2)
+        self.assertGreater(
+            np.mean([np.hypot(*asteroid.velocity)
+                     for asteroid in board._asteroids]), np.mean(speeds))
+
+    def test_seed(self):
+        first = self.make_board(Spawner.WaveSpawner(seed=3))
+        second = self.make_board(Spawner.WaveSpawner(seed=3))
+        first.step(0.01)
+        second.step(0.01)
+        self.assertEqual(first.snapshot(), second.snapshot())
+
+    def test_event_driven(self):
+        board = GameBoard.GameBoard(size=(600., 400.), no_asteroids=5,
+                                    analytic=True,
+                                    spawner=Spawner.WaveSpawner())
+        with self.assertRaises(ValueError):
+            EventDriven.EventSimulator(board, 0.1)
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from asteroids import GamePiece
+from asteroids import Runner
+from asteroids import Snapshot
+from asteroids import Trajectory
+
+import numpy as np
+
+
+class TestTrajectory(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def record(self, vectorized, ticks=40):
+        board = Runner.make_board(size=(300., 200.), no_asteroids=5, seed=3,
+                                  vectorized=vectorized)
+        # Tiny capacity, so the files have to grow while recording.
+        recorder = Trajectory.TrajectoryRecorder(self.path, capacity=4)
+        recorder.attach(board)
+        states = [{board.entity_id(piece): piece.position
+                   for piece in board.moving_objects}]
+        for tick in range(ticks):
+            board.ship_turn(1)
+            if tick % 4 == 0:
+                board.ship_fire()
+            board.step(0.5)
+            states.append({board.entity_id(piece): piece.position
+                           for piece in board.moving_objects})
+        recorder.close()
+        return board, states
+
+    def check(self, vectorized):
+        board, states = self.record(vectorized)
+        trajectory = Trajectory.Trajectory(self.path)
+        self.assertEqual(len(trajectory), len(states))
+        for tick, state in enumerate(states):
+            rows = trajectory.tick(tick)
+            self.assertEqual(
+                {entity_id: (x, y, angle)
+                 for entity_id, x, y, angle in rows.tolist()}, state)
+
+        lifetimes = {row['entity_id']: row for row in trajectory.lifetimes}
+        for entity_id in lifetimes:
+            alive = [tick for tick, state in enumerate(states)
+                     if entity_id in state]
+            lifetime = lifetimes[entity_id]
+            self.assertEqual(lifetime['spawn'], alive[0])
+            if alive[-1] == len(states) - 1:
+                self.assertEqual(lifetime['death'], -1)
+            else:
+                self.assertEqual(lifetime['death'], alive[-1] + 1)
+            ticks, rows = trajectory.entity(entity_id)
+            self.assertEqual(ticks.tolist(), alive)
+            self.assertEqual(
+                rows['x'].tolist(),
+                [states[tick][entity_id][0] for tick in alive])
+        kinds = trajectory.lifetimes['kind']
+        self.assertEqual(np.sum(kinds == Snapshot.KIND_SHIP), 1)
+        self.assertEqual(np.sum(kinds == Snapshot.KIND_ASTEROID), 5)
+        self.assertGreater(np.sum(kinds == Snapshot.KIND_PROJECTILE), 0)
+        self.assertLess(np.sum(trajectory.lifetimes['death'] >= 0),
+                        len(trajectory.lifetimes))
+
+    def test_scalar_board(self):
+        self.check(vectorized=False)
+
+    def test_vectorized_board(self):
+        self.check(vectorized=True)
+
+    def test_version_1(self):
+        self.record(vectorized=False)
+        trajectory = Trajectory.Trajectory(self.path)
+        entities = {entity_id: trajectory.entity(entity_id) for entity_id
+                    in trajectory.lifetimes['entity_id'].tolist()}
+        del trajectory
+        # Version 1 has no entity index and scans the rows instead.
+        os.remove(os.path.join(self.path, 'entities.bin'))
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path) as stream:
+            meta = json.load(stream)
+        meta['version'] = 1
+        with open(meta_path, 'w') as stream:
+            json.dump(meta, stream)
+        trajectory = Trajectory.Trajectory(self.path)
+        for entity_id, (ticks, rows) in entities.items():
+            old_ticks, old_rows = trajectory.entity(entity_id)
+            self.assertEqual(old_ticks.tolist(), ticks.tolist())
+            self.assertEqual(old_rows.tolist(), rows.tolist())
+
+    def test_detach(self):
+        board = Runner.make_board(size=(300., 200.), no_asteroids=2, seed=3)
+        recorder = Trajectory.TrajectoryRecorder(self.path)
+        recorder.attach(board)
+        board.step(0.1)
+        recorder.detach(board)
+        board.step(0.1)
+        recorder.close()
+        trajectory = Trajectory.Trajectory(self.path)
+        self.assertEqual(len(trajectory), 2)
+        with self.assertRaises(IndexError):
+            trajectory.tick(2)
+
+    def test_empty_board(self):
+        board = Runner.make_board(size=(300., 200.), no_asteroids=0, seed=3)
+        board.moving_objects.remove(board._ship)
+        board._ships.remove(board._ship)
+        board._ship = None
+        recorder = Trajectory.TrajectoryRecorder(self.path)
+        recorder.attach(board)
+        board._add_asteroid(GamePiece.Asteroid1(5., (1., 1., 0.), (0., 0.), 0.))
+        board.step(0.1)
+        recorder.close()
+        trajectory = Trajectory.Trajectory(self.path)
+        self.assertEqual(len(trajectory.tick(0)), 0)
+        self.assertEqual(len(trajectory.tick(1)), 1)
+        self.assertEqual(trajectory.lifetimes['spawn'].tolist(), [1])
+
+
+if __name__ == u"__main__":
+    unittest.main()
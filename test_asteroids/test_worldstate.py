@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author: Sven Mayer
+"""
+import unittest
+from asteroids import GameBoard
+from asteroids import GamePiece
+from asteroids import WorldState
+
+
+import numpy as np
+
+
+class TestWorldState(unittest.TestCase):
+    def setUp(self):
+        self.world = WorldState.WorldState(capacity=2)
+
+    def test_init_wrong_capacity(self):
+        with self.assertRaises(ValueError):
+            WorldState.WorldState(capacity=0)
+
+    def test_attach_is_view(self):
+        asteroid = GamePiece.Asteroid1(1., (1., 2., 0.5), (3., 4.), 1.)
+        self.world.attach(asteroid)
+        self.assertIn(asteroid, self.world)
+        self.assertSequenceEqual(asteroid.position, (1., 2., 0.5))
+        self.assertSequenceEqual(asteroid.velocity, (3., 4.))
+        self.assertEqual(asteroid.turn, 1)
+        asteroid.position = (5., 6., 0.)
+        self.assertAlmostEqual(self.world.position[0, 0], 5.)
+
+    def test_detach_restores_state(self):
+        ship = GamePiece.Ship(1., (1., 1., 0.))
+        self.world.attach(ship)
+        ship.thrust = 1
+        ship.step(1.)
+        position, velocity = ship.position, ship.velocity
+        self.world.detach(ship)
+        self.assertNotIn(ship, self.world)
+        self.assertSequenceEqual(ship.position, position)
+        self.assertSequenceEqual(ship.velocity, velocity)
+        self.assertEqual(ship.thrust, 1)
+
+    def test_attach_twice(self):
+        ship = GamePiece.Ship(1.)
+        self.world.attach(ship)
+        with self.assertRaises(RuntimeError):
+            WorldState.WorldState().attach(ship)
+
+    def test_grow_and_swap_remove(self):
+        pieces = [GamePiece.Projectile(1., (float(i), 0., 0.), (1., 0.))
+                  for i in range(5)]
+        for piece in pieces:
+            self.world.attach(piece)
+        self.assertGreaterEqual(self.world.capacity, 5)
+        self.world.detach(pieces[1])
+        self.assertEqual(len(self.world), 4)
+        self.assertEqual(pieces[4]._slot, 1)
+        self.assertSequenceEqual(pieces[4].position, (4., 0., 0.))
+
+    def test_step_matches_objects(self):
+        def make():
+            ship = GamePiece.Ship(2., (3., 4., 1.))
+            ship.thrust = 1
+            ship.turn = -1
+            return [ship,
+                    GamePiece.Asteroid1(2., (5., 5., 0.), (1., -2.), 0.7),
+                    GamePiece.Projectile(1., (0., 1., 2.), (3., 1.))]
+        reference = make()
+        viewed = make()
+        for piece in viewed:
+            self.world.attach(piece)
+        for _ in range(10):
+            for piece in reference:
+                piece.step(0.1)
+            self.world.step(0.1)
+        for ref, piece in zip(reference, viewed):
+            np.testing.assert_allclose(piece.position, ref.position)
+            np.testing.assert_allclose(piece.velocity, ref.velocity)
+        np.testing.assert_allclose(viewed[0].gunposition,
+                                   reference[0].gunposition)
+
+    def test_step_slot_array(self):
+        pieces = []
+        for i in range(4):
+            ship = GamePiece.Ship(2., (float(i), 0., 0.))
+            ship.thrust = 1
+            ship.turn = 1
+            self.world.attach(ship)
+            pieces.append(ship)
+        before = [piece.position for piece in pieces]
+        self.world.step(0.5, slots=[2, 0])
+        self.world.step(0.5, slots=slice(2, 3))
+        self.world.step(0.5, slots=2)
+        reference = GamePiece.Ship(2., (2., 0., 0.))
+        reference.thrust = 1
+        reference.turn = 1
+        for _ in range(3):
+            reference.step(0.5)
+        self.assertEqual(pieces[2].position, reference.position)
+        self.assertNotEqual(pieces[0].position, before[0])
+        self.assertEqual(pieces[1].position, before[1])
+        self.assertEqual(pieces[3].position, before[3])
+
+
+class TestVectorizedGameBoard(unittest.TestCase):
+    def test_step(self):
+        gameboard = GameBoard.GameBoard(size=(100., 100.), no_asteroids=1,
+                                        vectorized=True)
+        asteroid = GamePiece.Asteroid1(1., (10., 10., 0.), (1., 2.), 1.)
+        gameboard._add_asteroid(asteroid)
+        gameboard._add_ship(GamePiece.Ship(1., (50., 50., 0.)))
+        gameboard.step(1.)
+        self.assertAlmostEqual(asteroid.position[0], 11.)
+        self.assertAlmostEqual(asteroid.position[1], 12.)
+
+    def test_projectile_out_of_bounds(self):
+        gameboard = GameBoard.GameBoard(size=(100., 100.), no_asteroids=1,
+                                        vectorized=True)
+        projectile = GamePiece.Projectile(1., (30., -10., 0.), (0., 0.))
+        gameboard._add_projectile(projectile)
+        gameboard._projectiles_out_of_bounds()
+        self.assertEqual(len(gameboard._world), 0)
+        self.assertIsNone(projectile._world)
+
+
+if __name__ == u"__main__":
+    unittest.main()